@@ -12,16 +12,32 @@ import os
 import argparse
 import json
 import logging
-from datetime import datetime
-from typing import Dict, List, Any, Tuple
+from datetime import date, datetime
+from typing import Dict, List, Any, Optional, Tuple
 
 # モジュールをインポート
 from modules.excel_reader import ExcelReader
+from modules.csv_reader import CSVDirectoryReader
 from modules.date_converter import DateConverter
 from modules.validator import Validator
 from modules.node_generator import NodeGenerator
 from modules.relation_generator import RelationGenerator
+from modules.history_builder import HistoryBuilder
 from modules.html_generator import HTMLGenerator
+from modules.svg_generator import SVGGenerator
+from modules.layout_engine import LayoutEngine
+from modules.layout_cache import LayoutCache
+from modules.caseload_index import CaseloadIndex
+from modules.graph_merger import GraphMerger
+from modules.ecomap_store import EcomapStore
+from modules.ecomap_query import EcomapQuery
+from modules.neo4j_exporter import Neo4jExporter
+from modules.graph_exporter import GraphMLExporter, GEXFExporter
+from modules.delta_updater import DeltaUpdater
+from modules.ecomap_diff import EcomapDiff
+from modules.interval_index import ValidityIndex
+from modules.network_metrics import NetworkMetrics
+from modules.staff_caseload import StaffCaseloadReport
 from modules.interactive_dialog import InteractiveDialogEngine
 
 
@@ -36,23 +52,54 @@ class EcomapCreator:
         output_dir: str = "outputs",
         visualization: str = "d3",
         debug: bool = False,
-        interactive: bool = False
+        interactive: bool = False,
+        svg: bool = False,
+        slim_payload: bool = False,
+        compress_payload: bool = False,
+        simulation: str = "main",
+        layout_cache: Optional[str] = None,
+        import_layout: Optional[str] = None,
+        collapse_groups: bool = True,
+        as_of: Optional[str] = None,
+        csv_encoding: str = "utf-8-sig"
     ):
         """
         初期化
 
         Args:
-            input_file: 入力Excelファイルパス（対話モードでは不要）
+            input_file: 入力Excelファイルパス、またはシートごとのCSV/TSVファイルのディレクトリ
+                （対話モードでは不要）
             output_dir: 出力ディレクトリ
             visualization: 可視化ライブラリ（"d3" or "cytoscape"）
             debug: デバッグモード
             interactive: 対話モード
+            svg: 静的SVGも出力する
+            slim_payload: HTMLに描画用の最小限のデータのみ埋め込む
+            compress_payload: HTMLに埋め込むデータをgzip+base64で圧縮する
+            simulation: D3.js版の力学シミュレーションの実行方式（"main", "worker", "throttled"）
+            layout_cache: レイアウトキャッシュのディレクトリ（前回の配置を再利用・保存）
+            import_layout: ビューアーの「配置を保存」で保存したレイアウトファイル
+            collapse_groups: 処方薬・契約などを集約ノードにまとめて表示する
+            as_of: 指定した日付（YYYY-MM-DD）時点で有効なものだけのエコマップを作成する
+            csv_encoding: CSV/TSVファイルの文字コード
+
+        Raises:
+            ValueError: as_of が YYYY-MM-DD 形式の日付でない場合
         """
         self.input_file = input_file
         self.output_dir = output_dir
         self.visualization = visualization
         self.debug = debug
         self.interactive = interactive
+        self.svg = svg
+        self.slim_payload = slim_payload
+        self.compress_payload = compress_payload
+        self.simulation = simulation
+        self.layout_cache = layout_cache
+        self.import_layout = import_layout
+        self.collapse_groups = collapse_groups
+        self.as_of = date.fromisoformat(as_of) if as_of else None
+        self.csv_encoding = csv_encoding
 
         # ロガーの設定
         self._setup_logger()
@@ -125,11 +172,20 @@ class EcomapCreator:
         json_path = self._generate_json(data, nodes, relations)
         self.logger.info(f"  JSONファイル: {json_path}")
 
+        # レイアウト計算
+        layout = self._compute_layout(data, nodes, relations)
+
         # HTMLファイル生成
         self.logger.info("HTMLファイルを生成しています...")
-        html_path = self._generate_html(data, nodes, relations)
+        html_path = self._generate_html(data, nodes, relations, layout)
         self.logger.info(f"  HTMLファイル: {html_path}")
 
+        # SVGファイル生成
+        if self.svg:
+            self.logger.info("SVGファイルを生成しています...")
+            svg_path = self._generate_svg(data, nodes, relations, layout)
+            self.logger.info(f"  SVGファイル: {svg_path}")
+
         self.logger.info("✓ エコマップの作成が完了しました！")
 
         return json_path, html_path
@@ -178,16 +234,36 @@ class EcomapCreator:
             relations = self._generate_relations(data, nodes)
             self.logger.info(f"  リレーション数: {len(relations)}")
             
+            # 5.5. 指定した日付時点のエコマップに絞り込む（オプション）
+            if self.as_of:
+                snapshot = ValidityIndex.snapshot(
+                    {"nodes": nodes, "relations": relations}, self.as_of
+                )
+                nodes, relations = snapshot["nodes"], snapshot["relations"]
+                self.logger.info(
+                    f"  {self.as_of.isoformat()}時点: "
+                    f"ノード数 {len(nodes)}, リレーション数 {len(relations)}"
+                )
+            
             # 6. JSONファイル生成
             self.logger.info("JSONファイルを生成しています...")
             json_path = self._generate_json(data, nodes, relations)
             self.logger.info(f"  JSONファイル: {json_path}")
             
-            # 7. HTMLファイル生成
+            # 7. レイアウト計算（キャッシュがあれば前回の配置を再利用）
+            layout = self._compute_layout(data, nodes, relations)
+            
+            # 8. HTMLファイル生成
             self.logger.info("HTMLファイルを生成しています...")
-            html_path = self._generate_html(data, nodes, relations)
+            html_path = self._generate_html(data, nodes, relations, layout)
             self.logger.info(f"  HTMLファイル: {html_path}")
             
+            # 9. SVGファイル生成（オプション）
+            if self.svg:
+                self.logger.info("SVGファイルを生成しています...")
+                svg_path = self._generate_svg(data, nodes, relations, layout)
+                self.logger.info(f"  SVGファイル: {svg_path}")
+            
             self.logger.info("✓ エコマップの作成が完了しました！")
             
             return json_path, html_path
@@ -199,11 +275,107 @@ class EcomapCreator:
                 traceback.print_exc()
             raise
     
+    def update(self, json_path: str, delta: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        作成済みのエコマップに差分（シートごとの行の追加・変更・削除）を反映
+        
+        差分の行のノードだけを生成し、JSONとHTML（オプションでSVG）を出力し直します。
+        
+        Args:
+            json_path: 作成済みのエコマップJSONファイル
+            delta: 差分（形式は DeltaUpdater を参照）
+            
+        Returns:
+            (JSONファイルパス, HTMLファイルパス)
+        """
+        with open(json_path, "r", encoding="utf-8") as f:
+            json_data = json.load(f)
+        
+        # 差分の行を検証し、日付を変換（行のデータは差分の中で書き換わる）
+        person = {
+            key: json_data["person"].get(key, "") for key in ("name", "birth_date", "gender")
+        }
+        data = {"person": person, **DeltaUpdater.records(delta)}
+        errors = self._validate_data(data)
+        if errors:
+            for error in errors:
+                self.logger.error(f"  {error}")
+            raise ValueError("差分の検証に失敗しました")
+        data = self._convert_dates(data)
+        
+        summary = DeltaUpdater(json_data).apply(delta)
+        self.logger.info(
+            f"  ノード: +{summary['added_nodes']} ~{summary['changed_nodes']}"
+            f" -{summary['removed_nodes']}, "
+            f"リレーション: +{summary['added_relations']} -{summary['removed_relations']}"
+        )
+        
+        nodes = json_data["nodes"]
+        relations = json_data["relations"]
+        output_path = os.path.join(self.output_dir, f"{person['name']}_ecomap.json")
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(json_data, f, ensure_ascii=False, indent=2)
+        
+        layout = self._compute_layout(data, nodes, relations)
+        html_path = self._generate_html(data, nodes, relations, layout)
+        if self.svg:
+            self._generate_svg(data, nodes, relations, layout)
+        
+        return output_path, html_path
+    
+    def snapshot(self, json_paths: List[str]) -> List[Tuple[str, str]]:
+        """
+        作成済みのエコマップから、指定した日付（as_of）時点のエコマップを一括作成
+        
+        全ケースの有効期間を1つの区間木に登録し、日付を含む期間を突き刺し検索で求めます。
+        
+        Args:
+            json_paths: 作成済みのエコマップJSONファイルのリスト
+            
+        Returns:
+            (JSONファイルパス, HTMLファイルパス) のリスト
+            
+        Raises:
+            ValueError: as_of が指定されていない場合
+        """
+        if not self.as_of:
+            raise ValueError("日付（as_of）を指定してください")
+        
+        index = ValidityIndex()
+        for json_path in json_paths:
+            with open(json_path, "r", encoding="utf-8") as f:
+                index.add_ecomap(json.load(f))
+        
+        outputs = []
+        for json_data in index.snapshots(self.as_of).values():
+            data = {"person": json_data["person"]}
+            output_path = os.path.join(self.output_dir, f"{self._output_name(data)}.json")
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(json_data, f, ensure_ascii=False, indent=2)
+            
+            layout = self._compute_layout(data, json_data["nodes"], json_data["relations"])
+            html_path = self._generate_html(
+                data, json_data["nodes"], json_data["relations"], layout
+            )
+            if self.svg:
+                self._generate_svg(data, json_data["nodes"], json_data["relations"], layout)
+            outputs.append((output_path, html_path))
+        
+        return outputs
+    
+    def _output_name(self, data: Dict[str, Any]) -> str:
+        """出力ファイル名（拡張子なし。日付時点のエコマップは日付を付け、元のエコマップと区別する）"""
+        name = f"{data['person'].get('name', '不明')}_ecomap"
+        return f"{name}_{self.as_of.isoformat()}" if self.as_of else name
+    
     def _load_excel(self) -> Dict[str, Any]:
-        """Excelファイルを読み込み"""
+        """Excelファイル（ディレクトリの場合はシートごとのCSV/TSVファイル）を読み込み"""
         if not os.path.exists(self.input_file):
             raise FileNotFoundError(f"ファイルが見つかりません: {self.input_file}")
         
+        if os.path.isdir(self.input_file):
+            return CSVDirectoryReader(self.input_file, encoding=self.csv_encoding).load()
+        
         reader = ExcelReader(self.input_file)
         return reader.load()
     
@@ -277,250 +449,24 @@ class EcomapCreator:
         return data
     
     def _generate_nodes(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """ノードを生成"""
+        """ノードを生成（データの種類ごとに、行番号を出典として記録）"""
         generator = NodeGenerator()
         nodes = []
         
-        # 本人ノード（必須）
-        person_node = generator.generate_person_node(data["person"])
-        nodes.append(person_node)
-        
-        # 家族ノード
-        for family in data.get("family", []):
-            node = generator.generate_family_node(family)
-            nodes.append(node)
-        
-        # 手帳ノード
-        for notebook in data.get("notebooks", []):
-            node = generator.generate_notebook_node(notebook)
-            nodes.append(node)
-        
-        # 支援区分ノード
-        for level in data.get("support_levels", []):
-            node = generator.generate_support_level_node(level)
-            nodes.append(node)
-        
-        # 診断ノード
-        for diagnosis in data.get("diagnoses", []):
-            node = generator.generate_diagnosis_node(diagnosis)
-            nodes.append(node)
-        
-        # 成年後見人ノード
-        for guardian in data.get("legal_guardians", []):
-            node = generator.generate_legal_guardian_node(guardian)
-            nodes.append(node)
-        
-        # 相談支援事業所ノード
-        for support in data.get("consultation_supports", []):
-            office_node = generator.generate_consultation_support_node(support)
-            nodes.append(office_node)
-            
-            # 相談支援専門員ノード
-            if support.get("specialist"):
-                specialist_node = generator.generate_consultation_support_specialist_node(
-                    support["specialist"],
-                    office_node["id"]
-                )
-                nodes.append(specialist_node)
-        
-        # サービス等利用計画ノード
-        for plan in data.get("service_plans", []):
-            node = generator.generate_service_plan_node(plan)
-            nodes.append(node)
-        
-        # サービス利用情報ノード
-        for contract in data.get("service_contracts", []):
-            # サービス契約ノード
-            contract_node = generator.generate_service_contract_node(contract)
-            nodes.append(contract_node)
-            
-            # 福祉サービス事業所ノード
-            if contract.get("office_name"):
-                service_node = generator.generate_support_service_node(
-                    contract["office_name"],
-                    contract.get("office_number", "")
-                )
-                nodes.append(service_node)
-            
-            # サービス管理責任者ノード
-            if contract.get("manager") and contract.get("office_name"):
-                manager_node = generator.generate_service_manager_node(
-                    contract["manager"],
-                    service_node["id"]
-                )
-                nodes.append(manager_node)
-        
-        # 医療機関情報ノード
-        for institution in data.get("medical_institutions", []):
-            institution_node = generator.generate_medical_institution_node(institution)
-            nodes.append(institution_node)
-            
-            # 医師ノード
-            if institution.get("doctor"):
-                doctor_node = generator.generate_doctor_node(
-                    institution["doctor"],
-                    institution_node["id"]
-                )
-                nodes.append(doctor_node)
-                
-                # 処方薬ノード
-                if institution.get("medications"):
-                    medication_nodes = generator.generate_medication_node(
-                        institution["medications"],
-                        doctor_node["id"]
-                    )
-                    nodes.extend(medication_nodes)
+        for source in NodeGenerator.SOURCE_SHEETS:
+            # 本人ノード（必須）は1行目、それ以外は各シートのデータ行
+            records = [data["person"]] if source == "person" else data.get(source, [])
+            nodes.extend(generator.generate_source_nodes(source, enumerate(records, 1)))
         
         return nodes
     
     def _generate_relations(self, data: Dict[str, Any], nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """リレーションを生成"""
+        """リレーションを生成（リレーションルール表の実行計画で、出典を記録したノードを結合）"""
         generator = RelationGenerator()
+        generator.generate_from_rules(nodes)
         
-        # ノードIDのマップを作成
-        person_node = next(n for n in nodes if n["type"] == "Person")
-        
-        # 家族リレーション
-        family_nodes = [n for n in nodes if n["type"] == "Family"]
-        family_data_list = data.get("family", [])
-        for i, family_node in enumerate(family_nodes):
-            if i < len(family_data_list):
-                generator.generate_family_relation(
-                    person_node["id"],
-                    family_node["id"],
-                    family_data_list[i].get("relation", "")
-                )
-        
-        # 手帳リレーション
-        notebook_nodes = [n for n in nodes if "Notebook" in n["type"]]
-        for notebook_node in notebook_nodes:
-            generator.generate_has_notebook_relation(
-                person_node["id"],
-                notebook_node["id"]
-            )
-        
-        # 支援区分リレーション
-        support_level_nodes = [n for n in nodes if n["type"] == "SupportLevel"]
-        for level_node in support_level_nodes:
-            generator.generate_has_support_level_relation(
-                person_node["id"],
-                level_node["id"]
-            )
-        
-        # 診断リレーション
-        diagnosis_nodes = [n for n in nodes if n["type"] == "Diagnosis"]
-        for diagnosis_node in diagnosis_nodes:
-            generator.generate_has_diagnosis_relation(
-                person_node["id"],
-                diagnosis_node["id"]
-            )
-        
-        # 成年後見リレーション
-        guardian_nodes = [n for n in nodes if n["type"] == "LegalGuardian"]
-        for guardian_node in guardian_nodes:
-            generator.generate_under_guardianship_relation(
-                person_node["id"],
-                guardian_node["id"]
-            )
-        
-        # 相談支援リレーション
-        consultation_offices = [n for n in nodes if n["type"] == "ConsultationSupport"]
-        consultation_specialists = [n for n in nodes if n["type"] == "ConsultationSupportSpecialist"]
-        for specialist in consultation_specialists:
-            office_id = specialist["properties"]["office_id"]
-            generator.generate_works_for_relation(specialist["id"], office_id)
-        
-        # サービス等利用計画リレーション
-        service_plans = [n for n in nodes if n["type"] == "ServicePlan"]
-        for plan in service_plans:
-            generator.generate_has_service_plan_relation(
-                person_node["id"],
-                plan["id"]
-            )
-            
-            # 作成者リレーション（専門員がいる場合）
-            if consultation_specialists:
-                generator.generate_created_by_relation(
-                    plan["id"],
-                    consultation_specialists[0]["id"]
-                )
-        
-        # サービス契約リレーション
-        service_contracts = [n for n in nodes if n["type"] == "ServiceContract"]
-        support_services = [n for n in nodes if n["type"] == "SupportService"]
-        service_managers = [n for n in nodes if n["type"] == "ServiceManager"]
-        
-        for contract in service_contracts:
-            # 本人→契約
-            generator.generate_has_contract_relation(
-                person_node["id"],
-                contract["id"]
-            )
-            
-            # 契約→事業所（事業所名でマッチング）
-            for service in support_services:
-                generator.generate_contract_with_relation(
-                    contract["id"],
-                    service["id"]
-                )
-                break
-            
-            # 契約→管理責任者
-            for manager in service_managers:
-                generator.generate_managed_by_relation(
-                    contract["id"],
-                    manager["id"]
-                )
-                
-                # 管理責任者→事業所
-                for service in support_services:
-                    generator.generate_works_for_relation(
-                        manager["id"],
-                        service["id"]
-                    )
-                    break
-                break
-        
-        # 医療機関リレーション
-        medical_institutions = [n for n in nodes if n["type"] == "MedicalInstitution"]
-        doctors = [n for n in nodes if n["type"] == "Doctor"]
-        medications = [n for n in nodes if n["type"] == "Medication"]
-        
-        for institution in medical_institutions:
-            # 本人→医療機関
-            generator.generate_receives_medical_care_relation(
-                person_node["id"],
-                institution["id"]
-            )
-        
-        for doctor in doctors:
-            # 本人→医師
-            generator.generate_treated_by_relation(
-                person_node["id"],
-                doctor["id"]
-            )
-            
-            # 医師→医療機関
-            institution_id = doctor["properties"]["institution_id"]
-            generator.generate_works_for_relation(
-                doctor["id"],
-                institution_id
-            )
-        
-        for medication in medications:
-            # 本人→処方薬
-            generator.generate_takes_medication_relation(
-                person_node["id"],
-                medication["id"]
-            )
-            
-            # 処方薬→医師
-            doctor_id = medication["properties"]["doctor_id"]
-            generator.generate_prescribed_by_relation(
-                medication["id"],
-                doctor_id
-            )
-        
+        # 手帳の更新・支援区分の変更・計画の見直しの履歴チェーン
+        HistoryBuilder(generator).build(nodes)
         return generator.generated_relations
     
     def _generate_json(self, data: Dict[str, Any], nodes: List[Dict[str, Any]], relations: List[Dict[str, Any]]) -> str:
@@ -546,13 +492,14 @@ class EcomapCreator:
                 "source_file": os.path.basename(self.input_file) if self.input_file else "interactive_mode",
                 "node_count": len(nodes),
                 "relation_count": len(relations),
+                **({"as_of": self.as_of.isoformat()} if self.as_of else {}),
                 "person_name": person_name,
                 "person_age": person_age,
             }
         }
         
         # ファイル名を生成
-        json_filename = f"{person_name}_ecomap.json"
+        json_filename = f"{self._output_name(data)}.json"
         json_path = os.path.join(self.output_dir, json_filename)
         
         # JSONファイルを保存
@@ -561,7 +508,58 @@ class EcomapCreator:
         
         return json_path
     
-    def _generate_html(self, data: Dict[str, Any], nodes: List[Dict[str, Any]], relations: List[Dict[str, Any]]) -> str:
+    def _compute_layout(
+        self,
+        data: Dict[str, Any],
+        nodes: List[Dict[str, Any]],
+        relations: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        ノード座標を計算
+
+        取り込んだレイアウトファイル、またはレイアウトキャッシュに前回の配置があれば
+        既存ノードはその位置に固定し、新しいノードのみ配置します。
+
+        Returns:
+            person_key, positions（ノードID→(x, y)）, warm_start を含む辞書
+        """
+        person_key = LayoutCache.person_key(data["person"])
+        cache = LayoutCache(self.layout_cache) if self.layout_cache else None
+
+        cached_positions = {}
+        if self.import_layout:
+            imported_key, imported_positions = LayoutCache.import_viewer_layout(self.import_layout)
+            if imported_key == person_key:
+                cached_positions = imported_positions
+            else:
+                self.logger.warning(
+                    f"  レイアウトファイルが本人と一致しないため無視します: {self.import_layout}"
+                )
+        elif cache:
+            cached_positions = cache.load(data["person"])
+
+        positions = LayoutCache.warm_start(nodes, relations, cached_positions, LayoutEngine())
+        if cached_positions:
+            self.logger.info(f"  前回の配置を再利用しました（{len(cached_positions)}ノード分）")
+
+        # 日付時点のエコマップは一部のノードしかないため、キャッシュを上書きしない
+        if cache and not self.as_of:
+            cache_path = cache.save(data["person"], nodes, positions)
+            self.logger.debug(f"  レイアウトキャッシュ: {cache_path}")
+
+        return {
+            "person_key": person_key,
+            "positions": positions,
+            "warm_start": bool(cached_positions),
+        }
+
+    def _generate_html(
+        self,
+        data: Dict[str, Any],
+        nodes: List[Dict[str, Any]],
+        relations: List[Dict[str, Any]],
+        layout: Optional[Dict[str, Any]] = None
+    ) -> str:
         """HTMLファイルを生成"""
         person_name = data["person"].get("name", "不明")
         person_age = data["person"].get("age", 0)
@@ -581,11 +579,17 @@ class EcomapCreator:
             }
         }
         
-        generator = HTMLGenerator(self.visualization)
-        html_content = generator.generate(json_data, person_name)
+        generator = HTMLGenerator(
+            self.visualization,
+            slim_payload=self.slim_payload,
+            compress_payload=self.compress_payload,
+            simulation=self.simulation,
+            collapse_groups=self.collapse_groups
+        )
+        html_content = generator.generate(json_data, person_name, layout=layout)
         
         # ファイル名を生成
-        html_filename = f"{person_name}_ecomap.html"
+        html_filename = f"{self._output_name(data)}.html"
         html_path = os.path.join(self.output_dir, html_filename)
         
         # HTMLファイルを保存
@@ -594,17 +598,752 @@ class EcomapCreator:
         
         return html_path
 
+    def _generate_svg(
+        self,
+        data: Dict[str, Any],
+        nodes: List[Dict[str, Any]],
+        relations: List[Dict[str, Any]],
+        layout: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """SVGファイルを生成"""
+        person_name = data["person"].get("name", "不明")
+        
+        generator = SVGGenerator()
+        svg_content = generator.generate(
+            {"nodes": nodes, "relations": relations},
+            person_name,
+            positions=layout["positions"] if layout else None
+        )
+        
+        # ファイル名を生成
+        svg_filename = f"{self._output_name(data)}.svg"
+        svg_path = os.path.join(self.output_dir, svg_filename)
+        
+        # SVGファイルを保存
+        with open(svg_path, "w", encoding="utf-8") as f:
+            f.write(svg_content)
+        
+        return svg_path
+
+
+def index_main(argv: List[str]) -> int:
+    """
+    ケース一覧ページを生成
+
+    Args:
+        argv: サブコマンド以降の引数
+
+    Returns:
+        終了コード
+    """
+    parser = argparse.ArgumentParser(
+        prog="ecomap-creator index",
+        description="出力フォルダのエコマップから、検索できるケース一覧ページ（index.html）を生成します"
+    )
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        default="outputs",
+        help="エコマップJSON（*_ecomap.json）のあるディレクトリ（デフォルト: outputs）"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="ケース一覧の出力ディレクトリ（デフォルト: 入力と同じ）"
+    )
+    parser.add_argument(
+        "-v", "--visualization",
+        default="d3",
+        choices=["d3", "cytoscape"],
+        help="可視化ライブラリ（デフォルト: d3）"
+    )
+    args = parser.parse_args(argv)
+
+    json_paths = CaseloadIndex.find_ecomaps(args.directory)
+    if not json_paths:
+        print(f"\n✗ エラー: エコマップが見つかりません: {args.directory}", file=sys.stderr)
+        return 1
+
+    index = CaseloadIndex(args.output or args.directory, visualization=args.visualization)
+    for json_path in json_paths:
+        index.add_file(str(json_path))
+    index_path = index.write()
+
+    print(f"✓ ケース一覧を生成しました（{len(json_paths)}件）: {index_path}")
+    return 0
+
+
+def _collect_ecomap_paths(inputs: List[str]) -> List[str]:
+    """ファイルとディレクトリの指定から、エコマップJSONのパスを集める"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(str(p) for p in CaseloadIndex.find_ecomaps(item))
+        else:
+            paths.append(item)
+    return paths
+
+
+def merge_main(argv: List[str]) -> int:
+    """
+    組織全体の統合グラフを作成
+
+    Args:
+        argv: サブコマンド以降の引数
+
+    Returns:
+        終了コード
+    """
+    parser = argparse.ArgumentParser(
+        prog="ecomap-creator merge",
+        description="本人ごとのエコマップを、事業所・医療機関・医師などを共有した組織全体のグラフに統合します"
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="エコマップJSONファイル、またはそれを含むディレクトリ"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default=os.path.join("outputs", "organization_graph.json"),
+        help="統合グラフの出力先（既存ファイルがあればケースを追加・置き換え）"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="既存の統合グラフを使わずに作り直す"
+    )
+    parser.add_argument(
+        "--html",
+        action="store_true",
+        help="統合グラフのHTMLも出力する"
+    )
+    args = parser.parse_args(argv)
+
+    merger = GraphMerger() if args.rebuild else GraphMerger.load(args.output)
+    paths = _collect_ecomap_paths(args.inputs)
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            merger.add_ecomap(json.load(f))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    merger.save(args.output)
+    print(
+        f"✓ 統合グラフを保存しました（{len(paths)}件追加、計{len(merger.cases)}件）: {args.output}"
+    )
+
+    for node in merger.shared_nodes()[:10]:
+        print(f"  {node['name']}（{node['type']}）: {len(node['cases'])}人")
+
+    if args.html:
+        html_path = os.path.splitext(args.output)[0] + ".html"
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(HTMLGenerator().generate(merger.to_dict(), "組織全体"))
+        print(f"  HTMLファイル: {html_path}")
+
+    return 0
+
+
+def store_main(argv: List[str]) -> int:
+    """
+    エコマップをデータベースに一括登録
+
+    Args:
+        argv: サブコマンド以降の引数
+
+    Returns:
+        終了コード
+    """
+    parser = argparse.ArgumentParser(
+        prog="ecomap-creator store",
+        description="エコマップを索引付きのSQLiteデータベースに一括登録します（同じ本人のデータは置き換え）"
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="エコマップJSONファイル、またはそれを含むディレクトリ"
+    )
+    parser.add_argument(
+        "--db",
+        default=os.path.join("outputs", "ecomaps.sqlite"),
+        help="データベースファイル（デフォルト: outputs/ecomaps.sqlite）"
+    )
+    args = parser.parse_args(argv)
+
+    paths = _collect_ecomap_paths(args.inputs)
+    if not paths:
+        print("\n✗ エラー: エコマップが見つかりません", file=sys.stderr)
+        return 1
+
+    def read_ecomaps():
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                yield json.load(f), path
+
+    os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+    with EcomapStore(args.db) as store:
+        store.save_ecomaps(read_ecomaps())
+        total = len(store.cases())
+
+    print(f"✓ データベースに登録しました（{len(paths)}件、計{total}件）: {args.db}")
+    return 0
+
+
+def query_main(argv: List[str]) -> int:
+    """
+    登録したエコマップを横断検索
+
+    Args:
+        argv: サブコマンド以降の引数
+
+    Returns:
+        終了コード
+    """
+    parser = argparse.ArgumentParser(
+        prog="ecomap-creator query",
+        description="データベースに登録したエコマップ（ecomap-creator store）を横断検索します"
+    )
+    parser.add_argument(
+        "--db",
+        default=os.path.join("outputs", "ecomaps.sqlite"),
+        help="データベースファイル（デフォルト: outputs/ecomaps.sqlite）"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="結果をJSONで出力する"
+    )
+    questions = parser.add_subparsers(dest="question", required=True)
+    office_parser = questions.add_parser("office", help="事業所の利用者")
+    office_parser.add_argument("office", help="事業所番号または事業所名")
+    medication_parser = questions.add_parser("medication", help="処方薬を処方している医師")
+    medication_parser.add_argument("medication", help="処方薬の名前")
+    without_parser = questions.add_parser("without", help="指定したノードがない利用者")
+    without_parser.add_argument(
+        "node_type",
+        nargs="?",
+        default="ServicePlan",
+        help="ノードタイプ（デフォルト: ServicePlan）"
+    )
+    questions.add_parser("caseload", help="相談支援専門員ごとの担当件数")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"\n✗ エラー: データベースが見つかりません: {args.db}", file=sys.stderr)
+        print("  先に ecomap-creator store でエコマップを登録してください", file=sys.stderr)
+        return 1
 
-def main():
+    with EcomapStore(args.db) as store:
+        query = EcomapQuery(store)
+        if args.question == "office":
+            results = query.clients_by_office(args.office)
+            lines = [r["person_name"] for r in results]
+        elif args.question == "medication":
+            results = query.doctors_by_medication(args.medication)
+            lines = [
+                f"{r['doctor']}（{r['institution']}）: {'、'.join(r['clients'])}" for r in results
+            ]
+        elif args.question == "without":
+            results = query.people_without(args.node_type)
+            lines = [r["person_name"] for r in results]
+        else:
+            results = query.specialist_caseloads()
+            lines = [
+                f"{r['specialist']}（{r['office']}）: {r['count']}件 {'、'.join(r['clients'])}"
+                for r in results
+            ]
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for line in lines:
+            print(line)
+        print(f"（{len(results)}件）")
+    return 0
+
+
+def export_main(argv: List[str]) -> int:
+    """
+    エコマップを他のツール向けの形式で出力
+
+    Args:
+        argv: サブコマンド以降の引数
+
+    Returns:
+        終了コード
+    """
+    parser = argparse.ArgumentParser(
+        prog="ecomap-creator export",
+        description="エコマップを他のツール向けの形式で出力します（ケースは1件ずつ読み込んで書き出します）"
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="エコマップJSONファイル（統合グラフも可）、またはそれを含むディレクトリ"
+    )
+    parser.add_argument(
+        "-f", "--format",
+        default="neo4j",
+        choices=list(EXPORT_FORMATS),
+        help="出力形式（neo4j: neo4j-admin import 用CSV, graphml, gexf: Gephi・networkx 用）"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help=(
+            "出力先（neo4j はディレクトリ、それ以外はファイル。"
+            "デフォルト: outputs/ecomaps.<形式>）"
+        )
+    )
+    args = parser.parse_args(argv)
+
+    paths = _collect_ecomap_paths(args.inputs)
+    if not paths:
+        print("\n✗ エラー: エコマップが見つかりません", file=sys.stderr)
+        return 1
+
+    exporter_class, default_output = EXPORT_FORMATS[args.format]
+    output = args.output or default_output
+    with exporter_class(output) as exporter:
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                exporter.add_ecomap(json.load(f))
+
+    print(f"✓ {args.format} 形式で出力しました（{len(paths)}件）: {output}")
+    print(
+        f"  ノード: {len(exporter.written_node_ids)}, "
+        f"リレーション: {len(exporter.written_relation_ids)}"
+    )
+    if args.format == "neo4j":
+        print(f"  インポート: sh {os.path.join(output, 'import.sh')}")
+    return 0
+
+
+# 出力形式（出力クラス, デフォルトの出力先）
+EXPORT_FORMATS = {
+    "neo4j": (Neo4jExporter, os.path.join("outputs", "neo4j")),
+    "graphml": (GraphMLExporter, os.path.join("outputs", "ecomaps.graphml")),
+    "gexf": (GEXFExporter, os.path.join("outputs", "ecomaps.gexf")),
+}
+
+
+def update_main(argv: List[str]) -> int:
+    """
+    作成済みのエコマップに差分を反映
+
+    Args:
+        argv: サブコマンド以降の引数
+
+    Returns:
+        終了コード
+    """
+    parser = argparse.ArgumentParser(
+        prog="ecomap-creator update",
+        description="作成済みのエコマップJSONに、シートごとの行の追加・変更・削除（差分JSON）を反映し、"
+                    "変わった行のノードだけを生成してHTMLを出力し直します"
+    )
+    parser.add_argument("ecomap", help="作成済みのエコマップJSONファイル")
+    parser.add_argument(
+        "delta",
+        help=(
+            '差分JSONファイル（例: {"service_contracts": '
+            '{"added": [...], "changed": [{"row": 2, ...}], "removed": [3]}}）'
+        )
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="出力ディレクトリ（デフォルト: エコマップJSONと同じ）"
+    )
+    parser.add_argument(
+        "-v", "--visualization",
+        default="d3",
+        choices=["d3", "cytoscape"],
+        help="可視化ライブラリ（デフォルト: d3）"
+    )
+    parser.add_argument(
+        "--svg",
+        action="store_true",
+        help="印刷用の静的SVGも出力する"
+    )
+    parser.add_argument(
+        "--layout-cache",
+        metavar="DIR",
+        help="レイアウトキャッシュのディレクトリ（前回の配置を再利用し、新しいノードのみ配置）"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.delta, "r", encoding="utf-8") as f:
+            delta = json.load(f)
+        creator = EcomapCreator(
+            output_dir=args.output or os.path.dirname(args.ecomap) or ".",
+            visualization=args.visualization,
+            svg=args.svg,
+            layout_cache=args.layout_cache
+        )
+        json_path, html_path = creator.update(args.ecomap, delta)
+    except Exception as e:
+        print(f"\n✗ エラー: {e}", file=sys.stderr)
+        return 1
+
+    print(f"✓ 差分を反映しました: {json_path}")
+    print(f"  HTMLファイル: {html_path}")
+    return 0
+
+
+def diff_main(argv: List[str]) -> int:
+    """
+    2つの版のエコマップの差分レポートを作成
+
+    Args:
+        argv: サブコマンド以降の引数
+
+    Returns:
+        終了コード
+    """
+    parser = argparse.ArgumentParser(
+        prog="ecomap-creator diff",
+        description="同じ本人の2つの版のエコマップを比較し、追加・削除・変更されたノードとリレーションを"
+                    "色分けしたHTMLレポートに出力します（フォルダを指定すると本人ごとに一括比較）"
+    )
+    parser.add_argument(
+        "old",
+        help="前の版のエコマップJSONファイル、またはそれを含むディレクトリ"
+    )
+    parser.add_argument(
+        "new",
+        help="新しい版のエコマップJSONファイル、またはそれを含むディレクトリ"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default=os.path.join("outputs", "diff"),
+        help="差分レポートの出力ディレクトリ（デフォルト: outputs/diff）"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="差分をJSONで標準出力に出力する（HTMLレポートは出力しない。"
+             "片方のフォルダにしかないケースは added_cases / removed_cases に入る）"
+    )
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.old) and os.path.isdir(args.new):
+        pairs = EcomapDiff.pair_directories(args.old, args.new)
+    elif os.path.isfile(args.old) and os.path.isfile(args.new):
+        pairs = [(args.old, args.new)]
+    else:
+        print(
+            "\n✗ エラー: 2つのファイル、または2つのディレクトリを指定してください",
+            file=sys.stderr
+        )
+        return 1
+
+    results = []
+    added_cases = [str(new_path) for old_path, new_path in pairs if old_path is None]
+    removed_cases = [str(old_path) for old_path, new_path in pairs if new_path is None]
+    compared = [(old_path, new_path) for old_path, new_path in pairs if old_path and new_path]
+    if not args.json:
+        for path in added_cases:
+            print(f"  追加されたケース: {path}")
+        for path in removed_cases:
+            print(f"  削除されたケース: {path}")
+
+    for old_path, new_path in compared:
+        diff = EcomapDiff.from_files(str(old_path), str(new_path))
+        if args.json:
+            results.append(diff.to_dict())
+            continue
+
+        os.makedirs(args.output, exist_ok=True)
+        report_path = os.path.join(args.output, f"{diff.person.get('name', '不明')}_diff.html")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(diff.render_html())
+        summary = diff.summary()
+        print(
+            f"  {diff.person.get('name', '')}: "
+            + ", ".join(
+                f"{label} ノード{summary[f'{status}_nodes']}"
+                f"・リレーション{summary[f'{status}_relations']}"
+                for status, label in EcomapDiff.STATUS_LABELS.items()
+            )
+            + f" → {report_path}"
+        )
+
+    if args.json:
+        print(json.dumps(
+            {"cases": results, "added_cases": added_cases, "removed_cases": removed_cases},
+            ensure_ascii=False,
+            indent=2
+        ))
+    else:
+        print(f"✓ 差分レポートを作成しました（{len(compared)}件）: {args.output}")
+    return 0
+
+
+def _iso_date(value: str) -> str:
+    """日付の引数を検証（YYYY-MM-DD形式）"""
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"YYYY-MM-DD形式の日付を指定してください: {value}")
+    return value
+
+
+def snapshot_main(argv: List[str]) -> int:
+    """
+    作成済みのエコマップから指定した日付時点のエコマップを一括作成
+
+    Args:
+        argv: サブコマンド以降の引数
+
+    Returns:
+        終了コード
+    """
+    parser = argparse.ArgumentParser(
+        prog="ecomap-creator snapshot",
+        description="作成済みのエコマップから、手帳・支援区分・計画・契約・成年後見などの有効期間をもとに"
+                    "指定した日付に有効だったものだけのエコマップ（*_ecomap_YYYY-MM-DD.json/html）を作成します"
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="エコマップJSONファイル、またはそれを含むディレクトリ"
+    )
+    parser.add_argument(
+        "--as-of",
+        required=True,
+        type=_iso_date,
+        metavar="YYYY-MM-DD",
+        help="時点とする日付"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default=os.path.join("outputs", "snapshots"),
+        help="出力ディレクトリ（デフォルト: outputs/snapshots）"
+    )
+    parser.add_argument(
+        "-v", "--visualization",
+        default="d3",
+        choices=["d3", "cytoscape"],
+        help="可視化ライブラリ（デフォルト: d3）"
+    )
+    parser.add_argument(
+        "--svg",
+        action="store_true",
+        help="印刷用の静的SVGも出力する"
+    )
+    args = parser.parse_args(argv)
+
+    paths = _collect_ecomap_paths(args.inputs)
+    try:
+        creator = EcomapCreator(
+            output_dir=args.output,
+            visualization=args.visualization,
+            svg=args.svg,
+            as_of=args.as_of
+        )
+        outputs = creator.snapshot(paths)
+    except Exception as e:
+        print(f"\n✗ エラー: {e}", file=sys.stderr)
+        return 1
+
+    for json_path, _ in outputs:
+        print(f"  {json_path}")
+    print(f"✓ {args.as_of}時点のエコマップを作成しました（{len(outputs)}件）: {args.output}")
+    return 0
+
+
+def metrics_main(argv: List[str]) -> int:
+    """
+    統合グラフのネットワーク指標を計算
+
+    Args:
+        argv: サブコマンド以降の引数
+
+    Returns:
+        終了コード
+    """
+    parser = argparse.ArgumentParser(
+        prog="ecomap-creator metrics",
+        description="統合グラフの次数・媒介中心性・連結成分を計算し、多くの利用者を受け持つ職員と、"
+                    "多くの支援が経由する事業所・医療機関を一覧にします"
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=[os.path.join("outputs", "organization_graph.json")],
+        help="統合グラフ（merge の出力）、"
+             "またはエコマップJSONファイル・ディレクトリ（その場で統合）"
+             "（デフォルト: outputs/organization_graph.json）"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="一覧に載せる件数（デフォルト: 10）"
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        help="媒介中心性を近似する起点のノード数（省略時は全ノードで厳密に計算）"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="結果をJSONで出力する"
+    )
+    args = parser.parse_args(argv)
+
+    paths = _collect_ecomap_paths(args.inputs)
+    graph = None
+    merger = GraphMerger()
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"\n✗ エラー: {e}", file=sys.stderr)
+            return 1
+        if "cases" in data and len(paths) == 1:
+            graph = data
+        else:
+            merger.add_ecomap(data)
+    if graph is None:
+        graph = merger.to_dict()
+    if not graph["nodes"]:
+        print("\n✗ エラー: エコマップが見つかりません", file=sys.stderr)
+        return 1
+
+    report = NetworkMetrics(graph).report(top=args.top, samples=args.samples)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+
+    summary = report["summary"]
+    print(
+        f"ノード: {summary['node_count']}, エッジ: {summary['edge_count']}, "
+        f"連結成分: {summary['component_count']}（最大 {summary['largest_component']}ノード）"
+    )
+    print("\n次数の大きい職員:")
+    for item in report["staff_by_degree"]:
+        print(
+            f"  {item['name']}（{item['type']}）: "
+            f"次数 {item['degree']}, 利用者 {item['clients']}人"
+        )
+    print("\n媒介中心性の大きい事業所・医療機関:")
+    for item in report["providers_by_betweenness"]:
+        print(
+            f"  {item['name']}（{item['type']}）: "
+            f"{item['betweenness']:.4f}, 利用者 {item['clients']}人"
+        )
+    return 0
+
+
+def caseload_main(argv: List[str]) -> int:
+    """
+    職員別の担当件数レポートを作成
+
+    Args:
+        argv: サブコマンド以降の引数
+
+    Returns:
+        終了コード
+    """
+    parser = argparse.ArgumentParser(
+        prog="ecomap-creator caseload",
+        description="エコマップを1件ずつ読み込み、相談支援専門員・サービス管理責任者ごとの担当件数、"
+                    "期限の近い次回モニタリングと契約をCSVにまとめます"
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="エコマップJSONファイル、またはそれを含むディレクトリ"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default=os.path.join("outputs", "caseload_report.csv"),
+        help="レポートの出力先（デフォルト: outputs/caseload_report.csv）"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=CaseloadIndex.EXPIRY_WARNING_DAYS,
+        help=f"期限間近とみなす日数（デフォルト: {CaseloadIndex.EXPIRY_WARNING_DAYS}）"
+    )
+    parser.add_argument(
+        "--today",
+        type=_iso_date,
+        metavar="YYYY-MM-DD",
+        help="期限判定の基準日（デフォルト: 今日）"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="レポートをJSONで標準出力に出力する（CSVは出力しない）"
+    )
+    args = parser.parse_args(argv)
+
+    paths = _collect_ecomap_paths(args.inputs)
+    if not paths:
+        print("\n✗ エラー: エコマップが見つかりません", file=sys.stderr)
+        return 1
+
+    report = StaffCaseloadReport(
+        today=date.fromisoformat(args.today) if args.today else None,
+        warning_days=args.days
+    )
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            report.add_ecomap(json.load(f))
+
+    if args.json:
+        print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+        return 0
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    report.write_csv(args.output)
+    for row in report.rows():
+        print(
+            f"  {row['role']} {row['name']}（{row['office']}）: {row['count']}件"
+            f"、モニタリング {len(row['monitoring'])}件、契約 {len(row['expiring_contracts'])}件"
+        )
+    print(f"✓ 担当件数レポートを作成しました（{report.case_count}件）: {args.output}")
+    return 0
+
+
+# サブコマンド（先頭の引数で判定し、従来の「ecomap-creator 入力ファイル」形式と両立させる）
+SUBCOMMANDS = {
+    "index": index_main,
+    "merge": merge_main,
+    "store": store_main,
+    "query": query_main,
+    "export": export_main,
+    "update": update_main,
+    "diff": diff_main,
+    "snapshot": snapshot_main,
+    "metrics": metrics_main,
+    "caseload": caseload_main,
+}
+
+
+def main(argv: Optional[List[str]] = None):
     """メイン関数"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in SUBCOMMANDS:
+        return SUBCOMMANDS[argv[0]](argv[1:])
+
     parser = argparse.ArgumentParser(
-        description="エコマップ作成スキル - 対話形式またはExcelファイルから支援情報を読み込み、エコマップを生成します"
+        description="エコマップ作成スキル - 対話形式またはExcelファイルから支援情報を読み込み、"
+                    "エコマップを生成します",
+        epilog="サブコマンド:\n" + "\n".join(
+            f"  {name:<10} {command.__doc__.strip().splitlines()[0]}"
+            for name, command in SUBCOMMANDS.items()
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter
     )
 
     parser.add_argument(
         "input_file",
         nargs="?",  # オプショナル引数に変更
-        help="入力Excelファイルパス（省略すると対話モード）"
+        help="入力Excelファイルパス、またはシートごとのCSV/TSVファイルのディレクトリ（省略すると対話モード）"
     )
 
     parser.add_argument(
@@ -626,6 +1365,64 @@ def main():
         help="可視化ライブラリ（デフォルト: d3）"
     )
     
+    parser.add_argument(
+        "--svg",
+        action="store_true",
+        help="印刷用の静的SVGも出力する（ブラウザ不要）"
+    )
+    
+    parser.add_argument(
+        "--slim-payload",
+        action="store_true",
+        help="HTMLには描画用データのみ埋め込み、詳細情報はクリック時に読み込む"
+    )
+    
+    parser.add_argument(
+        "--compress-payload",
+        action="store_true",
+        help="HTMLに埋め込むデータを圧縮する（ブラウザで展開。HTMLファイルだけで表示できる）"
+    )
+    
+    parser.add_argument(
+        "--simulation",
+        default="main",
+        choices=list(HTMLGenerator.SIMULATION_MODES),
+        help="D3.js版の力学シミュレーションの実行方式"
+             "（worker: Web Workerで実行、throttled: 収束後に停止する省電力方式、デフォルト: main）"
+    )
+    
+    parser.add_argument(
+        "--no-collapse",
+        action="store_true",
+        help="処方薬・契約などを集約ノードにまとめず、すべて個別に表示する"
+    )
+    
+    parser.add_argument(
+        "--layout-cache",
+        metavar="DIR",
+        help="レイアウトキャッシュのディレクトリ（前回の配置を再利用し、新しいノードのみ配置）"
+    )
+    
+    parser.add_argument(
+        "--import-layout",
+        metavar="FILE",
+        help="ビューアーの「配置を保存」でダウンロードしたレイアウトファイルを初期配置に使う"
+    )
+    
+    parser.add_argument(
+        "--as-of",
+        type=_iso_date,
+        metavar="YYYY-MM-DD",
+        help="指定した日付時点で有効な手帳・支援区分・計画・契約などだけのエコマップを作成する"
+    )
+    
+    parser.add_argument(
+        "--csv-encoding",
+        default="utf-8-sig",
+        help="入力がCSV/TSVファイルのディレクトリの場合の文字コード"
+             "（デフォルト: utf-8-sig、Shift_JISは cp932）"
+    )
+    
     parser.add_argument(
         "-d", "--debug",
         action="store_true",
@@ -638,7 +1435,7 @@ def main():
         version=f"%(prog)s {EcomapCreator.VERSION}"
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # モード判定: ファイルが指定されていない、または-iフラグがある場合は対話モード
     interactive_mode = args.interactive or (args.input_file is None and sys.stdin.isatty())
@@ -668,7 +1465,16 @@ def main():
             output_dir=args.output,
             visualization=args.visualization,
             debug=args.debug,
-            interactive=False
+            interactive=False,
+            svg=args.svg,
+            slim_payload=args.slim_payload,
+            compress_payload=args.compress_payload,
+            simulation=args.simulation,
+            layout_cache=args.layout_cache,
+            import_layout=args.import_layout,
+            collapse_groups=not args.no_collapse,
+            as_of=args.as_of,
+            csv_encoding=args.csv_encoding
         )
 
         json_path, html_path = creator.run()
@@ -8,17 +8,60 @@ __version__ = "1.0.0"
 __author__ = "K. Kawahara"
 
 from .excel_reader import ExcelReader
+from .csv_reader import CSVDirectoryReader
 from .date_converter import DateConverter
 from .validator import Validator
 from .node_generator import NodeGenerator
+from .relation_rules import RelationRuleEngine
 from .relation_generator import RelationGenerator
+from .history_builder import HistoryBuilder
 from .html_generator import HTMLGenerator
+from .layout_engine import LayoutEngine
+from .svg_generator import SVGGenerator
+from .node_identity import NodeIdentity
+from .layout_cache import LayoutCache
+from .node_aggregator import NodeAggregator
+from .caseload_index import CaseloadIndex
+from .entity_resolver import EntityResolver
+from .graph_merger import GraphMerger
+from .ecomap_store import EcomapStore
+from .ecomap_query import EcomapQuery
+from .neo4j_exporter import Neo4jExporter
+from .graph_exporter import GraphMLExporter, GEXFExporter
+from .delta_updater import DeltaUpdater
+from .ecomap_diff import EcomapDiff
+from .interval_index import IntervalIndex, ValidityIndex
+from .network_metrics import SparseAdjacency, NetworkMetrics
+from .staff_caseload import StaffCaseloadReport
 
 __all__ = [
     "ExcelReader",
+    "CSVDirectoryReader",
     "DateConverter",
     "Validator",
     "NodeGenerator",
     "RelationGenerator",
+    "RelationRuleEngine",
+    "HistoryBuilder",
     "HTMLGenerator",
+    "LayoutEngine",
+    "SVGGenerator",
+    "NodeIdentity",
+    "LayoutCache",
+    "NodeAggregator",
+    "CaseloadIndex",
+    "EntityResolver",
+    "GraphMerger",
+    "EcomapStore",
+    "EcomapQuery",
+    "Neo4jExporter",
+    "GraphMLExporter",
+    "GEXFExporter",
+    "DeltaUpdater",
+    "EcomapDiff",
+    "IntervalIndex",
+    "ValidityIndex",
+    "SparseAdjacency",
+    "NetworkMetrics",
+    "StaffCaseloadReport",
 ]
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ケース一覧モジュール
+
+出力フォルダのエコマップ（*_ecomap.json）から、検索用の索引を埋め込んだ
+ケース一覧ページ（index.html）を生成します。各ケースのデータは
+cases/ID.js に分けて保存し、一覧で選んだときにだけ共通ビューアー
+（viewer.html）が読み込みます。
+"""
+
+import json
+import unicodedata
+from datetime import date, datetime
+from html import escape
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from .html_generator import HTMLGenerator
+from .layout_cache import LayoutCache
+
+
+class CaseloadIndex:
+    """ケース一覧クラス"""
+
+    # 期限間近とみなす日数
+    EXPIRY_WARNING_DAYS = 90
+
+    # 期限を確認するノードタイプと日付プロパティ
+    EXPIRY_FIELDS = {
+        "RyoikuNotebook": ("expiry_date", "療育手帳の有効期限"),
+        "MentalHealthNotebook": ("expiry_date", "精神保健福祉手帳の有効期限"),
+        "PhysicalDisabilityNotebook": ("expiry_date", "身体障害者手帳の有効期限"),
+        "SupportLevel": ("expiry_date", "支援区分の有効期限"),
+        "ServicePlan": ("next_monitoring_date", "次回モニタリング"),
+    }
+
+    # 置き換えられた記録の状態（更新前の手帳・過去の計画など。期限を確認しない）
+    SUPERSEDED_STATUSES = ("更新済み", "過去")
+
+    # 一覧に表示する事業所のノードタイプ
+    OFFICE_TYPES = ("ConsultationSupport", "SupportService")
+
+    FLAG_LABELS = {"expired": "期限切れ", "expiring": "期限間近"}
+
+    def __init__(self, output_dir: str, visualization: str = "d3", today: Optional[date] = None):
+        """
+        初期化
+
+        Args:
+            output_dir: index.html・viewer.html・cases/ を出力するディレクトリ
+            visualization: 共通ビューアーの可視化ライブラリ（"d3" or "cytoscape"）
+            today: 期限判定の基準日（省略時は今日）
+        """
+        self.output_dir = Path(output_dir)
+        self.html_generator = HTMLGenerator(visualization)
+        self.today = today or date.today()
+        self.entries: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def find_ecomaps(directory: str) -> List[Path]:
+        """ディレクトリ内のエコマップJSON（*_ecomap.json）を名前順に取得"""
+        return sorted(Path(directory).glob("*_ecomap.json"))
+
+    def add_case(self, json_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        ケースを追加
+
+        ケースのデータファイルはその場で書き出し、索引には検索用の項目のみ残します。
+
+        Args:
+            json_data: エコマップのJSONデータ
+
+        Returns:
+            索引の項目
+        """
+        entry = self.build_entry(json_data)
+
+        cases_dir = self.output_dir / "cases"
+        cases_dir.mkdir(parents=True, exist_ok=True)
+        payload = self.html_generator.build_case_payload(json_data)
+        payload_json = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        payload_json = payload_json.replace("</", "<\\/")
+        with open(cases_dir / f"{entry['id']}.js", "w", encoding="utf-8") as f:
+            f.write(f"loadEcomapCase({payload_json});\n")
+
+        self.entries.append(entry)
+        return entry
+
+    def add_file(self, json_path: str) -> Dict[str, Any]:
+        """エコマップJSONファイルを読み込んでケースを追加"""
+        with open(json_path, "r", encoding="utf-8") as f:
+            return self.add_case(json.load(f))
+
+    def build_entry(self, json_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        索引の項目を作成
+
+        Args:
+            json_data: エコマップのJSONデータ
+
+        Returns:
+            id, name, age, offices, specialists, expiries, flags, search を含む辞書
+        """
+        person = json_data.get("person", {})
+        nodes = json_data.get("nodes", [])
+
+        offices = self._unique(
+            n.get("name", "") for n in nodes if n.get("type") in self.OFFICE_TYPES
+        )
+        specialists = self._unique(
+            n.get("name", "") for n in nodes if n.get("type") == "ConsultationSupportSpecialist"
+        )
+
+        expiries = []
+        for node in nodes:
+            field = self.EXPIRY_FIELDS.get(node.get("type"))
+            if not field or self._is_superseded(node):
+                continue
+            value = node.get("properties", {}).get(field[0])
+            status = self._expiry_status(value)
+            if status:
+                expiries.append({"label": field[1], "date": value, "status": status})
+        expiries.sort(key=lambda e: e["date"])
+
+        flags = [flag for flag in self.FLAG_LABELS if any(e["status"] == flag for e in expiries)]
+        search_text = "".join([person.get("name", "")] + offices + specialists)
+
+        return {
+            "id": LayoutCache.person_key(person),
+            "name": person.get("name", ""),
+            "age": person.get("age", ""),
+            "offices": offices,
+            "specialists": specialists,
+            "expiries": expiries,
+            "flags": flags,
+            "search": self.normalize(search_text),
+        }
+
+    def write(self) -> Path:
+        """
+        ケース一覧ページと共通ビューアーを出力
+
+        Returns:
+            index.html のパス
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        with open(self.output_dir / "viewer.html", "w", encoding="utf-8") as f:
+            f.write(self.html_generator.generate_case_viewer())
+
+        index_path = self.output_dir / "index.html"
+        with open(index_path, "w", encoding="utf-8") as f:
+            f.write(self.render_index())
+        return index_path
+
+    def render_index(self) -> str:
+        """ケース一覧ページのHTMLを生成"""
+        entries = sorted(self.entries, key=lambda e: (e["search"], e["id"]))
+        index_json = json.dumps(entries, ensure_ascii=False, separators=(",", ":"))
+        index_json = index_json.replace("</", "<\\/")
+        flag_options = "".join(
+            f'<option value="{flag}">{escape(label)}</option>'
+            for flag, label in self.FLAG_LABELS.items()
+        )
+
+        return f"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>ケース一覧</title>
+    <style>
+        body {{
+            margin: 0;
+            font-family: 'Hiragino Sans', 'Yu Gothic', sans-serif;
+            display: flex;
+            height: 100vh;
+        }}
+
+        #sidebar {{
+            width: 320px;
+            display: flex;
+            flex-direction: column;
+            border-right: 1px solid #e0e0e0;
+            background-color: #fafafa;
+        }}
+
+        #filters {{
+            padding: 12px;
+            border-bottom: 1px solid #e0e0e0;
+        }}
+
+        #filters input, #filters select {{
+            width: 100%;
+            box-sizing: border-box;
+            margin-bottom: 6px;
+            padding: 6px;
+        }}
+
+        #case-count {{
+            font-size: 12px;
+            color: #666;
+        }}
+
+        #case-list {{
+            list-style: none;
+            margin: 0;
+            padding: 0;
+            overflow-y: auto;
+            flex: 1;
+        }}
+
+        #case-list li {{
+            padding: 10px 12px;
+            border-bottom: 1px solid #eee;
+            cursor: pointer;
+        }}
+
+        #case-list li.selected {{
+            background-color: #e3f2fd;
+        }}
+
+        .case-offices {{
+            font-size: 12px;
+            color: #666;
+        }}
+
+        .flag {{
+            font-size: 11px;
+            padding: 1px 6px;
+            border-radius: 8px;
+            margin-left: 4px;
+            color: white;
+        }}
+
+        .flag-expired {{
+            background-color: #e53935;
+        }}
+
+        .flag-expiring {{
+            background-color: #fb8c00;
+        }}
+
+        #viewer {{
+            flex: 1;
+            border: none;
+        }}
+    </style>
+</head>
+<body>
+    <div id="sidebar">
+        <div id="filters">
+            <input type="search" id="search" placeholder="氏名・事業所・相談支援専門員で検索">
+            <select id="flag-filter">
+                <option value="">すべて</option>{flag_options}
+            </select>
+            <div id="case-count"></div>
+        </div>
+        <ul id="case-list"></ul>
+    </div>
+    <iframe id="viewer" title="エコマップ"></iframe>
+
+    <script type="application/json" id="caseload-index">{index_json}</script>
+    <script>
+        // 検索用の索引（生成時に作成済み）
+        const cases = JSON.parse(document.getElementById('caseload-index').textContent);
+        const flagLabels = {json.dumps(self.FLAG_LABELS, ensure_ascii=False)};
+
+        function normalize(text) {{
+            return text.normalize('NFKC').replace(/\\s+/g, '').toLowerCase();
+        }}
+
+        function escapeHtml(value) {{
+            return String(value).replace(/[&<>"']/g, c => ({{
+                '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+            }})[c]);
+        }}
+
+        const list = document.getElementById('case-list');
+        const search = document.getElementById('search');
+        const flagFilter = document.getElementById('flag-filter');
+        let selectedId = null;
+
+        function renderList() {{
+            const query = normalize(search.value);
+            const flag = flagFilter.value;
+            const rows = cases.filter(c =>
+                (!query || c.search.includes(query)) && (!flag || c.flags.includes(flag)));
+            list.innerHTML = rows.map(c => {{
+                const flags = c.flags
+                    .map(f => `<span class="flag flag-${{f}}">${{flagLabels[f]}}</span>`)
+                    .join('');
+                const selected = c.id === selectedId ? ' class="selected"' : '';
+                return `<li data-id="${{c.id}}"${{selected}}>` +
+                    `<strong>${{escapeHtml(c.name)}}</strong>${{flags}}` +
+                    `<div class="case-offices">${{escapeHtml(c.offices.join('、'))}}</div></li>`;
+            }}).join('');
+            document.getElementById('case-count').textContent =
+                `${{rows.length}} / ${{cases.length}} 件`;
+        }}
+
+        // エコマップは選んだときにだけ読み込む（ビューアー本体はブラウザにキャッシュされる）
+        function openCase(id) {{
+            selectedId = id;
+            document.getElementById('viewer').src = `viewer.html?case=${{encodeURIComponent(id)}}`;
+            renderList();
+        }}
+
+        list.addEventListener('click', event => {{
+            const item = event.target.closest('li');
+            if (item) {{
+                openCase(item.dataset.id);
+            }}
+        }});
+        search.addEventListener('input', renderList);
+        flagFilter.addEventListener('change', renderList);
+
+        renderList();
+    </script>
+</body>
+</html>"""
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """検索用に正規化（NFKC・空白除去・小文字化）"""
+        return "".join(unicodedata.normalize("NFKC", text).split()).lower()
+
+    def _is_superseded(self, node: Dict[str, Any]) -> bool:
+        """更新・変更・見直しで新しい記録に置き換えられたノードかどうか"""
+        history = node.get("history")
+        if history and not history.get("is_current", True):
+            return True
+        return node.get("properties", {}).get("status") in self.SUPERSEDED_STATUSES
+
+    def _expiry_status(self, value: Any) -> Optional[str]:
+        """期限の状態（"expired", "expiring", "ok"）。日付でなければNone"""
+        if not value:
+            return None
+        try:
+            expiry = datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+        except ValueError:
+            return None
+
+        days = (expiry - self.today).days
+        if days < 0:
+            return "expired"
+        if days <= self.EXPIRY_WARNING_DAYS:
+            return "expiring"
+        return "ok"
+
+    def _unique(self, values) -> List[str]:
+        """空文字を除き、順序を保って重複を除去"""
+        result = []
+        for value in values:
+            if value and value not in result:
+                result.append(value)
+        return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("=== CaseloadIndex テスト ===")
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else "outputs"
+    index = CaseloadIndex(directory)
+    for path in CaseloadIndex.find_ecomaps(directory):
+        entry = index.add_file(str(path))
+        print(f"{entry['name']}: {entry['flags']}")
+    print(f"ケース一覧を生成しました: {index.write()}")
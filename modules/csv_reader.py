@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CSV/TSV読み込みモジュール
+
+シートごとのCSV/TSVファイルを置いたディレクトリから、ExcelReader と同じ形式のデータを読み込みます。
+各ファイルはテンプレートのシートをそのまま保存した並び（1行目: 見出し、2行目: 列名、
+3行目以降: データ。本人情報はA列: 項目名、B列: 値）で、1行ずつ読み込みます。
+ファイル名はシート名（例: サービス利用情報.csv）またはデータの種類
+（例: service_contracts.tsv）です。
+"""
+
+import csv
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from .node_generator import NodeGenerator
+
+
+class CSVDirectoryReader:
+    """CSV/TSVディレクトリ読み込みクラス"""
+
+    # 拡張子と区切り文字
+    DELIMITERS = {".csv": ",", ".tsv": "\t"}
+
+    # 本人情報の項目（2行目から1行ずつ、B列の値）
+    PERSON_FIELDS = [
+        "name", "birth_date", "gender", "address", "postal_code", "phone", "emergency_contact",
+        "notes",
+    ]
+
+    # 一覧のシートの列（A列から順）と、空なら行を読み飛ばす列
+    COLUMNS: Dict[str, Tuple[str, List[str]]] = {
+        "family": ("name", [
+            "name", "relation", "birth_date", "gender", "living_together", "primary_caregiver",
+            "address", "phone", "notes",
+        ]),
+        "notebooks": ("type", [
+            "type", "grade", "number", "issue_date", "expiry_date", "issuing_authority", "status",
+            "notes",
+        ]),
+        "support_levels": ("level", [
+            "level", "decision_date", "expiry_date", "deciding_authority", "assessor", "status",
+            "notes",
+        ]),
+        "diagnoses": ("name", [
+            "name", "icd10_code", "diagnosis_date", "doctor", "institution", "status", "notes",
+        ]),
+        "legal_guardians": ("name", [
+            "name", "type", "category", "profession", "start_date", "authority", "contact", "notes",
+        ]),
+        "consultation_supports": ("office_name", [
+            "office_name", "office_number", "support_type", "specialist", "address", "phone",
+            "contract_date", "notes",
+        ]),
+        "service_plans": ("creation_date", [
+            "plan_number", "creation_date", "last_monitoring_date", "next_monitoring_date",
+            "status", "notes",
+        ]),
+        "service_contracts": ("service_type", [
+            "service_type", "office_name", "office_number", "manager", "address", "phone",
+            "contract_date", "frequency", "days", "status", "notes",
+        ]),
+        "medical_institutions": ("name", [
+            "name", "department", "doctor", "primary_doctor", "address", "phone", "start_date",
+            "frequency", "treatment", "medications", "notes",
+        ]),
+    }
+
+    # データ行の開始行（1始まり）
+    FIRST_DATA_ROW = 3
+
+    def __init__(self, directory: str, encoding: str = "utf-8-sig"):
+        """
+        初期化
+
+        Args:
+            directory: CSV/TSVファイルのあるディレクトリ
+            encoding: 文字コード（既定はBOM付きにも対応したUTF-8。Shift_JISは "cp932"）
+        """
+        self.directory = Path(directory)
+        self.encoding = encoding
+
+    def load(self) -> Dict[str, Any]:
+        """
+        ディレクトリ内のCSV/TSVファイルを読み込み、全データを返す
+
+        Returns:
+            全データの辞書（ExcelReader.load と同じ形式。ファイルのないシートは空）
+        """
+        data: Dict[str, Any] = {"person": self.read_person_info()}
+        for source in self.COLUMNS:
+            data[source] = self.read_sheet(source)
+        return data
+
+    def read_person_info(self) -> Dict[str, Any]:
+        """本人情報ファイルを読み込み"""
+        rows = self._rows("person")
+        if rows is None:
+            return {}
+
+        data = {field: "" for field in self.PERSON_FIELDS}
+        for row_number, row in enumerate(rows, 1):
+            index = row_number - 2
+            if 0 <= index < len(self.PERSON_FIELDS):
+                data[self.PERSON_FIELDS[index]] = self._value(row, 1)
+        return data
+
+    def read_sheet(self, source: str) -> List[Dict[str, Any]]:
+        """
+        一覧のシートのファイルを読み込み
+
+        Args:
+            source: データの種類（"service_contracts" など）
+
+        Returns:
+            行のデータのリスト（読み飛ばす列が空の行は除く）
+        """
+        rows = self._rows(source)
+        if rows is None:
+            return []
+
+        key_field, fields = self.COLUMNS[source]
+        data_list = []
+        for row_number, row in enumerate(rows, 1):
+            if row_number < self.FIRST_DATA_ROW:
+                continue
+            data = {field: self._value(row, i) for i, field in enumerate(fields)}
+            if data[key_field] == "":
+                continue
+            data_list.append(data)
+        return data_list
+
+    def find_file(self, source: str) -> Optional[Path]:
+        """データの種類のファイル（シート名、またはデータの種類の名前の .csv / .tsv）"""
+        for name in (NodeGenerator.SOURCE_SHEETS[source], source):
+            for extension in self.DELIMITERS:
+                path = self.directory / f"{name}{extension}"
+                if path.is_file():
+                    return path
+        return None
+
+    def _rows(self, source: str) -> Optional[Iterator[List[str]]]:
+        """ファイルの行を1行ずつ返すイテレーター（ファイルがなければNone）"""
+        path = self.find_file(source)
+        if path is None:
+            return None
+
+        def rows():
+            with open(path, "r", encoding=self.encoding, newline="") as f:
+                yield from csv.reader(f, delimiter=self.DELIMITERS[path.suffix])
+
+        return rows()
+
+    @staticmethod
+    def _value(row: List[str], index: int) -> str:
+        """列の値（前後の空白を削除。列がなければ空文字列）"""
+        return row[index].strip() if index < len(row) else ""
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    print("=== CSVDirectoryReader テスト ===")
+
+    if len(sys.argv) < 2:
+        print("使用方法: python csv_reader.py <CSV/TSVファイルのディレクトリ>")
+        sys.exit(1)
+
+    print(json.dumps(CSVDirectoryReader(sys.argv[1]).load(), ensure_ascii=False, indent=2))
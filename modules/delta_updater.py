@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+差分更新モジュール
+
+作成済みのエコマップJSONに、シートごとの行の追加・変更・削除（差分）を反映します。
+Excelファイル全体を読み直さず、差分の行のノードだけを生成し、
+リレーションはリレーションルールで求め直して、変わらないものは元のリレーションをそのまま残します。
+
+差分の形式（行番号はエコマップのノードの出典に記録した、シート内のデータ行の番号）:
+
+    {
+        "service_contracts": {
+            "added": [{"service_type": "短期入所", "office_name": "…", ...}],
+            "changed": [{"row": 2, "service_type": "生活介護", "office_name": "…", ...}],
+            "removed": [3]
+        }
+    }
+"""
+
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+from .history_builder import HistoryBuilder
+from .node_generator import NodeGenerator
+from .relation_rules import RelationRuleEngine
+
+
+class DeltaUpdater:
+    """差分更新クラス"""
+
+    # 差分を反映できるデータの種類（本人情報は対象外）
+    SOURCES = tuple(source for source in NodeGenerator.SOURCE_SHEETS if source != "person")
+
+    # 他のノードのIDを記録するプロパティ（(ノードタイプ, プロパティ名) → 参照先のノードタイプ）
+    REFERENCES = {
+        ("ConsultationSupportSpecialist", "office_id"): "ConsultationSupport",
+        ("ServiceManager", "office_id"): "SupportService",
+        ("Doctor", "institution_id"): "MedicalInstitution",
+        ("Medication", "doctor_id"): "Doctor",
+    }
+
+    def __init__(self, json_data: Dict[str, Any], engine: Optional[RelationRuleEngine] = None):
+        """
+        初期化
+
+        Args:
+            json_data: エコマップのJSONデータ（person, nodes, relations, metadata）。
+                更新時に書き換えます
+            engine: リレーションルールエンジン（省略時は既定のルール表）
+        """
+        self.json_data = json_data
+        self.engine = engine or RelationRuleEngine.default()
+
+    @classmethod
+    def records(cls, delta: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        差分に含まれる行のデータ（追加・変更）をデータの種類ごとに取り出す
+
+        検証・日付変換の対象を集めるのに使います（戻り値の辞書は差分と同じオブジェクト）。
+
+        Args:
+            delta: 差分
+
+        Returns:
+            データの種類 → 行のデータのリスト
+
+        Raises:
+            ValueError: 差分を反映できないデータの種類が含まれる場合
+        """
+        result = {}
+        for source, changes in delta.items():
+            if source not in cls.SOURCES:
+                raise ValueError(f"差分を反映できないデータの種類です: {source}")
+            result[source] = list(changes.get("added", [])) + list(changes.get("changed", []))
+        return result
+
+    def apply(self, delta: Dict[str, Any]) -> Dict[str, int]:
+        """
+        差分を反映
+
+        Args:
+            delta: 差分（データの種類 → added / changed / removed）
+
+        Returns:
+            追加・削除したノードとリレーションの件数
+
+        Raises:
+            ValueError: 差分を反映できないデータの種類、または存在しない行が含まれる場合
+        """
+        self.records(delta)
+        nodes = self.json_data["nodes"]
+        sources = [source for source in self.SOURCES if source in delta]
+        last_rows = self._last_rows(nodes)
+
+        # 1. 削除・変更する行のノードを取り除く（複数の行で共有するノードは行だけ取り除く）
+        removed_rows: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        for source in sources:
+            changes = delta[source]
+            rows = set(changes.get("removed", []))
+            rows |= {record["row"] for record in changes.get("changed", [])}
+            unknown = sorted(row for row in rows if not 1 <= row <= last_rows.get(source, 0))
+            if unknown:
+                raise ValueError(
+                    f"{NodeGenerator.SOURCE_SHEETS[source]}に存在しない行です: {unknown}"
+                )
+            removed_rows.update(self._remove_rows(source, rows))
+        removed_nodes = [node for row_nodes in removed_rows.values() for node in row_nodes]
+        self._repair_references({node["id"] for node in removed_nodes})
+
+        # 2. 追加・変更する行のノードだけを生成（既存の事業所・職員ノードは再利用）
+        generator = NodeGenerator()
+        generator.register_existing(self.json_data["nodes"])
+        added_nodes = []
+        for source in sources:
+            changes = delta[source]
+            records = [
+                (record["row"], {k: v for k, v in record.items() if k != "row"})
+                for record in changes.get("changed", [])
+            ]
+            records.extend(enumerate(changes.get("added", []), last_rows.get(source, 0) + 1))
+            added_nodes.extend(generator.generate_source_nodes(source, records))
+        self._reuse_ids(added_nodes, removed_rows)
+        self.json_data["nodes"].extend(added_nodes)
+
+        # 3. リレーションを求め直し、変わらないリレーションは元のものを残す
+        added_relations, removed_relations = self._reconcile_relations()
+
+        # 変更した行で元のIDを引き継いだノードは、追加・削除ではなく変更として数える
+        kept_ids = {node["id"] for node in added_nodes} & {node["id"] for node in removed_nodes}
+        metadata = self.json_data.setdefault("metadata", {})
+        metadata["updated_at"] = datetime.now().isoformat()
+        metadata["node_count"] = len(self.json_data["nodes"])
+        metadata["relation_count"] = len(self.json_data["relations"])
+
+        return {
+            "added_nodes": len(added_nodes) - len(kept_ids),
+            "changed_nodes": len(kept_ids),
+            "removed_nodes": len(removed_nodes) - len(kept_ids),
+            "added_relations": added_relations,
+            "removed_relations": removed_relations,
+        }
+
+    def _last_rows(self, nodes: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """データの種類ごとの最後の行番号（追加する行はその次から番号を付ける）"""
+        last_rows: Dict[str, int] = {}
+        for node in nodes:
+            provenance = node.get("provenance")
+            if provenance and provenance["rows"]:
+                source = provenance["source"]
+                last_rows[source] = max(last_rows.get(source, 0), max(provenance["rows"]))
+        return last_rows
+
+    def _remove_rows(
+        self,
+        source: str,
+        rows: Set[int]
+    ) -> Dict[Tuple[str, int], List[Dict[str, Any]]]:
+        """
+        指定した行のノードを取り除く
+
+        Returns:
+            (データの種類, 行) → 取り除いたノードのリスト（変更した行のIDの引き継ぎに使用）
+        """
+        removed: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        if not rows:
+            return removed
+
+        kept = []
+        for node in self.json_data["nodes"]:
+            provenance = node.get("provenance")
+            if not provenance or provenance["source"] != source:
+                kept.append(node)
+                continue
+            remaining = [row for row in provenance["rows"] if row not in rows]
+            if remaining:
+                provenance["rows"] = remaining
+                kept.append(node)
+            else:
+                removed.setdefault((source, provenance["rows"][0]), []).append(node)
+        self.json_data["nodes"] = kept
+        return removed
+
+    def _repair_references(self, removed_ids: Set[str]):
+        """取り除いたノードを参照している共有ノードを、残っている行の同じタイプのノードに付け替える"""
+        if not removed_ids:
+            return
+        by_row = {}
+        for node in self.json_data["nodes"]:
+            provenance = node.get("provenance")
+            if provenance:
+                for row in provenance["rows"]:
+                    by_row.setdefault((provenance["source"], row, node["type"]), node)
+
+        for node in self.json_data["nodes"]:
+            properties = node.get("properties", {})
+            provenance = node.get("provenance", {})
+            for (node_type, name), target_type in self.REFERENCES.items():
+                if node["type"] != node_type or properties.get(name) not in removed_ids:
+                    continue
+                for row in provenance.get("rows", []):
+                    replacement = by_row.get((provenance["source"], row, target_type))
+                    if replacement:
+                        properties[name] = replacement["id"]
+                        break
+
+    def _reuse_ids(
+        self,
+        added_nodes: List[Dict[str, Any]],
+        removed_rows: Dict[Tuple[str, int], List[Dict[str, Any]]]
+    ):
+        """変更した行から生成したノードに、同じ行・同じタイプの元のノードのIDを引き継ぐ（同じ名前を優先）"""
+        id_map = {}
+        for same_name in (True, False):
+            for node in added_nodes:
+                if node["id"] in id_map:
+                    continue
+                provenance = node["provenance"]
+                previous = removed_rows.get((provenance["source"], provenance["rows"][0]), [])
+                match = next(
+                    (
+                        old for old in previous
+                        if old["type"] == node["type"]
+                        and (old["name"] == node["name"] or not same_name)
+                    ),
+                    None
+                )
+                if match:
+                    previous.remove(match)
+                    id_map[node["id"]] = match["id"]
+
+        for node in added_nodes:
+            node["id"] = id_map.get(node["id"], node["id"])
+
+        for node in added_nodes:
+            properties = node.get("properties", {})
+            for node_type, name in self.REFERENCES:
+                if node["type"] == node_type and properties.get(name) in id_map:
+                    properties[name] = id_map[properties[name]]
+
+    def _reconcile_relations(self) -> Tuple[int, int]:
+        """
+        リレーションを求め直す
+
+        同じ (タイプ, 始点, 終点) のリレーションが既にあれば元のもの（IDなど）を残します。
+        ルール・履歴で生成しない種類のリレーションは、両端のノードが残っていれば残します。
+
+        Returns:
+            (追加したリレーション数, 削除したリレーション数)
+        """
+        node_ids = {node["id"] for node in self.json_data["nodes"]}
+        rule_types = {rule["relation_type"] for rule in self.engine.rules}
+        rule_types |= set(HistoryBuilder.RELATION_TYPES)
+        existing = {
+            (relation["type"], relation["source_id"], relation["target_id"]): relation
+            for relation in self.json_data.get("relations", [])
+        }
+
+        relations = []
+        added = 0
+        nodes = self.json_data["nodes"]
+        generated = self.engine.run(nodes) + HistoryBuilder().build(nodes)
+        for relation in generated:
+            key = (relation["type"], relation["source_id"], relation["target_id"])
+            if key in existing:
+                relations.append(existing.pop(key))
+            else:
+                relations.append(relation)
+                added += 1
+
+        removed = 0
+        for relation in existing.values():
+            if (
+                relation["type"] not in rule_types
+                and relation["source_id"] in node_ids
+                and relation["target_id"] in node_ids
+            ):
+                relations.append(relation)
+            else:
+                removed += 1
+
+        self.json_data["relations"] = relations
+        return added, removed
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    print("=== DeltaUpdater テスト ===")
+
+    if len(sys.argv) < 3:
+        print("使い方: python delta_updater.py エコマップ.json 差分.json")
+        sys.exit(1)
+
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        ecomap = json.load(f)
+    with open(sys.argv[2], "r", encoding="utf-8") as f:
+        delta_data = json.load(f)
+    print(DeltaUpdater(ecomap).apply(delta_data))
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+エコマップ差分モジュール
+
+同じ本人の2つの版のエコマップ（前回と今回など）を比較し、追加・削除・変更された
+ノードとリレーションを求めます。ノードIDは生成のたびに変わるため、ノードは種類と内容から
+作る識別キー（NodeIdentity）、リレーションは (タイプ, 始点の識別キー, 終点の識別キー) で
+ハッシュ索引を作って対応付け、件数に比例した時間で比較します。
+"""
+
+import json
+from html import escape
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from .caseload_index import CaseloadIndex
+from .html_generator import HTMLGenerator
+from .layout_cache import LayoutCache
+from .node_identity import NodeIdentity
+
+
+class EcomapDiff:
+    """エコマップ差分クラス"""
+
+    # 差分の種類と表示名
+    STATUS_LABELS = {"added": "追加", "removed": "削除", "changed": "変更"}
+
+    # レイヤー名と表示名の対応
+    LAYER_LABELS = {layer: label for layer, label, _ in HTMLGenerator.LAYERS}
+
+    def __init__(self, old_data: Dict[str, Any], new_data: Dict[str, Any]):
+        """
+        初期化（2つの版を比較）
+
+        Args:
+            old_data: 前の版のエコマップJSONデータ
+            new_data: 新しい版のエコマップJSONデータ
+        """
+        self.person = new_data.get("person") or old_data.get("person", {})
+        self.old_metadata = old_data.get("metadata", {})
+        self.new_metadata = new_data.get("metadata", {})
+
+        old_keys = NodeIdentity.node_keys(old_data.get("nodes", []))
+        new_keys = NodeIdentity.node_keys(new_data.get("nodes", []))
+        self.nodes = self._compare(
+            self._index_nodes(old_data.get("nodes", []), old_keys),
+            self._index_nodes(new_data.get("nodes", []), new_keys),
+        )
+        self.relations = self._compare(
+            self._index_relations(old_data, old_keys),
+            self._index_relations(new_data, new_keys),
+        )
+
+    @classmethod
+    def from_files(cls, old_path: str, new_path: str) -> "EcomapDiff":
+        """エコマップJSONファイルを比較"""
+        with open(old_path, "r", encoding="utf-8") as f:
+            old_data = json.load(f)
+        with open(new_path, "r", encoding="utf-8") as f:
+            new_data = json.load(f)
+        return cls(old_data, new_data)
+
+    @staticmethod
+    def pair_directories(old_dir: str, new_dir: str) -> List[Tuple[Optional[Path], Optional[Path]]]:
+        """
+        2つのフォルダのエコマップを本人ごとに対応付ける（一括比較用）
+
+        Args:
+            old_dir: 前の版のエコマップJSONのあるディレクトリ
+            new_dir: 新しい版のエコマップJSONのあるディレクトリ
+
+        Returns:
+            (前の版のパス, 新しい版のパス) のリスト（片方にしかない本人は None）
+        """
+        def index(directory):
+            paths = {}
+            for path in CaseloadIndex.find_ecomaps(directory):
+                with open(path, "r", encoding="utf-8") as f:
+                    paths[LayoutCache.person_key(json.load(f).get("person", {}))] = path
+            return paths
+
+        old_paths = index(old_dir)
+        new_paths = index(new_dir)
+        pairs = [(old_paths.get(key), path) for key, path in new_paths.items()]
+        pairs.extend((path, None) for key, path in old_paths.items() if key not in new_paths)
+        return pairs
+
+    @property
+    def has_changes(self) -> bool:
+        """差分があるかどうか"""
+        return any(self.nodes[status] or self.relations[status] for status in self.STATUS_LABELS)
+
+    def summary(self) -> Dict[str, int]:
+        """差分の件数"""
+        result = {}
+        for category, diff in (("nodes", self.nodes), ("relations", self.relations)):
+            for status in self.STATUS_LABELS:
+                result[f"{status}_{category}"] = len(diff[status])
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """差分を辞書に変換（JSON出力用）"""
+        return {
+            "person": {
+                "name": self.person.get("name", ""),
+                "birth_date": self.person.get("birth_date", ""),
+            },
+            "old_created_at": (
+                self.old_metadata.get("updated_at") or self.old_metadata.get("created_at", "")
+            ),
+            "new_created_at": (
+                self.new_metadata.get("updated_at") or self.new_metadata.get("created_at", "")
+            ),
+            "summary": self.summary(),
+            "nodes": self.nodes,
+            "relations": self.relations,
+        }
+
+    def render_html(self) -> str:
+        """差分を色分けしたHTMLレポートを生成"""
+        person_name = self.person.get("name", "")
+        summary = self.summary()
+        cards = "".join(
+            f'<div class="card {status}"><span>{escape(label)}</span>'
+            f'<b>{summary[f"{status}_nodes"]}</b> ノード / '
+            f'<b>{summary[f"{status}_relations"]}</b> リレーション</div>'
+            for status, label in self.STATUS_LABELS.items()
+        )
+        sections = (
+            self._render_table("ノード", self.nodes, ("タイプ", "名前", "レイヤー"))
+            + self._render_table("リレーション", self.relations, ("タイプ", "始点", "終点"))
+        )
+        if not self.has_changes:
+            sections = '<p class="empty">差分はありません</p>'
+        data = self.to_dict()
+        old_date = escape(data["old_created_at"])
+        new_date = escape(data["new_created_at"])
+
+        return f"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{escape(person_name)}さんのエコマップ差分</title>
+    <style>
+        body {{
+            margin: 24px;
+            font-family: 'Hiragino Sans', 'Yu Gothic', sans-serif;
+            color: #333;
+        }}
+
+        .period {{
+            color: #666;
+            font-size: 13px;
+        }}
+
+        .cards {{
+            display: flex;
+            gap: 12px;
+            margin: 16px 0;
+        }}
+
+        .card {{
+            padding: 10px 16px;
+            border-radius: 6px;
+            font-size: 13px;
+        }}
+
+        .card span {{
+            display: block;
+            font-weight: bold;
+            margin-bottom: 4px;
+        }}
+
+        table {{
+            border-collapse: collapse;
+            width: 100%;
+            margin-bottom: 24px;
+            font-size: 13px;
+        }}
+
+        th, td {{
+            border-bottom: 1px solid #e0e0e0;
+            padding: 6px 8px;
+            text-align: left;
+            vertical-align: top;
+        }}
+
+        .added {{
+            background-color: #e8f5e9;
+        }}
+
+        .removed {{
+            background-color: #ffebee;
+        }}
+
+        .changed {{
+            background-color: #fff8e1;
+        }}
+
+        tr.removed td {{
+            text-decoration: line-through;
+            color: #b71c1c;
+        }}
+
+        del {{
+            color: #b71c1c;
+        }}
+
+        ins {{
+            color: #1b5e20;
+            text-decoration: none;
+            font-weight: bold;
+        }}
+
+        .empty {{
+            color: #666;
+        }}
+    </style>
+</head>
+<body>
+    <h1>{escape(person_name)}さんのエコマップ差分</h1>
+    <p class="period">{old_date} → {new_date}</p>
+    <div class="cards">{cards}</div>
+    {sections}
+</body>
+</html>
+"""
+
+    def _render_table(
+        self,
+        title: str,
+        diff: Dict[str, List[Dict[str, Any]]],
+        headers: Tuple[str, ...]
+    ) -> str:
+        """差分の表（追加・削除・変更の順）"""
+        rows = []
+        for status, label in self.STATUS_LABELS.items():
+            for item in diff[status]:
+                if "source" in item:
+                    cells = (item["type"], item["source"], item["target"])
+                else:
+                    layer = self.LAYER_LABELS.get(item["layer"], item["layer"])
+                    cells = (item["type"], item["name"], layer)
+                changes = "".join(
+                    f"<div>{escape(field)}: <del>{escape(self._text(old))}</del>"
+                    f" → <ins>{escape(self._text(new))}</ins></div>"
+                    for field, (old, new) in item.get("changes", {}).items()
+                )
+                rows.append(
+                    f'<tr class="{status}"><td>{escape(label)}</td>'
+                    + "".join(f"<td>{escape(str(cell))}</td>" for cell in cells)
+                    + f"<td>{changes}</td></tr>"
+                )
+        if not rows:
+            return ""
+        header = "".join(f"<th>{escape(h)}</th>" for h in ("差分",) + headers + ("変更内容",))
+        return f"<h2>{escape(title)}</h2><table><tr>{header}</tr>{''.join(rows)}</table>"
+
+    @staticmethod
+    def _text(value: Any) -> str:
+        """変更内容の表示用文字列"""
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return "" if value is None else str(value)
+
+    def _index_nodes(
+        self,
+        nodes: List[Dict[str, Any]],
+        keys: Dict[str, str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        識別キー → 比較する内容
+
+        比較する内容は名前・レイヤー・プロパティです（ノードIDを指すプロパティは識別キーに置き換え）。
+        """
+        index = {}
+        for node in nodes:
+            properties = {
+                name: keys.get(value, value) if isinstance(value, str) else value
+                for name, value in node.get("properties", {}).items()
+            }
+            index[keys[node["id"]]] = {
+                "key": keys[node["id"]],
+                "type": node["type"],
+                "name": node.get("name", ""),
+                "layer": node.get("layer", ""),
+                "content": {"name": node.get("name", ""), **properties},
+            }
+        return index
+
+    def _index_relations(
+        self,
+        json_data: Dict[str, Any],
+        keys: Dict[str, str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        (タイプ, 始点の識別キー, 終点の識別キー) → 比較する内容
+
+        同じキーのリレーションには出現順に "#2" などを付けます。
+        """
+        names = {node["id"]: node.get("name", "") for node in json_data.get("nodes", [])}
+        index = {}
+        counts: Dict[str, int] = {}
+        for relation in json_data.get("relations", []):
+            source_id = relation["source_id"]
+            target_id = relation["target_id"]
+            key = "|".join(
+                (relation["type"], keys.get(source_id, source_id), keys.get(target_id, target_id))
+            )
+            counts[key] = counts.get(key, 0) + 1
+            if counts[key] > 1:
+                key = f"{key}#{counts[key]}"
+            index[key] = {
+                "key": key,
+                "type": relation["type"],
+                "source": names.get(source_id, source_id),
+                "target": names.get(target_id, target_id),
+                "content": {
+                    "direction": relation.get("direction", ""),
+                    **relation.get("properties", {}),
+                },
+            }
+        return index
+
+    @staticmethod
+    def _compare(
+        old_index: Dict[str, Dict[str, Any]],
+        new_index: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """識別キーの索引同士を比較"""
+        result: Dict[str, List[Dict[str, Any]]] = {"added": [], "removed": [], "changed": []}
+        for key, new_item in new_index.items():
+            old_item = old_index.get(key)
+            item = {name: value for name, value in new_item.items() if name != "content"}
+            if old_item is None:
+                result["added"].append(item)
+                continue
+            old_content = old_item["content"]
+            new_content = new_item["content"]
+            changes = {
+                field: [old_content.get(field), new_content.get(field)]
+                for field in list(old_content) + [f for f in new_content if f not in old_content]
+                if old_content.get(field) != new_content.get(field)
+            }
+            if changes:
+                result["changed"].append({**item, "changes": changes})
+        for key, old_item in old_index.items():
+            if key not in new_index:
+                result["removed"].append(
+                    {name: value for name, value in old_item.items() if name != "content"}
+                )
+        return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("=== EcomapDiff テスト ===")
+
+    if len(sys.argv) < 3:
+        print("使い方: python ecomap_diff.py 前の版.json 新しい版.json")
+        sys.exit(1)
+
+    diff = EcomapDiff.from_files(sys.argv[1], sys.argv[2])
+    print(json.dumps(diff.summary(), ensure_ascii=False))
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+エコマップ検索モジュール
+
+データベースに登録したエコマップ（EcomapStore）に対して、
+「ノードタイプ -[リレーション]-> ノードタイプ」のパターンで横断的に問い合わせます。
+事業所の利用者、処方薬ごとの医師、サービス等利用計画のない利用者、
+相談支援専門員ごとの担当件数など、よく使う問い合わせを用意しています。
+"""
+
+import json
+from typing import Dict, List, Any, Optional
+
+from .ecomap_store import EcomapStore
+from .node_identity import NodeIdentity
+
+
+class EcomapQuery:
+    """エコマップ検索クラス"""
+
+    def __init__(self, store: EcomapStore):
+        """
+        初期化
+
+        Args:
+            store: 検索対象のデータベース
+        """
+        self.store = store
+
+    def match(
+        self,
+        source_type: str,
+        relation_type: str,
+        target_type: str,
+        source_name: Optional[str] = None,
+        target_name: Optional[str] = None,
+        prefix: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        リレーションのパターンに一致する組み合わせを検索
+
+        Args:
+            source_type: 始点のノードタイプ
+            relation_type: リレーションタイプ
+            target_type: 終点のノードタイプ
+            source_name: 始点の名前で絞り込む場合の名前（正規化して比較）
+            target_name: 終点の名前で絞り込む場合の名前（正規化して比較）
+            prefix: 名前を前方一致で比較する（例: "リスペリドン" で "リスペリドン2mg 朝夕" に一致）
+
+        Returns:
+            case_id, person_name, source, target を含む辞書のリスト
+        """
+        query = """
+            SELECT c.case_id, c.person_name,
+                   s.id AS s_id, s.name AS s_name, s.properties AS s_properties,
+                   t.id AS t_id, t.name AS t_name, t.properties AS t_properties
+            FROM relations r
+            JOIN nodes s ON s.case_id = r.case_id AND s.id = r.source_id
+            JOIN nodes t ON t.case_id = r.case_id AND t.id = r.target_id
+            JOIN cases c ON c.case_id = r.case_id
+            WHERE r.type = ? AND s.type = ? AND t.type = ?
+        """
+        params: List[Any] = [relation_type, source_type, target_type]
+        for alias, name in (("s", source_name), ("t", target_name)):
+            if not name:
+                continue
+            normalized = NodeIdentity.normalize(name)
+            if prefix:
+                # 範囲条件にすると名前の索引で前方一致を検索できる
+                query += f" AND {alias}.normalized_name >= ? AND {alias}.normalized_name < ?"
+                params.extend([normalized, normalized + "\U0010ffff"])
+            else:
+                query += f" AND {alias}.normalized_name = ?"
+                params.append(normalized)
+        query += " ORDER BY c.person_name"
+
+        return [
+            {
+                "case_id": row["case_id"],
+                "person_name": row["person_name"],
+                "source": self._node(row, "s"),
+                "target": self._node(row, "t"),
+            }
+            for row in self.store.connection.execute(query, params)
+        ]
+
+    def clients_by_office(self, office: str) -> List[Dict[str, Any]]:
+        """
+        事業所の利用者（事業所番号、または事業所名で検索）
+
+        Args:
+            office: 事業所番号または事業所名
+
+        Returns:
+            case_id, person_name の辞書のリスト
+        """
+        normalized = NodeIdentity.normalize(office)
+        if normalized.isdigit():
+            return self.store.clients_of_office(office_number=normalized)
+        return self.store.clients_of_office(office_name=normalized)
+
+    def doctors_by_medication(self, medication: str) -> List[Dict[str, Any]]:
+        """
+        処方薬を処方している医師
+
+        Args:
+            medication: 処方薬の名前（前方一致。用量・用法は省略できる）
+
+        Returns:
+            doctor, institution, clients を含む辞書のリスト
+        """
+        institutions = {
+            (m["case_id"], m["source"]["id"]): m["target"]["name"]
+            for m in self.match("Doctor", "WORKS_FOR", "MedicalInstitution")
+        }
+
+        doctors: Dict[tuple, Dict[str, Any]] = {}
+        prescriptions = self.match(
+            "Medication", "PRESCRIBED_BY", "Doctor", source_name=medication, prefix=True
+        )
+        for m in prescriptions:
+            doctor = m["target"]
+            institution = institutions.get((m["case_id"], doctor["id"]), "")
+            key = (NodeIdentity.normalize(doctor["name"]), NodeIdentity.normalize(institution))
+            entry = doctors.setdefault(
+                key, {"doctor": doctor["name"], "institution": institution, "clients": []}
+            )
+            if m["person_name"] not in entry["clients"]:
+                entry["clients"].append(m["person_name"])
+
+        return sorted(doctors.values(), key=lambda e: (-len(e["clients"]), e["doctor"]))
+
+    def people_without(self, node_type: str = "ServicePlan") -> List[Dict[str, Any]]:
+        """
+        指定したタイプのノードがない利用者（例: サービス等利用計画のない利用者）
+
+        Args:
+            node_type: ノードタイプ
+
+        Returns:
+            case_id, person_name の辞書のリスト
+        """
+        rows = self.store.connection.execute(
+            """
+            SELECT c.case_id, c.person_name FROM cases c
+            WHERE NOT EXISTS (SELECT 1 FROM nodes n WHERE n.case_id = c.case_id AND n.type = ?)
+            ORDER BY c.person_name
+            """,
+            (node_type,)
+        )
+        return [dict(row) for row in rows]
+
+    def specialist_caseloads(self) -> List[Dict[str, Any]]:
+        """
+        相談支援専門員ごとの担当利用者（担当件数の多い順）
+
+        Returns:
+            specialist, office, count, clients を含む辞書のリスト
+        """
+        caseloads: Dict[tuple, Dict[str, Any]] = {}
+        for m in self.match("ConsultationSupportSpecialist", "WORKS_FOR", "ConsultationSupport"):
+            office = m["target"]
+            office_key = NodeIdentity.normalize(
+                office["properties"].get("office_number") or office["name"]
+            )
+            key = (NodeIdentity.normalize(m["source"]["name"]), office_key)
+            entry = caseloads.setdefault(
+                key, {"specialist": m["source"]["name"], "office": office["name"], "clients": []}
+            )
+            if m["person_name"] not in entry["clients"]:
+                entry["clients"].append(m["person_name"])
+
+        for entry in caseloads.values():
+            entry["count"] = len(entry["clients"])
+        return sorted(caseloads.values(), key=lambda e: (-e["count"], e["specialist"]))
+
+    def _node(self, row, alias: str) -> Dict[str, Any]:
+        """検索結果の行から始点（s）・終点（t）のノード情報を取り出す"""
+        return {
+            "id": row[f"{alias}_id"],
+            "name": row[f"{alias}_name"],
+            "properties": json.loads(row[f"{alias}_properties"] or "{}"),
+        }
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("=== EcomapQuery テスト ===")
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "outputs/ecomaps.sqlite"
+    with EcomapStore(db_path) as store:
+        query = EcomapQuery(store)
+        for entry in query.specialist_caseloads():
+            print(f"{entry['specialist']}（{entry['office']}）: {entry['count']}件")
+        for entry in query.people_without("ServicePlan"):
+            print(f"計画なし: {entry['person_name']}")
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+エコマップ保存モジュール
+
+エコマップのノードとリレーションをSQLiteデータベースに保存します。
+タイプ・レイヤー・本人・事業所番号・日付に索引を作成するため、
+「事業所Xの利用者」「今四半期に期限が切れる手帳」のような横断的な問い合わせを
+JSONファイルを1件ずつ読み込まずに実行できます。
+"""
+
+import json
+import re
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional
+
+from .layout_cache import LayoutCache
+from .node_identity import NodeIdentity
+
+
+class EcomapStore:
+    """エコマップ保存クラス"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cases (
+            case_id TEXT PRIMARY KEY,
+            person_name TEXT NOT NULL,
+            birth_date TEXT,
+            person_id TEXT,
+            source_file TEXT,
+            stored_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS nodes (
+            id TEXT NOT NULL,
+            case_id TEXT NOT NULL,
+            type TEXT NOT NULL,
+            name TEXT,
+            normalized_name TEXT,
+            layer TEXT,
+            office_number TEXT,
+            properties TEXT,
+            display TEXT,
+            is_default_visible INTEGER,
+            PRIMARY KEY (case_id, id)
+        );
+
+        CREATE TABLE IF NOT EXISTS relations (
+            id TEXT NOT NULL,
+            case_id TEXT NOT NULL,
+            type TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            target_id TEXT NOT NULL,
+            layer TEXT,
+            direction TEXT,
+            properties TEXT,
+            display TEXT,
+            PRIMARY KEY (case_id, id)
+        );
+
+        -- 日付プロパティ（1ノードに複数の日付があるため縦持ち）
+        CREATE TABLE IF NOT EXISTS node_dates (
+            node_id TEXT NOT NULL,
+            case_id TEXT NOT NULL,
+            field TEXT NOT NULL,
+            date TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_cases_person_name ON cases(person_name);
+        CREATE INDEX IF NOT EXISTS idx_nodes_type ON nodes(type);
+        CREATE INDEX IF NOT EXISTS idx_nodes_layer ON nodes(layer);
+        CREATE INDEX IF NOT EXISTS idx_nodes_office_number ON nodes(office_number);
+        CREATE INDEX IF NOT EXISTS idx_nodes_normalized_name ON nodes(type, normalized_name);
+        CREATE INDEX IF NOT EXISTS idx_relations_type ON relations(type);
+        CREATE INDEX IF NOT EXISTS idx_relations_source ON relations(source_id);
+        CREATE INDEX IF NOT EXISTS idx_relations_target ON relations(target_id);
+        CREATE INDEX IF NOT EXISTS idx_node_dates_field_date ON node_dates(field, date);
+        CREATE INDEX IF NOT EXISTS idx_node_dates_case ON node_dates(case_id);
+    """
+
+    DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+    def __init__(self, db_path: str = ":memory:"):
+        """
+        初期化（テーブル・索引がなければ作成）
+
+        Args:
+            db_path: データベースファイルのパス（省略時はメモリ上）
+        """
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(self.SCHEMA)
+
+    def close(self):
+        """データベースを閉じる"""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def save_ecomap(self, json_data: Dict[str, Any], source_file: Optional[str] = None) -> str:
+        """
+        エコマップを保存（同じ本人のデータは置き換え）
+
+        Args:
+            json_data: エコマップのJSONデータ
+            source_file: 元ファイル名
+
+        Returns:
+            ケースID
+        """
+        return self.save_ecomaps([(json_data, source_file)])[0]
+
+    def save_ecomaps(self, ecomaps: Iterable[Any]) -> List[str]:
+        """
+        複数のエコマップを1つのトランザクションで一括保存
+
+        Args:
+            ecomaps: JSONデータ、または (JSONデータ, 元ファイル名) の反復可能オブジェクト
+
+        Returns:
+            保存したケースIDのリスト
+        """
+        case_ids = []
+        with self.connection:
+            for item in ecomaps:
+                json_data, source_file = item if isinstance(item, tuple) else (item, None)
+                case_ids.append(self._insert_ecomap(json_data, source_file))
+        return case_ids
+
+    def delete_case(self, case_id: str):
+        """ケースを削除"""
+        with self.connection:
+            self._delete_case(case_id)
+
+    def cases(self) -> List[Dict[str, Any]]:
+        """保存されているケースの一覧"""
+        rows = self.connection.execute(
+            "SELECT case_id, person_name, birth_date, source_file, stored_at "
+            "FROM cases ORDER BY person_name"
+        )
+        return [dict(row) for row in rows]
+
+    def load_ecomap(self, case_id: str) -> Optional[Dict[str, Any]]:
+        """
+        保存したエコマップを読み込み
+
+        Args:
+            case_id: ケースID
+
+        Returns:
+            person, nodes, relations を含むJSONデータ（ない場合はNone）
+        """
+        case = self.connection.execute(
+            "SELECT * FROM cases WHERE case_id = ?", (case_id,)
+        ).fetchone()
+        if case is None:
+            return None
+
+        nodes = [
+            self._row_to_node(row)
+            for row in self.connection.execute(
+                "SELECT * FROM nodes WHERE case_id = ? ORDER BY rowid", (case_id,)
+            )
+        ]
+        relations = [
+            self._row_to_relation(row)
+            for row in self.connection.execute(
+                "SELECT * FROM relations WHERE case_id = ? ORDER BY rowid", (case_id,)
+            )
+        ]
+        return {
+            "person": {
+                "id": case["person_id"],
+                "name": case["person_name"],
+                "birth_date": case["birth_date"],
+            },
+            "nodes": nodes,
+            "relations": relations,
+        }
+
+    def clients_of_office(
+        self,
+        office_number: Optional[str] = None,
+        office_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        事業所の利用者（事業所番号、または正規化した事業所名で検索）
+
+        Args:
+            office_number: 事業所番号
+            office_name: 事業所名
+
+        Returns:
+            case_id, person_name の辞書のリスト
+        """
+        if office_number:
+            condition, value = "n.office_number = ?", NodeIdentity.normalize(office_number)
+        elif office_name:
+            condition, value = "n.normalized_name = ?", NodeIdentity.normalize(office_name)
+        else:
+            raise ValueError("事業所番号または事業所名を指定してください")
+
+        rows = self.connection.execute(
+            f"""
+            SELECT DISTINCT c.case_id, c.person_name
+            FROM nodes n JOIN cases c ON c.case_id = n.case_id
+            WHERE {condition} AND n.type IN ('ConsultationSupport', 'SupportService')
+            ORDER BY c.person_name
+            """,
+            (value,)
+        )
+        return [dict(row) for row in rows]
+
+    def nodes_with_date(
+        self,
+        field: str,
+        start: str,
+        end: str,
+        types: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        日付プロパティが期間内のノード（例: 今四半期に期限が切れる手帳）
+
+        Args:
+            field: 日付プロパティ名（例: "expiry_date"）
+            start: 開始日（YYYY-MM-DD、この日を含む）
+            end: 終了日（YYYY-MM-DD、この日を含む）
+            types: ノードタイプで絞り込む場合のタイプのリスト
+
+        Returns:
+            case_id, person_name, date とノード情報の辞書のリスト（日付順）
+        """
+        query = """
+            SELECT n.*, d.date, c.person_name
+            FROM node_dates d
+            JOIN nodes n ON n.case_id = d.case_id AND n.id = d.node_id
+            JOIN cases c ON c.case_id = n.case_id
+            WHERE d.field = ? AND d.date BETWEEN ? AND ?
+        """
+        params: List[Any] = [field, start, end]
+        if types:
+            query += f" AND n.type IN ({', '.join('?' for _ in types)})"
+            params.extend(types)
+        query += " ORDER BY d.date, c.person_name"
+
+        results = []
+        for row in self.connection.execute(query, params):
+            node = self._row_to_node(row)
+            node.update({
+                "case_id": row["case_id"],
+                "person_name": row["person_name"],
+                "date": row["date"],
+            })
+            results.append(node)
+        return results
+
+    def _insert_ecomap(self, json_data: Dict[str, Any], source_file: Optional[str]) -> str:
+        """1件分を挿入（呼び出し側のトランザクション内で実行）"""
+        person = json_data.get("person", {})
+        case_id = LayoutCache.person_key(person)
+        self._delete_case(case_id)
+
+        if source_file is None:
+            source_file = json_data.get("metadata", {}).get("source_file")
+
+        self.connection.execute(
+            "INSERT INTO cases "
+            "(case_id, person_name, birth_date, person_id, source_file, stored_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (case_id, person.get("name", ""), person.get("birth_date", ""), person.get("id"),
+             source_file, datetime.now().isoformat())
+        )
+
+        node_rows = []
+        date_rows = []
+        for node in json_data.get("nodes", []):
+            properties = node.get("properties", {})
+            office_number = properties.get("office_number")
+            node_rows.append((
+                node["id"],
+                case_id,
+                node["type"],
+                node.get("name", ""),
+                NodeIdentity.normalize(node.get("name", "")),
+                node.get("layer", ""),
+                NodeIdentity.normalize(office_number) if office_number else None,
+                json.dumps(properties, ensure_ascii=False),
+                json.dumps(node.get("display", {}), ensure_ascii=False),
+                int(bool(node.get("is_default_visible", True))),
+            ))
+            for field, value in properties.items():
+                is_date = isinstance(value, str) and self.DATE_PATTERN.match(value)
+                if field.endswith("_date") and is_date:
+                    date_rows.append((node["id"], case_id, field, value))
+
+        relation_rows = [
+            (
+                relation["id"],
+                case_id,
+                relation["type"],
+                relation["source_id"],
+                relation["target_id"],
+                relation.get("layer", ""),
+                relation.get("direction", ""),
+                json.dumps(relation.get("properties", {}), ensure_ascii=False),
+                json.dumps(relation.get("display", {}), ensure_ascii=False),
+            )
+            for relation in json_data.get("relations", [])
+        ]
+
+        self.connection.executemany(
+            "INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", node_rows
+        )
+        self.connection.executemany("INSERT INTO node_dates VALUES (?, ?, ?, ?)", date_rows)
+        self.connection.executemany(
+            "INSERT INTO relations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", relation_rows
+        )
+        return case_id
+
+    def _delete_case(self, case_id: str):
+        """ケースの行を削除（呼び出し側のトランザクション内で実行）"""
+        self.connection.execute("DELETE FROM node_dates WHERE case_id = ?", (case_id,))
+        self.connection.execute("DELETE FROM relations WHERE case_id = ?", (case_id,))
+        self.connection.execute("DELETE FROM nodes WHERE case_id = ?", (case_id,))
+        self.connection.execute("DELETE FROM cases WHERE case_id = ?", (case_id,))
+
+    def _row_to_node(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """nodesテーブルの行をノード辞書に変換"""
+        return {
+            "id": row["id"],
+            "type": row["type"],
+            "name": row["name"],
+            "properties": json.loads(row["properties"] or "{}"),
+            "display": json.loads(row["display"] or "{}"),
+            "layer": row["layer"],
+            "is_default_visible": bool(row["is_default_visible"]),
+        }
+
+    def _row_to_relation(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """relationsテーブルの行をリレーション辞書に変換"""
+        return {
+            "id": row["id"],
+            "type": row["type"],
+            "source_id": row["source_id"],
+            "target_id": row["target_id"],
+            "properties": json.loads(row["properties"] or "{}"),
+            "direction": row["direction"],
+            "display": json.loads(row["display"] or "{}"),
+            "layer": row["layer"],
+        }
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("=== EcomapStore テスト ===")
+
+    with EcomapStore(":memory:") as store:
+        ecomaps = []
+        for path in sys.argv[1:]:
+            with open(path, "r", encoding="utf-8") as f:
+                ecomaps.append((json.load(f), path))
+        store.save_ecomaps(ecomaps)
+
+        for case in store.cases():
+            print(f"{case['person_name']}: {case['case_id']}")
+        for node in store.nodes_with_date("expiry_date", "2000-01-01", "2100-12-31"):
+            print(f"{node['date']} {node['person_name']} {node['name']}")
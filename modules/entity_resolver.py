@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+名寄せモジュール
+
+事業所名・医療機関名・医師名などの表記ゆれ（全角・半角、空白、ひらがな・カタカナ、
+「株式会社」「㈱」などの法人格）を吸収して、同じ実体を1つのIDにまとめます。
+比較はブロッキングキー（事業所番号、正規化した名前の先頭・末尾）が共通する候補に限るため、
+件数が増えても総当たりにならず、ほぼ件数に比例した時間で処理できます。
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+
+class EntityResolver:
+    """名寄せクラス"""
+
+    # 類似度（文字バイグラムのDice係数）のしきい値
+    # （0.85 では「○○作業所」と「○○作業所第二」が一致してしまう）
+    DEFAULT_THRESHOLD = 0.9
+
+    # 取り除く法人格（NFKC正規化後の表記。㈱ は (株) になる）
+    LEGAL_FORMS = (
+        "特定非営利活動法人", "社会福祉法人", "医療法人社団", "医療法人財団", "医療法人",
+        "一般社団法人", "公益社団法人", "一般財団法人", "公益財団法人",
+        "株式会社", "有限会社", "合同会社", "合資会社", "NPO法人",
+        "(株)", "(有)", "(合)", "(福)", "(社福)", "(医)", "(特非)",
+        "(一社)", "(公社)", "(一財)", "(公財)",
+    )
+
+    # 取り除く敬称（人名のみ）
+    HONORIFICS = ("医師", "先生", "ドクター", "Dr.", "Dr")
+
+    # 人名として扱うノードタイプ
+    PERSON_TYPES = ("Doctor", "ServiceManager", "ConsultationSupportSpecialist")
+
+    # 比較から除く記号（中黒・長音・ハイフン類・括弧など）
+    PUNCTUATION = re.compile(r"[\s・･\-‐‑‒–—―ー－~〜、。,.()（）「」『』\[\]【】]")
+
+    # 名前に含まれる数字（「第2」と「第3」のように数字だけ異なる名前は別の実体）
+    DIGITS = re.compile(r"\d+")
+
+    # 1つのブロックで比較する候補の上限（「○○」のようなありふれた先頭で総当たりにならないように）
+    MAX_BLOCK_SIZE = 200
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        """
+        初期化
+
+        Args:
+            threshold: 同じ実体とみなす類似度（0〜1）
+        """
+        self.threshold = threshold
+        self.entities: Dict[str, Dict[str, Any]] = {}     # 実体ID → 実体情報
+        self.blocks: Dict[Tuple[str, ...], List[str]] = {}  # ブロッキングキー → 実体ID
+        self.comparisons = 0
+
+    @classmethod
+    def normalize_name(cls, name: Any, entity_type: str = "") -> str:
+        """
+        名寄せ用に名前を正規化
+
+        NFKC正規化（全角英数字・半角カタカナ・㈱など）、ひらがなのカタカナ化、
+        法人格・敬称・空白・記号の除去、英字の小文字化を行います。
+
+        Args:
+            name: 名前
+            entity_type: ノードタイプ（人名のタイプは敬称を除去）
+
+        Returns:
+            正規化された名前
+
+        Examples:
+            >>> EntityResolver.normalize_name("㈱ ワークス")
+            'ワクス'
+            >>> EntityResolver.normalize_name("ひまわり作業所")
+            'ヒマワリ作業所'
+        """
+        if name is None:
+            return ""
+        text = unicodedata.normalize("NFKC", str(name))
+        text = "".join(text.split())
+
+        for form in cls.LEGAL_FORMS:
+            text = text.replace(form, "")
+        if entity_type in cls.PERSON_TYPES:
+            for honorific in cls.HONORIFICS:
+                if text.endswith(honorific) and len(text) > len(honorific):
+                    text = text[:-len(honorific)]
+
+        # ひらがな → カタカナ
+        text = "".join(chr(ord(c) + 0x60) if "ぁ" <= c <= "ゖ" else c for c in text)
+        return cls.PUNCTUATION.sub("", text).lower()
+
+    @staticmethod
+    def similarity(a: str, b: str) -> float:
+        """
+        文字バイグラムのDice係数（0〜1）
+
+        Args:
+            a: 正規化された名前
+            b: 正規化された名前
+
+        Returns:
+            類似度
+        """
+        if a == b:
+            return 1.0
+        if len(a) < 2 or len(b) < 2:
+            return 0.0
+        bigrams_a = {a[i:i + 2] for i in range(len(a) - 1)}
+        bigrams_b = {b[i:i + 2] for i in range(len(b) - 1)}
+        return 2 * len(bigrams_a & bigrams_b) / (len(bigrams_a) + len(bigrams_b))
+
+    def match(
+        self,
+        entity_type: str,
+        name: str,
+        office_number: Optional[str] = None,
+        scope: str = ""
+    ) -> Optional[str]:
+        """
+        登録済みの実体から一致するものを探す
+
+        Args:
+            entity_type: ノードタイプ
+            name: 名前
+            office_number: 事業所番号（異なる番号の実体とは一致しない）
+            scope: 比較する範囲（医師なら所属医療機関のID。範囲が異なる実体とは一致しない）
+
+        Returns:
+            一致した実体ID（なければNone）
+        """
+        normalized = self.normalize_name(name, entity_type)
+        number = self._normalize_number(office_number)
+        digits = self.DIGITS.findall(normalized)
+
+        best_id, best_score = None, 0.0
+        for entity_id in self._candidates(entity_type, normalized, number, scope):
+            entity = self.entities[entity_id]
+            if number and entity["office_number"]:
+                if number != entity["office_number"]:
+                    continue
+                return entity_id
+
+            self.comparisons += 1
+            score = max(
+                (self.similarity(normalized, alias) for alias in entity["aliases"]
+                 if self.DIGITS.findall(alias) == digits),
+                default=0.0
+            )
+            if score > best_score:
+                best_id, best_score = entity_id, score
+
+        return best_id if best_score >= self.threshold else None
+
+    def add(
+        self,
+        entity_id: str,
+        entity_type: str,
+        name: str,
+        office_number: Optional[str] = None,
+        scope: str = ""
+    ):
+        """
+        実体を登録（登録済みのIDなら別名・事業所番号を追加）
+
+        Args:
+            entity_id: 実体ID
+            entity_type: ノードタイプ
+            name: 名前
+            office_number: 事業所番号
+            scope: 比較する範囲
+        """
+        normalized = self.normalize_name(name, entity_type)
+        number = self._normalize_number(office_number)
+
+        entity = self.entities.setdefault(entity_id, {
+            "type": entity_type,
+            "name": name,
+            "scope": scope,
+            "office_number": "",
+            "aliases": [],
+        })
+        if number and not entity["office_number"]:
+            entity["office_number"] = number
+        if normalized and normalized not in entity["aliases"]:
+            entity["aliases"].append(normalized)
+
+        for key in self._blocking_keys(entity_type, normalized, number, entity["scope"]):
+            block = self.blocks.setdefault(key, [])
+            if entity_id not in block:
+                block.append(entity_id)
+
+    def resolve(self, mentions: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        言及（同じ実体を指すかもしれない記述）をまとめて名寄せ
+
+        Args:
+            mentions: id, type, name と、任意で office_number, scope を持つ辞書の
+                反復可能オブジェクト
+
+        Returns:
+            言及ID → 実体ID（内容から決まるハッシュ。最初に出てきた言及の名前を代表にする）
+        """
+        result = {}
+        for mention in mentions:
+            entity_type = mention["type"]
+            office_number = mention.get("office_number")
+            scope = mention.get("scope", "")
+
+            entity_id = self.match(entity_type, mention["name"], office_number, scope)
+            if entity_id is None:
+                entity_id = self.canonical_id(entity_type, mention["name"], office_number, scope)
+            self.add(entity_id, entity_type, mention["name"], office_number, scope)
+            result[mention["id"]] = entity_id
+        return result
+
+    @classmethod
+    def canonical_id(
+        cls,
+        entity_type: str,
+        name: str,
+        office_number: Optional[str] = None,
+        scope: str = ""
+    ) -> str:
+        """実体の内容から決まるID（同じ内容なら実行のたびに同じ）"""
+        number = cls._normalize_number(office_number)
+        key = "|".join([entity_type, number or cls.normalize_name(name, entity_type), scope])
+        return f"{entity_type}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}"
+
+    def _candidates(self, entity_type: str, normalized: str, number: str, scope: str) -> List[str]:
+        """ブロッキングキーが共通する比較候補（出現順、重複なし）"""
+        candidates: List[str] = []
+        seen: Set[str] = set()
+        for key in self._blocking_keys(entity_type, normalized, number, scope):
+            block = self.blocks.get(key, [])
+            if len(block) > self.MAX_BLOCK_SIZE and key[1] != "number":
+                continue
+            for entity_id in block:
+                if entity_id not in seen:
+                    seen.add(entity_id)
+                    candidates.append(entity_id)
+        return candidates
+
+    @staticmethod
+    def _blocking_keys(
+        entity_type: str,
+        normalized: str,
+        number: str,
+        scope: str
+    ) -> List[Tuple[str, ...]]:
+        """ブロッキングキー（事業所番号、名前の先頭2文字、末尾2文字）"""
+        keys = []
+        if number:
+            keys.append((entity_type, "number", number))
+        if normalized:
+            keys.append((entity_type, "prefix", scope, normalized[:2]))
+            keys.append((entity_type, "suffix", scope, normalized[-2:]))
+        return keys
+
+    @staticmethod
+    def _normalize_number(office_number: Optional[str]) -> str:
+        """事業所番号を正規化（全角数字・空白・ハイフン）"""
+        if not office_number:
+            return ""
+        text = unicodedata.normalize("NFKC", str(office_number))
+        return re.sub(r"[\s\-]", "", text)
+
+
+if __name__ == "__main__":
+    print("=== EntityResolver テスト ===")
+
+    test_mentions = [
+        {"id": "1", "type": "SupportService", "name": "株式会社ワークス",
+         "office_number": "4030200777"},
+        {"id": "2", "type": "SupportService", "name": "㈱ワークス"},
+        {"id": "3", "type": "SupportService", "name": "ひまわり作業所"},
+        {"id": "4", "type": "SupportService", "name": "ヒマワリ 作業所"},
+        {"id": "5", "type": "Doctor", "name": "鈴木医師", "scope": "h1"},
+        {"id": "6", "type": "Doctor", "name": "鈴木 先生", "scope": "h1"},
+    ]
+    resolver = EntityResolver()
+    for mention_id, entity_id in resolver.resolve(test_mentions).items():
+        print(f"{mention_id}: {entity_id}")
+    print(f"比較回数: {resolver.comparisons}")
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+グラフ形式出力モジュール
+
+エコマップ（統合グラフを含む）を、Gephi や networkx で開ける GraphML・GEXF 形式で
+書き出します。ノード・リレーションは追加した順にファイルへ書き込み、
+出力済みのIDだけを保持するため、大きな統合グラフも少ないメモリで出力できます。
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from .html_generator import HTMLGenerator
+from .layout_cache import LayoutCache
+
+
+class GraphExporter:
+    """グラフ形式出力の基底クラス"""
+
+    # 出力する属性（属性名, 型）。ノード固有のプロパティはJSON文字列で1つの属性にまとめる
+    NODE_ATTRIBUTES: List[Tuple[str, str]] = [
+        ("type", "string"),
+        ("layer", "string"),
+        ("layer_label", "string"),
+        ("color", "string"),
+        ("size", "double"),
+        ("cases", "string"),
+        ("properties", "string"),
+    ]
+    # 家族関係など向きのないリレーションも有向グラフのエッジとして出力し、direction 属性で区別する
+    # （networkx は有向グラフ内の無向エッジを読み込めないため）
+    EDGE_ATTRIBUTES: List[Tuple[str, str]] = [
+        ("type", "string"),
+        ("layer", "string"),
+        ("direction", "string"),
+        ("cases", "string"),
+        ("properties", "string"),
+    ]
+
+    # レイヤー名と表示名の対応
+    LAYER_LABELS = {layer: label for layer, label, _ in HTMLGenerator.LAYERS}
+
+    def __init__(self, path: str):
+        """
+        初期化（ファイルを開いてヘッダーを書き込む）
+
+        Args:
+            path: 出力ファイルのパス
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.written_node_ids = set()
+        self.written_relation_ids = set()
+        self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_ecomap(self, json_data: Dict[str, Any]) -> str:
+        """
+        エコマップ1件分を出力
+
+        Args:
+            json_data: エコマップのJSONデータ（person, nodes, relations）
+
+        Returns:
+            ケースID（本人キャッシュキー）
+        """
+        case_id = LayoutCache.person_key(json_data.get("person", {}))
+        self.add_nodes(json_data.get("nodes", []), case_id)
+        self.add_relations(json_data.get("relations", []), case_id)
+        return case_id
+
+    def add_nodes(self, nodes: Iterable[Dict[str, Any]], case_id: Optional[str] = None):
+        """
+        ノードを出力（出力済みのIDは読み飛ばす）
+
+        Args:
+            nodes: ノードの反復可能オブジェクト（NodeGenerator の出力など）
+            case_id: ケースID（ノードに cases がない場合に使用）
+        """
+        for node in nodes:
+            if node["id"] in self.written_node_ids:
+                continue
+            self.written_node_ids.add(node["id"])
+            self._write_node(node, self._node_attributes(node, case_id))
+
+    def add_relations(self, relations: Iterable[Dict[str, Any]], case_id: Optional[str] = None):
+        """
+        リレーションを出力（出力済みのIDは読み飛ばす）
+
+        Args:
+            relations: リレーションの反復可能オブジェクト（RelationGenerator の出力など）
+            case_id: ケースID（リレーションに cases がない場合に使用）
+        """
+        for relation in relations:
+            if relation["id"] in self.written_relation_ids:
+                continue
+            self.written_relation_ids.add(relation["id"])
+            attributes = {
+                "type": relation["type"],
+                "layer": relation.get("layer", ""),
+                "direction": relation.get("direction", "directed"),
+                "cases": self._cases(relation, case_id),
+                "properties": json.dumps(relation.get("properties", {}), ensure_ascii=False),
+            }
+            self._write_edge(relation, attributes)
+
+    def close(self) -> Path:
+        """
+        フッターを書き込んでファイルを閉じる
+
+        Returns:
+            出力ファイルのパス
+        """
+        if not self.file.closed:
+            self._write_footer()
+            self.file.close()
+        return self.path
+
+    def _node_attributes(self, node: Dict[str, Any], case_id: Optional[str]) -> Dict[str, Any]:
+        """ノードの属性値（表示設定はビューアーと同じ色・大きさに変換）"""
+        display = node.get("display", {})
+        color = display.get("color", "gray")
+        layer = node.get("layer", "")
+        return {
+            "type": node["type"],
+            "layer": layer,
+            "layer_label": self.LAYER_LABELS.get(layer, layer),
+            "color": HTMLGenerator.COLOR_MAP.get(color, color),
+            "size": HTMLGenerator.SIZE_MAP.get(
+                display.get("size", "medium"), HTMLGenerator.SIZE_MAP["medium"]
+            ),
+            "cases": self._cases(node, case_id),
+            "properties": json.dumps(node.get("properties", {}), ensure_ascii=False),
+        }
+
+    def _cases(self, item: Dict[str, Any], case_id: Optional[str]) -> str:
+        """ケースID（統合グラフは cases、1件分のエコマップは case_id）をカンマ区切りで"""
+        return ",".join(item.get("cases") or ([case_id] if case_id else []))
+
+    def _write_header(self):
+        raise NotImplementedError
+
+    def _write_node(self, node: Dict[str, Any], attributes: Dict[str, Any]):
+        raise NotImplementedError
+
+    def _write_edge(self, relation: Dict[str, Any], attributes: Dict[str, Any]):
+        raise NotImplementedError
+
+    def _write_footer(self):
+        raise NotImplementedError
+
+
+class GraphMLExporter(GraphExporter):
+    """GraphML出力クラス（ノードとエッジは出現順に書き込む）"""
+
+    def _write_header(self):
+        self.file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self.file.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        self.file.write('  <key id="label" for="node" attr.name="label" attr.type="string"/>\n')
+        for domain, attributes in (("node", self.NODE_ATTRIBUTES), ("edge", self.EDGE_ATTRIBUTES)):
+            for name, attr_type in attributes:
+                self.file.write(
+                    f'  <key id="{domain}_{name}" for="{domain}" '
+                    f'attr.name="{name}" attr.type="{attr_type}"/>\n'
+                )
+        self.file.write('  <graph id="ecomap" edgedefault="directed">\n')
+
+    def _write_node(self, node: Dict[str, Any], attributes: Dict[str, Any]):
+        data = [f'<data key="label">{escape(node.get("name", ""))}</data>']
+        data.extend(
+            f'<data key="node_{name}">{escape(str(value))}</data>'
+            for name, value in attributes.items()
+        )
+        self.file.write(f'    <node id={quoteattr(node["id"])}>{"".join(data)}</node>\n')
+
+    def _write_edge(self, relation: Dict[str, Any], attributes: Dict[str, Any]):
+        data = "".join(
+            f'<data key="edge_{name}">{escape(str(value))}</data>'
+            for name, value in attributes.items()
+        )
+        self.file.write(
+            f'    <edge id={quoteattr(relation["id"])} source={quoteattr(relation["source_id"])} '
+            f'target={quoteattr(relation["target_id"])}>{data}</edge>\n'
+        )
+
+    def _write_footer(self):
+        self.file.write("  </graph>\n</graphml>\n")
+
+
+class GEXFExporter(GraphExporter):
+    """
+    GEXF出力クラス
+
+    GEXFではノードをすべて書いた後にエッジを書くため、
+    エッジは一時ファイルに書き出しておき、終了時に連結します。
+    """
+
+    def __init__(self, path: str):
+        self.edge_file = tempfile.TemporaryFile("w+", encoding="utf-8")
+        super().__init__(path)
+
+    def _write_header(self):
+        self.file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self.file.write(
+            '<gexf xmlns="http://gexf.net/1.3" xmlns:viz="http://gexf.net/1.3/viz" version="1.3">\n'
+        )
+        self.file.write('  <graph defaultedgetype="directed" mode="static">\n')
+        for domain, attributes in (("node", self.NODE_ATTRIBUTES), ("edge", self.EDGE_ATTRIBUTES)):
+            self.file.write(f'    <attributes class="{domain}">\n')
+            for index, (name, attr_type) in enumerate(attributes):
+                self.file.write(
+                    f'      <attribute id="{index}" title="{name}" type="{attr_type}"/>\n'
+                )
+            self.file.write("    </attributes>\n")
+        self.file.write("    <nodes>\n")
+
+    def _write_node(self, node: Dict[str, Any], attributes: Dict[str, Any]):
+        values = self._attvalues(attributes)
+        color = attributes["color"]
+        viz = f'<viz:size value="{attributes["size"]}"/>'
+        if color.startswith("#") and len(color) == 7:
+            r, g, b = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+            viz = f'<viz:color r="{r}" g="{g}" b="{b}"/>' + viz
+        self.file.write(
+            f'      <node id={quoteattr(node["id"])} label={quoteattr(node.get("name", ""))}>'
+            f'{values}{viz}</node>\n'
+        )
+
+    def _write_edge(self, relation: Dict[str, Any], attributes: Dict[str, Any]):
+        self.edge_file.write(
+            f'      <edge id={quoteattr(relation["id"])} source={quoteattr(relation["source_id"])} '
+            f'target={quoteattr(relation["target_id"])} '
+            f'label={quoteattr(relation["type"])}>{self._attvalues(attributes)}</edge>\n'
+        )
+
+    def _write_footer(self):
+        self.file.write("    </nodes>\n    <edges>\n")
+        self.edge_file.seek(0)
+        shutil.copyfileobj(self.edge_file, self.file)
+        self.edge_file.close()
+        self.file.write("    </edges>\n  </graph>\n</gexf>\n")
+
+    def _attvalues(self, attributes: Dict[str, Any]) -> str:
+        """属性値（属性の宣言順の番号をIDにする）"""
+        values = "".join(
+            f'<attvalue for="{index}" value={quoteattr(str(value))}/>'
+            for index, value in enumerate(attributes.values())
+        )
+        return f"<attvalues>{values}</attvalues>"
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("=== GraphExporter テスト ===")
+
+    output_path = sys.argv[1] if len(sys.argv) > 1 else "outputs/ecomaps.graphml"
+    exporter_class = GEXFExporter if output_path.endswith(".gexf") else GraphMLExporter
+    with exporter_class(output_path) as exporter:
+        for path in sys.argv[2:]:
+            with open(path, "r", encoding="utf-8") as f:
+                exporter.add_ecomap(json.load(f))
+    print(
+        f"ノード: {len(exporter.written_node_ids)}, "
+        f"リレーション: {len(exporter.written_relation_ids)}"
+    )
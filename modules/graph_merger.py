@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+グラフ統合モジュール
+
+本人ごとのエコマップを1つの組織全体のグラフに統合します。
+事業所・医療機関・医師などの共有エンティティは、事業所番号と
+正規化した名前のハッシュ索引で1つのノードにまとめ、索引で見つからない表記ゆれ
+（「株式会社」「㈱」、ひらがな・カタカナなど）は名寄せ（EntityResolver）で照合するため、
+どの事業所・医師がどの利用者を支援しているかを横断的に確認できます。
+ケースは1件ずつ追加でき、同じ本人を再度追加すると前回分を置き換えます。
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from .entity_resolver import EntityResolver
+from .layout_cache import LayoutCache
+from .node_identity import NodeIdentity
+
+
+class GraphMerger:
+    """グラフ統合クラス"""
+
+    # 共有エンティティとして統合するノードタイプと、統合後に残すプロパティ
+    # （通院開始日や備考など本人ごとの情報は、各ケースのエコマップに残ります）
+    SHARED_PROPERTIES = {
+        "ConsultationSupport": ("office_name", "office_number", "address", "phone"),
+        "SupportService": ("office_name", "office_number"),
+        "MedicalInstitution": ("name", "address", "phone"),
+        "ConsultationSupportSpecialist": ("name", "office_id"),
+        "ServiceManager": ("name", "office_id"),
+        "Doctor": ("name", "institution_id"),
+    }
+
+    # 事業所番号で統合するノードタイプ
+    OFFICE_TYPES = ("ConsultationSupport", "SupportService")
+
+    # 所属先ごとに区別する職員のノードタイプと、所属先IDのプロパティ
+    STAFF_TYPES = {
+        "ConsultationSupportSpecialist": "office_id",
+        "ServiceManager": "office_id",
+        "Doctor": "institution_id",
+    }
+
+    def __init__(self, resolver: Optional[EntityResolver] = None):
+        """
+        初期化
+
+        Args:
+            resolver: 表記ゆれの名寄せ（省略時は既定のしきい値で作成）
+        """
+        self.resolver = resolver or EntityResolver()
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.relations: Dict[str, Dict[str, Any]] = {}
+        self.cases: Dict[str, Dict[str, Any]] = {}
+
+        # 共有エンティティの索引
+        # (タイプ, 事業所番号) → ノードID
+        self.office_index: Dict[Tuple[str, str], str] = {}
+        # (タイプ, 正規化名, 所属先ID) → ノードID
+        self.name_index: Dict[Tuple[str, str, str], str] = {}
+        # (タイプ, 始点, 終点) → リレーションID
+        self.relation_index: Dict[Tuple[str, str, str], str] = {}
+
+    def add_ecomap(self, json_data: Dict[str, Any]) -> str:
+        """
+        本人のエコマップを統合
+
+        Args:
+            json_data: エコマップのJSONデータ（person, nodes, relations）
+
+        Returns:
+            ケースID（本人キャッシュキー）
+        """
+        case_id = LayoutCache.person_key(json_data.get("person", {}))
+        if case_id in self.cases:
+            self.remove_case(case_id)
+
+        nodes = json_data.get("nodes", [])
+        id_map: Dict[str, str] = {}
+
+        # 事業所・医療機関を先に統合し、職員は統合後の所属先IDで区別する
+        ordered = sorted(nodes, key=lambda n: n.get("type") in self.STAFF_TYPES)
+        for node in ordered:
+            if node.get("type") in self.SHARED_PROPERTIES:
+                id_map[node["id"]] = self._merge_shared_node(node, id_map, case_id)
+            else:
+                merged = dict(node, cases=[case_id])
+                self.nodes[node["id"]] = merged
+                id_map[node["id"]] = node["id"]
+
+        for relation in json_data.get("relations", []):
+            self._merge_relation(relation, id_map, case_id)
+
+        person = json_data.get("person", {})
+        self.cases[case_id] = {
+            "name": person.get("name", ""),
+            "person_id": id_map.get(person.get("id"), person.get("id")),
+            "added_at": datetime.now().isoformat(),
+        }
+        return case_id
+
+    def remove_case(self, case_id: str):
+        """
+        ケースを取り除く（どのケースからも参照されなくなった共有ノードも削除）
+
+        Args:
+            case_id: ケースID
+        """
+        self.cases.pop(case_id, None)
+
+        for collection in (self.nodes, self.relations):
+            for item_id in list(collection):
+                cases = collection[item_id]["cases"]
+                if case_id in cases:
+                    cases.remove(case_id)
+                    if not cases:
+                        del collection[item_id]
+
+        self._rebuild_indexes()
+
+    def clients_of(self, node_id: str) -> List[str]:
+        """
+        共有ノードが関わる利用者の氏名
+
+        Args:
+            node_id: ノードID
+
+        Returns:
+            氏名のリスト
+        """
+        node = self.nodes.get(node_id)
+        if not node:
+            return []
+        return [self.cases[case_id]["name"] for case_id in node["cases"] if case_id in self.cases]
+
+    def shared_nodes(self, min_clients: int = 2) -> List[Dict[str, Any]]:
+        """
+        複数の利用者に関わる共有ノード（利用者数の多い順）
+
+        Args:
+            min_clients: 最小利用者数
+
+        Returns:
+            ノードのリスト
+        """
+        shared = [
+            n for n in self.nodes.values()
+            if n["type"] in self.SHARED_PROPERTIES and len(n["cases"]) >= min_clients
+        ]
+        return sorted(shared, key=lambda n: (-len(n["cases"]), n["type"], n["name"]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """統合グラフを辞書に変換"""
+        return {
+            "nodes": list(self.nodes.values()),
+            "relations": list(self.relations.values()),
+            "cases": self.cases,
+            "metadata": {
+                "updated_at": datetime.now().isoformat(),
+                "case_count": len(self.cases),
+                "node_count": len(self.nodes),
+                "relation_count": len(self.relations),
+            },
+        }
+
+    def save(self, path: str):
+        """統合グラフをJSONファイルに保存"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GraphMerger":
+        """辞書から統合グラフを復元（索引は再構築）"""
+        merger = cls()
+        merger.nodes = {n["id"]: n for n in data.get("nodes", [])}
+        merger.relations = {r["id"]: r for r in data.get("relations", [])}
+        merger.cases = dict(data.get("cases", {}))
+        merger._rebuild_indexes()
+        return merger
+
+    @classmethod
+    def load(cls, path: str) -> "GraphMerger":
+        """JSONファイルから統合グラフを読み込み（ファイルがなければ空）"""
+        if not Path(path).exists():
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def _merge_shared_node(self, node: Dict[str, Any], id_map: Dict[str, str], case_id: str) -> str:
+        """共有エンティティを索引で探し、なければ正規ノードとして追加"""
+        node_type = node["type"]
+        properties = dict(node.get("properties", {}))
+
+        # 所属先IDを統合後のIDに置き換え
+        parent_field = self.STAFF_TYPES.get(node_type)
+        if parent_field and properties.get(parent_field):
+            parent_id = properties[parent_field]
+            properties[parent_field] = id_map.get(parent_id, parent_id)
+
+        office_key, name_key = self._index_keys(node_type, node.get("name", ""), properties)
+        canonical_id = (
+            (office_key and self.office_index.get(office_key)) or self.name_index.get(name_key)
+        )
+        if canonical_id and office_key:
+            # 同名でも事業所番号が異なれば別の事業所
+            known_number = self.nodes[canonical_id]["properties"].get("office_number")
+            if known_number and NodeIdentity.normalize(known_number) != office_key[1]:
+                canonical_id = None
+        if canonical_id is None:
+            # 索引で見つからなければ表記ゆれを名寄せで照合
+            canonical_id = self.resolver.match(
+                node_type, node.get("name", ""), properties.get("office_number"), name_key[2]
+            )
+
+        if canonical_id is None:
+            canonical_id = self._canonical_id(office_key or name_key)
+            shared_properties = {
+                key: properties.get(key, "") for key in self.SHARED_PROPERTIES[node_type]
+            }
+            self.nodes[canonical_id] = dict(
+                node,
+                id=canonical_id,
+                properties=shared_properties,
+                cases=[],
+            )
+            self.nodes[canonical_id].pop("created_at", None)
+            self.nodes[canonical_id].pop("provenance", None)
+        else:
+            # 空のプロパティを後から追加されたケースの値で補完
+            shared_properties = self.nodes[canonical_id]["properties"]
+            for key in self.SHARED_PROPERTIES[node_type]:
+                if not shared_properties.get(key) and properties.get(key):
+                    shared_properties[key] = properties[key]
+
+        merged = self.nodes[canonical_id]
+        if case_id not in merged["cases"]:
+            merged["cases"].append(case_id)
+
+        # 名前だけで統合したノードに事業所番号が加わった場合も索引に登録
+        office_key, name_key = self._index_keys(node_type, merged["name"], merged["properties"])
+        if office_key:
+            self.office_index.setdefault(office_key, canonical_id)
+        self.name_index.setdefault(name_key, canonical_id)
+        self.resolver.add(
+            canonical_id, node_type, node.get("name", ""),
+            merged["properties"].get("office_number"), name_key[2]
+        )
+        return canonical_id
+
+    def _merge_relation(self, relation: Dict[str, Any], id_map: Dict[str, str], case_id: str):
+        """リレーションの端点を統合後のIDに置き換えて追加（共有ノード間は重複を除去）"""
+        source_id = id_map.get(relation["source_id"], relation["source_id"])
+        target_id = id_map.get(relation["target_id"], relation["target_id"])
+
+        key = (relation["type"], source_id, target_id)
+        existing_id = self.relation_index.get(key)
+        if existing_id:
+            cases = self.relations[existing_id]["cases"]
+            if case_id not in cases:
+                cases.append(case_id)
+            return
+
+        relation_id = relation["id"]
+        if source_id != relation["source_id"] and target_id != relation["target_id"]:
+            # 共有ノード同士のリレーションは内容から決まるIDにする
+            relation_id = self._canonical_id(key)
+        merged = dict(
+            relation, id=relation_id, source_id=source_id, target_id=target_id, cases=[case_id]
+        )
+        merged.pop("created_at", None)
+        self.relations[relation_id] = merged
+        self.relation_index[key] = relation_id
+
+    def _index_keys(
+        self,
+        node_type: str,
+        name: str,
+        properties: Dict[str, Any]
+    ) -> Tuple[Optional[Tuple[str, str]], Tuple[str, str, str]]:
+        """(事業所番号の索引キー, 名前の索引キー)"""
+        office_key = None
+        if node_type in self.OFFICE_TYPES and properties.get("office_number"):
+            office_key = (node_type, NodeIdentity.normalize(properties["office_number"]))
+
+        parent_field = self.STAFF_TYPES.get(node_type)
+        parent_id = properties.get(parent_field, "") if parent_field else ""
+        name_key = (node_type, NodeIdentity.normalize(name), parent_id)
+        return office_key, name_key
+
+    def _canonical_id(self, key: Tuple[str, ...]) -> str:
+        """索引キーから決まるノードID（再構築しても変わらない）"""
+        digest = hashlib.sha1("|".join(key).encode("utf-8")).hexdigest()[:16]
+        return f"{key[0]}-{digest}"
+
+    def _rebuild_indexes(self):
+        """ノード・リレーションから索引を再構築"""
+        self.office_index = {}
+        self.name_index = {}
+        self.relation_index = {}
+        self.resolver = EntityResolver(self.resolver.threshold)
+
+        for node in self.nodes.values():
+            if node["type"] not in self.SHARED_PROPERTIES:
+                continue
+            office_key, name_key = self._index_keys(node["type"], node["name"], node["properties"])
+            if office_key:
+                self.office_index.setdefault(office_key, node["id"])
+            self.name_index.setdefault(name_key, node["id"])
+            self.resolver.add(
+                node["id"], node["type"], node["name"],
+                node["properties"].get("office_number"), name_key[2]
+            )
+
+        for relation in self.relations.values():
+            key = (relation["type"], relation["source_id"], relation["target_id"])
+            self.relation_index.setdefault(key, relation["id"])
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("=== GraphMerger テスト ===")
+
+    merger = GraphMerger()
+    for path in sys.argv[1:]:
+        with open(path, "r", encoding="utf-8") as f:
+            merger.add_ecomap(json.load(f))
+
+    print(f"ケース数: {len(merger.cases)}, ノード数: {len(merger.nodes)}")
+    for node in merger.shared_nodes():
+        print(f"{node['type']} {node['name']}: {', '.join(merger.clients_of(node['id']))}")
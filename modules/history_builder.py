@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+履歴モジュール
+
+更新された手帳、変更された支援区分、見直されたサービス等利用計画などの同じ種類のノードを
+日付順に並べ、新しいものから古いものへ RENEWED_FROM / CHANGED_FROM / REVISED_FROM で
+つないだ履歴のチェーンを作ります。各ノードには最新（現在）かどうかを記録するため、
+ビューアーは履歴を既定で隠し、現在のものだけを表示できます。
+"""
+
+import copy
+from typing import Dict, List, Any, Optional
+
+from .relation_generator import RelationGenerator
+
+
+class HistoryBuilder:
+    """履歴チェーン作成クラス"""
+
+    # 履歴をつなぐノードタイプ
+    # → (並べる日付のプロパティ, リレーションを生成する RelationGenerator のメソッド)
+    # 手帳は種類ごとに別のチェーンにします
+    HISTORY_RULES = {
+        "RyoikuNotebook": ("issue_date", "generate_renewed_from_relation"),
+        "MentalHealthNotebook": ("issue_date", "generate_renewed_from_relation"),
+        "PhysicalDisabilityNotebook": ("issue_date", "generate_renewed_from_relation"),
+        "SupportLevel": ("decision_date", "generate_changed_from_relation"),
+        "ServicePlan": ("creation_date", "generate_revised_from_relation"),
+    }
+
+    # 履歴のリレーションタイプ
+    RELATION_TYPES = ("RENEWED_FROM", "CHANGED_FROM", "REVISED_FROM")
+
+    def __init__(self, generator: Optional[RelationGenerator] = None):
+        """
+        初期化
+
+        Args:
+            generator: リレーションを追加する RelationGenerator（省略時は新しく作成）
+        """
+        self.generator = generator or RelationGenerator()
+
+    def build(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        履歴のチェーンを作成
+
+        各ノードに history（chain: ノードタイプ, version: 古い順の番号,
+        is_current: 最新かどうか）を記録し、新しいノード→1つ前のノードのリレーションを
+        生成します。日付のないノードは最も古いものとして扱います。
+
+        Args:
+            nodes: ノードのリスト
+
+        Returns:
+            生成した履歴のリレーションのリスト
+        """
+        chains: Dict[str, List[Dict[str, Any]]] = {}
+        for node in nodes:
+            if node["type"] in self.HISTORY_RULES:
+                chains.setdefault(node["type"], []).append(node)
+
+        relations = []
+        for node_type, chain in chains.items():
+            date_field, method_name = self.HISTORY_RULES[node_type]
+            create_relation = getattr(self.generator, method_name)
+            # 同じ日付は出現順（元のシートの行順）を保つ
+            chain.sort(key=lambda n: n.get("properties", {}).get(date_field) or "")
+
+            for version, node in enumerate(chain, 1):
+                node["history"] = {
+                    "chain": node_type,
+                    "version": version,
+                    "is_current": version == len(chain),
+                }
+                if version > 1:
+                    relations.append(create_relation(node["id"], chain[version - 2]["id"]))
+        return relations
+
+    @staticmethod
+    def current_view(json_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        現在のノードだけのエコマップ（置き換えられた履歴のノードとそのリレーションを除く）
+
+        Args:
+            json_data: エコマップのJSONデータ
+
+        Returns:
+            エコマップのJSONデータ（コピー）
+        """
+        return HistoryBuilder._filter(json_data, current=True)
+
+    @staticmethod
+    def history_view(json_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        履歴のチェーンだけのエコマップ（本人と、履歴をつないだノードとそのリレーション）
+
+        Args:
+            json_data: エコマップのJSONデータ
+
+        Returns:
+            エコマップのJSONデータ（コピー）
+        """
+        return HistoryBuilder._filter(json_data, current=False)
+
+    @staticmethod
+    def _filter(json_data: Dict[str, Any], current: bool) -> Dict[str, Any]:
+        """現在のノード、または本人と履歴のノードに絞り込む"""
+        def keep(node):
+            history = node.get("history")
+            if current:
+                return not history or history["is_current"]
+            return node["type"] == "Person" or bool(history)
+
+        result = copy.deepcopy(json_data)
+        result["nodes"] = [node for node in result.get("nodes", []) if keep(node)]
+        node_ids = {node["id"] for node in result["nodes"]}
+        result["relations"] = [
+            relation for relation in result.get("relations", [])
+            if relation["source_id"] in node_ids and relation["target_id"] in node_ids
+        ]
+        return result
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    print("=== HistoryBuilder テスト ===")
+
+    test_nodes = [
+        {"id": "1", "type": "SupportLevel", "name": "支援区分3",
+         "properties": {"decision_date": "2021-04-01"}},
+        {"id": "2", "type": "SupportLevel", "name": "支援区分4",
+         "properties": {"decision_date": "2024-04-01"}},
+        {"id": "3", "type": "RyoikuNotebook", "name": "療育手帳 B1",
+         "properties": {"issue_date": "2015-04-01"}},
+        {"id": "4", "type": "RyoikuNotebook", "name": "療育手帳 A2",
+         "properties": {"issue_date": "2020-04-01"}},
+    ]
+    for relation in HistoryBuilder().build(test_nodes):
+        print(f"{relation['type']}: {relation['source_id']} → {relation['target_id']}")
+    json.dump([n["history"] for n in test_nodes], sys.stdout, ensure_ascii=False)
+    print()
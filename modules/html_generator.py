@@ -7,165 +7,184 @@ HTML生成モジュール
 D3.jsまたはCytoscape.jsを使用してエコマップのHTMLを生成します。
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+import base64
+import gzip
 import json
 
+from .layout_cache import LayoutCache
+from .layout_engine import LayoutEngine
+from .node_aggregator import NodeAggregator
+from .node_identity import NodeIdentity
+
 
 class HTMLGenerator:
     """HTML生成クラス"""
-    
-    def __init__(self, visualization: str = "d3"):
-        """
-        初期化
-        
-        Args:
-            visualization: 可視化ライブラリ（"d3" or "cytoscape"）
-        """
-        self.visualization = visualization
-    
-    def generate(self, json_data: Dict[str, Any], person_name: str) -> str:
-        """
-        HTMLを生成
-        
-        Args:
-            json_data: JSONデータ
-            person_name: 本人氏名
-            
-        Returns:
-            HTML文字列
-        """
-        if self.visualization == "d3":
-            return self._generate_d3_html(json_data, person_name)
-        elif self.visualization == "cytoscape":
-            return self._generate_cytoscape_html(json_data, person_name)
-        else:
-            raise ValueError(f"不明な可視化ライブラリ: {self.visualization}")
-    
-    def _generate_d3_html(self, json_data: Dict[str, Any], person_name: str) -> str:
-        """
-        D3.jsを使用したHTMLを生成
-        
-        Args:
-            json_data: JSONデータ
-            person_name: 本人氏名
-            
-        Returns:
-            HTML文字列
-        """
-        # JSONデータをJavaScript用にエスケープ
-        json_str = json.dumps(json_data, ensure_ascii=False, indent=2)
-        
-        html = f"""<!DOCTYPE html>
-<html lang="ja">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>エコマップ - {person_name}</title>
-    <script src="https://d3js.org/d3.v7.min.js"></script>
-    <style>
-        body {{
+
+    # 表示レイヤー（レイヤー名, 表示名, 初期表示）
+    LAYERS = [
+        ("person", "本人", True),
+        ("family", "家族", True),
+        ("notebooks", "手帳", True),
+        ("support_levels", "支援区分", True),
+        ("diagnoses", "診断", False),
+        ("legal_guardians", "成年後見", True),
+        ("consultation_supports", "相談支援", False),
+        ("service_plans", "利用計画", True),
+        ("service_contracts", "サービス契約", True),
+        ("medical", "医療", False),
+    ]
+
+    # 色名とカラーコードの対応
+    COLOR_MAP = {
+        "orange": "#FF6B35",
+        "red": "#E63946",
+        "darkred": "#9D0208",
+        "darkgreen": "#2D6A4F",
+        "darkblue": "#1D3557",
+        "purple": "#7209B7",
+        "lightblue": "#4CC9F0",
+        "brown": "#8B4513",
+        "blue": "#4361EE",
+        "blueviolet": "#7209B7",
+        "green": "#52B788",
+        "gray": "#6C757D",
+        "pink": "#FF6B9D",
+    }
+
+    # ノードサイズと半径（px）の対応
+    SIZE_MAP = {
+        "large": 40,
+        "medium": 25,
+        "small": 15,
+    }
+
+    # ビューアーが描画に使うフィールド（軽量ペイロード用）
+    VIEWER_NODE_FIELDS = ("id", "type", "name", "layer", "display", "is_default_visible", "history")
+    VIEWER_RELATION_FIELDS = (
+        "id", "type", "source_id", "target_id", "direction", "display", "layer",
+    )
+
+    # D3.js版の力学シミュレーションの実行方式
+    SIMULATION_MODES = ("main", "worker", "throttled")
+
+    # 省電力方式（throttled）の設定
+    THROTTLE_MAX_TICKS_PER_FRAME = 3  # 1フレームあたりの最大tick数
+    THROTTLE_ENERGY_THRESHOLD = 0.02  # この運動エネルギー（平均速度の2乗）未満で停止
+
+    # 可視化ライブラリのCDN
+    D3_SCRIPT_URL = "https://d3js.org/d3.v7.min.js"
+    CYTOSCAPE_SCRIPT_URL = "https://unpkg.com/cytoscape@3.30.2/dist/cytoscape.min.js"
+
+    PAGE_STYLES = """
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             margin: 0;
             padding: 20px;
             background-color: #f5f5f5;
-        }}
-        
-        #container {{
+        }
+
+        #container {
             max-width: 1400px;
             margin: 0 auto;
             background-color: white;
             border-radius: 8px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        
-        #header {{
+        }
+
+        #header {
             padding: 20px 30px;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             border-radius: 8px 8px 0 0;
-        }}
-        
-        h1 {{
+        }
+
+        h1 {
             margin: 0 0 10px 0;
             font-size: 28px;
-        }}
-        
-        .subtitle {{
+        }
+
+        .subtitle {
             margin: 0;
             opacity: 0.9;
             font-size: 14px;
-        }}
-        
-        #controls {{
+        }
+
+        #controls {
             padding: 20px 30px;
             border-bottom: 1px solid #e0e0e0;
             background-color: #fafafa;
-        }}
-        
-        .control-group {{
+        }
+
+        .control-group {
             margin-bottom: 15px;
-        }}
-        
-        .control-group:last-child {{
+        }
+
+        .control-group:last-child {
             margin-bottom: 0;
-        }}
-        
-        .control-label {{
+        }
+
+        .control-label {
             font-weight: 600;
             margin-bottom: 8px;
             display: block;
             color: #333;
-        }}
-        
-        .checkbox-group {{
+        }
+
+        .checkbox-group {
             display: flex;
             flex-wrap: wrap;
             gap: 15px;
-        }}
-        
-        .checkbox-item {{
+        }
+
+        .checkbox-item {
             display: flex;
             align-items: center;
-        }}
-        
-        .checkbox-item input[type="checkbox"] {{
+        }
+
+        .checkbox-item input[type="checkbox"] {
             margin-right: 5px;
             cursor: pointer;
-        }}
-        
-        .checkbox-item label {{
+        }
+
+        .checkbox-item label {
             cursor: pointer;
             user-select: none;
-        }}
-        
-        #ecomap {{
+        }
+
+        #save-layout, #collapse-groups {
+            padding: 4px 12px;
+            cursor: pointer;
+        }
+
+        #ecomap {
             width: 100%;
             height: 700px;
             border-radius: 0 0 8px 8px;
-        }}
-        
-        .node {{
+        }
+
+        .node {
             cursor: pointer;
             stroke: #fff;
             stroke-width: 2px;
-        }}
-        
-        .node:hover {{
+        }
+
+        .node:hover {
             stroke: #333;
             stroke-width: 3px;
-        }}
-        
-        .link {{
+        }
+
+        .link {
             stroke-opacity: 0.6;
-        }}
-        
-        .label {{
+        }
+
+        .label {
             font-size: 12px;
             pointer-events: none;
             text-shadow: 0 1px 2px rgba(255,255,255,0.8);
-        }}
-        
-        .tooltip {{
+        }
+
+        .tooltip {
             position: absolute;
             padding: 12px;
             background: rgba(0, 0, 0, 0.9);
@@ -176,132 +195,432 @@ class HTMLGenerator:
             max-width: 300px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.3);
             z-index: 1000;
-        }}
-        
-        .tooltip-title {{
+        }
+
+        .tooltip-title {
             font-weight: 600;
             margin-bottom: 5px;
             border-bottom: 1px solid rgba(255,255,255,0.3);
             padding-bottom: 5px;
-        }}
-        
-        .tooltip-content {{
+        }
+
+        .tooltip-content {
             font-size: 12px;
             line-height: 1.5;
-        }}
-    </style>
-</head>
-<body>
-    <div id="container">
-        <div id="header">
-            <h1>エコマップ - {person_name}</h1>
-            <p class="subtitle">支援関係図</p>
-        </div>
-        
-        <div id="controls">
-            <div class="control-group">
-                <div class="control-label">表示レイヤー</div>
-                <div class="checkbox-group">
-                    <div class="checkbox-item">
-                        <input type="checkbox" id="layer-person" checked disabled>
-                        <label for="layer-person">本人</label>
-                    </div>
-                    <div class="checkbox-item">
-                        <input type="checkbox" id="layer-family" checked>
-                        <label for="layer-family">家族</label>
-                    </div>
-                    <div class="checkbox-item">
-                        <input type="checkbox" id="layer-notebooks" checked>
-                        <label for="layer-notebooks">手帳</label>
-                    </div>
-                    <div class="checkbox-item">
-                        <input type="checkbox" id="layer-support_levels" checked>
-                        <label for="layer-support_levels">支援区分</label>
-                    </div>
-                    <div class="checkbox-item">
-                        <input type="checkbox" id="layer-diagnoses">
-                        <label for="layer-diagnoses">診断</label>
-                    </div>
-                    <div class="checkbox-item">
-                        <input type="checkbox" id="layer-legal_guardians" checked>
-                        <label for="layer-legal_guardians">成年後見</label>
-                    </div>
-                    <div class="checkbox-item">
-                        <input type="checkbox" id="layer-consultation_supports">
-                        <label for="layer-consultation_supports">相談支援</label>
-                    </div>
-                    <div class="checkbox-item">
-                        <input type="checkbox" id="layer-service_plans" checked>
-                        <label for="layer-service_plans">利用計画</label>
-                    </div>
-                    <div class="checkbox-item">
-                        <input type="checkbox" id="layer-service_contracts" checked>
-                        <label for="layer-service_contracts">サービス契約</label>
-                    </div>
-                    <div class="checkbox-item">
-                        <input type="checkbox" id="layer-medical">
-                        <label for="layer-medical">医療</label>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <svg id="ecomap"></svg>
-    </div>
-    
-    <script>
-        // データをロード
-        const data = {json_str};
-        
+        }
+
+        #details {
+            padding: 15px 30px;
+            border-top: 1px solid #e0e0e0;
+            font-size: 13px;
+        }
+
+        #details table {
+            border-collapse: collapse;
+        }
+
+        #details th, #details td {
+            text-align: left;
+            padding: 3px 12px 3px 0;
+            vertical-align: top;
+        }
+
+        #details th {
+            color: #666;
+            font-weight: 600;
+        }
+    """
+
+    # 圧縮ペイロード用: DecompressionStream非対応ブラウザ向けのgzip展開処理
+    INFLATE_JS = """        // DecompressionStream非対応ブラウザ向けのgzip展開（RFC 1951/1952）
+        function inflateGzip(bytes) {
+            const LENGTH_BASE = [3, 4, 5, 6, 7, 8, 9, 10, 11, 13, 15, 17, 19, 23, 27, 31,
+                35, 43, 51, 59, 67, 83, 99, 115, 131, 163, 195, 227, 258];
+            const LENGTH_EXTRA = [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2,
+                3, 3, 3, 3, 4, 4, 4, 4, 5, 5, 5, 5, 0];
+            const DIST_BASE = [1, 2, 3, 4, 5, 7, 9, 13, 17, 25, 33, 49, 65, 97, 129, 193,
+                257, 385, 513, 769, 1025, 1537, 2049, 3073, 4097, 6145, 8193, 12289, 16385, 24577];
+            const DIST_EXTRA = [0, 0, 0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6,
+                7, 7, 8, 8, 9, 9, 10, 10, 11, 11, 12, 12, 13, 13];
+            const CODE_LENGTH_ORDER = [
+                16, 17, 18, 0, 8, 7, 9, 6, 10, 5, 11, 4, 12, 3, 13, 2, 14, 1, 15];
+
+            if (bytes[0] !== 0x1f || bytes[1] !== 0x8b || bytes[2] !== 8) {
+                throw new Error('gzip形式のデータではありません');
+            }
+            // ヘッダーの付加情報（FEXTRA, FNAME, FCOMMENT, FHCRC）を読み飛ばす
+            const flags = bytes[3];
+            let pos = 10;
+            if (flags & 4) pos += 2 + (bytes[pos] | (bytes[pos + 1] << 8));
+            if (flags & 8) while (bytes[pos++] !== 0);
+            if (flags & 16) while (bytes[pos++] !== 0);
+            if (flags & 2) pos += 2;
+
+            let bitBuffer = 0, bitCount = 0;
+            function bits(n) {
+                while (bitCount < n) {
+                    if (pos >= bytes.length) throw new Error('圧縮データが途中で終わっています');
+                    bitBuffer |= bytes[pos++] << bitCount;
+                    bitCount += 8;
+                }
+                const value = bitBuffer & ((1 << n) - 1);
+                bitBuffer >>>= n;
+                bitCount -= n;
+                return value;
+            }
+
+            let out = new Uint8Array(bytes.length * 4), outLength = 0;
+            function put(byte) {
+                if (outLength === out.length) {
+                    const grown = new Uint8Array(out.length * 2);
+                    grown.set(out);
+                    out = grown;
+                }
+                out[outLength++] = byte;
+            }
+
+            // 符号長の一覧から正準ハフマン符号の表（符号長ごとの個数と符号順の記号）を作る
+            function huffman(lengths) {
+                const counts = new Uint16Array(16), offsets = new Uint16Array(16);
+                const symbols = new Uint16Array(lengths.length);
+                lengths.forEach(length => counts[length]++);
+                counts[0] = 0;
+                for (let i = 1; i < 16; i++) offsets[i] = offsets[i - 1] + counts[i - 1];
+                lengths.forEach((length, symbol) => {
+                    if (length) symbols[offsets[length]++] = symbol;
+                });
+                return { counts, symbols };
+            }
+            function decode(table) {
+                let code = 0, first = 0, index = 0;
+                for (let length = 1; length < 16; length++) {
+                    code |= bits(1);
+                    const count = table.counts[length];
+                    if (code - count < first) return table.symbols[index + code - first];
+                    index += count;
+                    first = (first + count) << 1;
+                    code <<= 1;
+                }
+                throw new Error('不正な圧縮データです');
+            }
+
+            let last;
+            do {
+                last = bits(1);
+                const type = bits(2);
+                if (type === 0) {
+                    // 非圧縮ブロック（バイト境界から長さ・長さの補数・データ）
+                    bitBuffer = 0;
+                    bitCount = 0;
+                    const length = bytes[pos] | (bytes[pos + 1] << 8);
+                    pos += 4;
+                    for (let i = 0; i < length; i++) put(bytes[pos++]);
+                    continue;
+                }
+
+                let literals, distances;
+                if (type === 1) {
+                    const lengths = new Uint8Array(288);
+                    lengths.fill(8, 0, 144).fill(9, 144, 256).fill(7, 256, 280).fill(8, 280);
+                    literals = huffman(lengths);
+                    distances = huffman(new Uint8Array(30).fill(5));
+                } else if (type === 2) {
+                    const literalCount = bits(5) + 257, distanceCount = bits(5) + 1;
+                    const codeLengthCount = bits(4) + 4;
+                    const codeLengths = new Uint8Array(19);
+                    for (let i = 0; i < codeLengthCount; i++) {
+                        codeLengths[CODE_LENGTH_ORDER[i]] = bits(3);
+                    }
+                    const codeLengthTable = huffman(codeLengths);
+                    const lengths = new Uint8Array(literalCount + distanceCount);
+                    for (let i = 0; i < lengths.length;) {
+                        const symbol = decode(codeLengthTable);
+                        if (symbol < 16) {
+                            lengths[i++] = symbol;
+                            continue;
+                        }
+                        const value = symbol === 16 ? lengths[i - 1] : 0;
+                        let repeat;
+                        if (symbol === 16) repeat = 3 + bits(2);
+                        else if (symbol === 17) repeat = 3 + bits(3);
+                        else repeat = 11 + bits(7);
+                        while (repeat--) lengths[i++] = value;
+                    }
+                    literals = huffman(lengths.subarray(0, literalCount));
+                    distances = huffman(lengths.subarray(literalCount));
+                } else {
+                    throw new Error('不正な圧縮データです');
+                }
+
+                for (;;) {
+                    const symbol = decode(literals);
+                    if (symbol < 256) {
+                        put(symbol);
+                    } else if (symbol === 256) {
+                        break;
+                    } else {
+                        const length = LENGTH_BASE[symbol - 257] + bits(LENGTH_EXTRA[symbol - 257]);
+                        const code = decode(distances);
+                        const distance = DIST_BASE[code] + bits(DIST_EXTRA[code]);
+                        for (let i = 0; i < length; i++) put(out[outLength - distance]);
+                    }
+                }
+            } while (!last);
+            return out.subarray(0, outLength);
+        }
+
+"""
+
+    def __init__(
+        self,
+        visualization: str = "d3",
+        slim_payload: bool = False,
+        compress_payload: bool = False,
+        simulation: str = "main",
+        collapse_groups: bool = True
+    ):
+        """
+        初期化
+
+        Args:
+            visualization: 可視化ライブラリ（"d3" or "cytoscape"）
+            slim_payload: 描画に必要なフィールドのみを埋め込み、
+                詳細情報は別ブロックに分けてクリック時に読み込む
+            compress_payload: 埋め込みデータをgzip+base64で圧縮し、
+                ブラウザのDecompressionStream（非対応ブラウザでは同梱の展開処理）で展開する
+            simulation: D3.js版の力学シミュレーションの実行方式
+                （"main": メインスレッド, "worker": Web Worker,
+                "throttled": tick数を制限し収束後に停止する省電力方式）
+            collapse_groups: 処方薬・契約などの多数の衛星ノードを集約ノードにまとめ、
+                クリック時に展開する
+        """
+        if simulation not in self.SIMULATION_MODES:
+            raise ValueError(f"不明なシミュレーション方式: {simulation}")
+
+        self.visualization = visualization
+        self.slim_payload = slim_payload
+        self.compress_payload = compress_payload
+        self.simulation = simulation
+        self.collapse_groups = collapse_groups
+
+    def generate(
+        self,
+        json_data: Dict[str, Any],
+        person_name: str,
+        layout: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        HTMLを生成
+
+        Args:
+            json_data: JSONデータ
+            person_name: 本人氏名
+            layout: 初期配置（"positions": ノードID→(x, y)、"person_key": 本人キャッシュキー、
+                "warm_start": キャッシュした配置を再利用したか）。省略時は放射状配置
+
+        Returns:
+            HTML文字列
+        """
+        # 識別キーは詳細情報を含む元のノードから作成する
+        layout_data = self._build_layout(json_data, layout)
+        json_data = self._attach_aggregates(json_data)
+
+        details = None
+        if self.slim_payload:
+            json_data, details = self.project_payload(json_data)
+
+        library_url, graph_element, script = self._generate_renderer(layout_data)
+
+        return self._render_page(
+            person_name,
+            library_url,
+            graph_element,
+            script,
+            json_data,
+            details
+        )
+
+    def generate_case_viewer(self) -> str:
+        """
+        ケース一覧ページから開く共通ビューアーのHTMLを生成
+
+        データを埋め込まず、URLの ?case=ID で指定されたケースのデータファイル
+        （cases/ID.js、build_case_payloadの結果）を読み込んで描画します。
+        ビューアー本体と描画ライブラリはブラウザにキャッシュされ、
+        ケースごとにはデータだけを読み込みます。
+
+        Returns:
+            HTML文字列
+        """
+        library_url, graph_element, script = self._generate_renderer(None)
+        return self._render_page("", library_url, graph_element, script, None)
+
+    def build_case_payload(
+        self,
+        json_data: Dict[str, Any],
+        layout: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        共通ビューアーで読み込む1ケース分のデータを作成
+
+        Args:
+            json_data: JSONデータ
+            layout: 初期配置（generateと同じ形式）
+
+        Returns:
+            集約ノード（aggregates）と初期配置（layout）を含むデータ
+        """
+        layout_data = self._build_layout(json_data, layout)
+        return dict(self._attach_aggregates(json_data), layout=layout_data)
+
+    def _generate_renderer(self, layout: Optional[Dict[str, Any]]) -> Tuple[str, str, str]:
+        """
+        可視化ライブラリに応じた描画部分を生成
+
+        Returns:
+            (ライブラリのURL, グラフ描画先の要素, renderEcomap(data) の本体)
+        """
+        if self.visualization == "d3":
+            return self.D3_SCRIPT_URL, '<svg id="ecomap"></svg>', self._generate_d3_script(layout)
+        if self.visualization == "cytoscape":
+            return (
+                self.CYTOSCAPE_SCRIPT_URL,
+                '<div id="ecomap"></div>',
+                self._generate_cytoscape_script(layout)
+            )
+        raise ValueError(f"不明な可視化ライブラリ: {self.visualization}")
+
+    def _attach_aggregates(self, json_data: Dict[str, Any]) -> Dict[str, Any]:
+        """集約ノードを計算し、あればデータに追加"""
+        if not self.collapse_groups:
+            return json_data
+        aggregates = NodeAggregator().aggregate(json_data["nodes"], json_data["relations"])
+        return dict(json_data, aggregates=aggregates) if aggregates else json_data
+
+    def _build_layout(
+        self,
+        json_data: Dict[str, Any],
+        layout: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        ビューアーに埋め込む初期配置と配置保存用の識別キーを作成
+
+        Args:
+            json_data: JSONデータ
+            layout: 呼び出し元が指定した初期配置
+
+        Returns:
+            person_key, warm_start, positions（ノードID→[x, y]）, keys（ノードID→識別キー）
+        """
+        layout = layout or {}
+        positions = layout.get("positions")
+        if positions is None:
+            positions = LayoutEngine().compute(json_data["nodes"], json_data["relations"])
+
+        person_key = layout.get("person_key") or LayoutCache.person_key(json_data.get("person", {}))
+        return {
+            "person_key": person_key,
+            "warm_start": bool(layout.get("warm_start")),
+            "positions": {node_id: [x, y] for node_id, (x, y) in positions.items()},
+            "keys": NodeIdentity.node_keys(json_data["nodes"]),
+        }
+
+    def project_payload(self, json_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        ビューアー用の軽量ペイロードと詳細情報に分割
+
+        ツールチップと描画に使うフィールド（名前・タイプ・レイヤー・表示設定・年齢）
+        のみを残し、住所・電話番号・備考などの詳細はノードIDをキーにした
+        別の辞書に移します。
+
+        Args:
+            json_data: JSONデータ
+
+        Returns:
+            (軽量ペイロード, ノードID→詳細情報)
+        """
+        nodes = []
+        details = {}
+        for node in json_data["nodes"]:
+            slim_node = {field: node[field] for field in self.VIEWER_NODE_FIELDS if field in node}
+            properties = node.get("properties", {})
+            slim_node["properties"] = {"age": properties["age"]} if properties.get("age") else {}
+            nodes.append(slim_node)
+
+            detail_properties = {k: v for k, v in properties.items() if v not in ("", None)}
+            if detail_properties:
+                details[node["id"]] = detail_properties
+
+        relations = [
+            {field: relation[field] for field in self.VIEWER_RELATION_FIELDS if field in relation}
+            for relation in json_data["relations"]
+        ]
+
+        payload = {
+            key: value for key, value in json_data.items() if key not in ("nodes", "relations")
+        }
+        payload["nodes"] = nodes
+        payload["relations"] = relations
+        return payload, details
+
+    def _generate_d3_script(self, layout: Optional[Dict[str, Any]]) -> str:
+        """
+        D3.jsを使用した描画スクリプトを生成
+
+        Args:
+            layout: 初期配置（_build_layoutの結果、Noneの場合はdata.layoutを使う）
+
+        Returns:
+            renderEcomap(data) の本体となるJavaScript
+        """
+        script = f"""
         // SVG設定
         const width = document.getElementById('ecomap').clientWidth;
         const height = 700;
-        
+
         const svg = d3.select('#ecomap')
             .attr('width', width)
             .attr('height', height);
-        
+
         // ツールチップ
         const tooltip = d3.select('body')
             .append('div')
             .attr('class', 'tooltip')
             .style('opacity', 0);
-        
-        // Force Simulationの設定
-        const simulation = d3.forceSimulation(data.nodes)
-            .force('link', d3.forceLink(data.relations).id(d => d.id).distance(150))
-            .force('charge', d3.forceManyBody().strength(-400))
-            .force('center', d3.forceCenter(width / 2, height / 2))
-            .force('collision', d3.forceCollide().radius(d => getSizeValue(d.display.size) + 10));
-        
-        // ノードサイズの変換
-        function getSizeValue(size) {{
-            if (size === 'large') return 40;
-            if (size === 'medium') return 25;
-            if (size === 'small') return 15;
-            return 25;
-        }}
-        
-        // 色の変換
-        function getColorValue(color) {{
-            const colorMap = {{
-                'orange': '#FF6B35',
-                'red': '#E63946',
-                'darkred': '#9D0208',
-                'darkgreen': '#2D6A4F',
-                'darkblue': '#1D3557',
-                'purple': '#7209B7',
-                'lightblue': '#4CC9F0',
-                'brown': '#8B4513',
-                'blue': '#4361EE',
-                'blueviolet': '#7209B7',
-                'green': '#52B788',
-                'gray': '#6C757D',
-                'pink': '#FF6B9D'
+
+{self._get_helper_functions_js()}
+
+{self._get_layout_js(layout)}
+
+{self._get_aggregates_js()}
+
+        // 事前計算した座標から開始（キャッシュした配置の場合は小さく揺らすだけ）
+        data.nodes.forEach(n => {{
+            const p = layout.positions[n.id];
+            if (p) {{
+                n.x = width / 2 + p[0];
+                n.y = height / 2 + p[1];
+            }}
+        }});
+        const initialAlpha = layout.warm_start ? 0.1 : 1;
+
+        // リンクの端点をノードオブジェクトに解決
+        // （シミュレーション対象外のリンクも描画できるように）
+        const nodeById = new Map(data.nodes.map(n => [n.id, n]));
+        data.relations.forEach(r => {{
+            r.source = nodeById.get(r.source_id);
+            r.target = nodeById.get(r.target_id);
+        }});
+
+        // シミュレーション対象（折りたたまれたノードを除く）
+        function simulatedGraph() {{
+            return {{
+                nodes: data.nodes.filter(n => !isHiddenByGroup(n.id)),
+                links: data.relations.filter(r =>
+                    !isHiddenByGroup(r.source_id) && !isHiddenByGroup(r.target_id))
             }};
-            return colorMap[color] || color;
         }}
-        
+
         // リンクの描画
         const link = svg.append('g')
             .selectAll('line')
@@ -312,7 +631,7 @@ class HTMLGenerator:
             .attr('stroke-width', d => d.display.line_width)
             .attr('stroke-dasharray', d => d.display.line_style === 'dashed' ? '5,5' : '0')
             .attr('marker-end', d => d.display.arrow ? 'url(#arrow)' : '');
-        
+
         // 矢印マーカーの定義
         svg.append('defs').append('marker')
             .attr('id', 'arrow')
@@ -325,7 +644,7 @@ class HTMLGenerator:
             .append('path')
             .attr('d', 'M0,-5L10,0L0,5')
             .attr('fill', '#999');
-        
+
         // ノードの描画
         const node = svg.append('g')
             .selectAll('circle')
@@ -335,20 +654,10 @@ class HTMLGenerator:
             .attr('r', d => getSizeValue(d.display.size))
             .attr('fill', d => getColorValue(d.display.color))
             .on('mouseover', function(event, d) {{
-                // ツールチップ表示
-                let content = `<div class="tooltip-title">${{d.name}}</div>`;
-                content += `<div class="tooltip-content">`;
-                content += `タイプ: ${{d.type}}<br>`;
-                content += `レイヤー: ${{d.layer}}<br>`;
-                if (d.properties.age) {{
-                    content += `年齢: ${{d.properties.age}}歳<br>`;
-                }}
-                content += `</div>`;
-                
                 tooltip.transition()
                     .duration(200)
                     .style('opacity', .9);
-                tooltip.html(content)
+                tooltip.html(getTooltipContent(d))
                     .style('left', (event.pageX + 10) + 'px')
                     .style('top', (event.pageY - 28) + 'px');
             }})
@@ -357,11 +666,13 @@ class HTMLGenerator:
                     .duration(500)
                     .style('opacity', 0);
             }})
+            .on('click', (event, d) =>
+                d.type === 'Aggregate' ? expandGroup(d.id) : showDetails(d.id))
             .call(d3.drag()
                 .on('start', dragstarted)
                 .on('drag', dragged)
                 .on('end', dragended));
-        
+
         // ラベルの描画
         const label = svg.append('g')
             .selectAll('text')
@@ -371,68 +682,955 @@ class HTMLGenerator:
             .attr('dx', 12)
             .attr('dy', 4)
             .text(d => d.display.label);
-        
-        // Simulationの更新
-        simulation.on('tick', () => {{
+
+        // 座標の反映
+        function ticked() {{
             link
                 .attr('x1', d => d.source.x)
                 .attr('y1', d => d.source.y)
                 .attr('x2', d => d.target.x)
                 .attr('y2', d => d.target.y);
-            
+
             node
                 .attr('cx', d => d.x)
                 .attr('cy', d => d.y);
-            
+
             label
                 .attr('x', d => d.x)
                 .attr('y', d => d.y);
-        }});
-        
+        }}
+
+{self._get_simulation_js()}
+
+        // 表示の更新（レイヤーと集約ノードの状態を反映）
+        function applyVisibility() {{
+            const visible = new Set(data.nodes.filter(isNodeVisible).map(n => n.id));
+            node.style('display', d => visible.has(d.id) ? null : 'none');
+            label.style('display', d => visible.has(d.id) ? null : 'none');
+            link.style('display', d =>
+                visible.has(d.source_id) && visible.has(d.target_id) ? null : 'none');
+        }}
+
+        // レイヤー制御
+        function toggleLayer(layer) {{
+            applyVisibility();
+        }}
+
+        // 集約ノードの展開・折りたたみ（展開したメンバーは集約ノードの周りから動き出す）
+        function refreshGroups(group) {{
+            if (group) {{
+                const origin = nodeById.get(group.node.id);
+                group.member_ids.forEach((id, i) => {{
+                    const angle = 2 * Math.PI * i / group.member_ids.length;
+                    const member = nodeById.get(id);
+                    member.x = origin.x + 40 * Math.cos(angle);
+                    member.y = origin.y + 40 * Math.sin(angle);
+                }});
+            }} else {{
+                aggregates.forEach(g => {{
+                    const members = g.member_ids.map(id => nodeById.get(id));
+                    const aggregate = nodeById.get(g.node.id);
+                    aggregate.x = d3.mean(members, m => m.x);
+                    aggregate.y = d3.mean(members, m => m.y);
+                }});
+            }}
+            applyVisibility();
+            simulationDriver.refresh();
+        }}
+
+{self._get_layer_events_js()}
+
+        document.getElementById('save-layout')
+            .addEventListener('click', () => saveLayout(n => ({{ x: n.x, y: n.y }})));
+"""
+
+        return script
+
+    def _get_simulation_js(self) -> str:
+        """
+        D3.js版の力学シミュレーション部分を生成
+
+        どの方式でも、座標の反映は ticked()、ドラッグは
+        dragstarted / dragged / dragended で行います。
+        """
+        main_thread_js = """        // Force Simulationの設定
+        function startMainThreadSimulation() {
+            const graph = simulatedGraph();
+            const simulation = d3.forceSimulation(graph.nodes)
+                .force('link', d3.forceLink(graph.links).id(d => d.id).distance(150))
+                .force('charge', d3.forceManyBody().strength(-400))
+                .force('center', d3.forceCenter(width / 2, height / 2))
+                .force('collision', d3.forceCollide()
+                    .radius(d => getSizeValue(d.display.size) + 10))
+                .alpha(initialAlpha);
+
+            // Simulationの更新
+            simulation.on('tick', ticked);
+
+            return {
+                dragstarted(event, d) {
+                    if (!event.active) simulation.alphaTarget(0.3).restart();
+                    d.fx = d.x;
+                    d.fy = d.y;
+                },
+                dragged(event, d) {
+                    d.fx = event.x;
+                    d.fy = event.y;
+                },
+                dragended(event, d) {
+                    if (!event.active) simulation.alphaTarget(0);
+                    d.fx = null;
+                    d.fy = null;
+                },
+                refresh() {
+                    const graph = simulatedGraph();
+                    simulation.nodes(graph.nodes);
+                    simulation.force('link').links(graph.links);
+                    simulation.alpha(0.3).restart();
+                }
+            };
+        }"""
+
+        if self.simulation == "main":
+            start_js = "const simulationDriver = startMainThreadSimulation();"
+            extra_js = ""
+        elif self.simulation == "worker":
+            start_js = "const simulationDriver = startWorkerSimulation();"
+            extra_js = "\n\n" + self._get_worker_simulation_js()
+        else:
+            start_js = "const simulationDriver = startThrottledSimulation();"
+            extra_js = "\n\n" + self._get_throttled_simulation_js()
+
+        return f"""{main_thread_js}{extra_js}
+
+        {start_js}
+
         // ドラッグ関数
         function dragstarted(event, d) {{
-            if (!event.active) simulation.alphaTarget(0.3).restart();
-            d.fx = d.x;
-            d.fy = d.y;
+            simulationDriver.dragstarted(event, d);
         }}
-        
+
         function dragged(event, d) {{
-            d.fx = event.x;
-            d.fy = event.y;
+            simulationDriver.dragged(event, d);
         }}
-        
+
         function dragended(event, d) {{
-            if (!event.active) simulation.alphaTarget(0);
-            d.fx = null;
-            d.fy = null;
+            simulationDriver.dragended(event, d);
+        }}"""
+
+    def _get_throttled_simulation_js(self) -> str:
+        """
+        tick数を制限し、収束したら停止する省電力シミュレーションを生成
+
+        1フレームあたりのtick数に上限を設け、DOMへの書き込みはフレームごとに
+        1回にまとめます。運動エネルギーが閾値を下回るとループを止めるため、
+        収束後はCPUを使いません。ドラッグ時は近傍（隣接ノード）以外を固定して
+        再開します。
+        """
+        return f"""        // tick数を制限し、収束したら停止するシミュレーション
+        function startThrottledSimulation() {{
+            const MAX_TICKS_PER_FRAME = {self.THROTTLE_MAX_TICKS_PER_FRAME};
+            const ENERGY_THRESHOLD = {self.THROTTLE_ENERGY_THRESHOLD};
+
+            const graph = simulatedGraph();
+            const simulation = d3.forceSimulation(graph.nodes)
+                .force('link', d3.forceLink(graph.links).id(d => d.id).distance(150))
+                .force('charge', d3.forceManyBody().strength(-400))
+                .force('center', d3.forceCenter(width / 2, height / 2))
+                .force('collision', d3.forceCollide()
+                    .radius(d => getSizeValue(d.display.size) + 10))
+                .alpha(initialAlpha)
+                .stop();
+
+            // 隣接ノード（ドラッグ時に動かす範囲）
+            const neighbors = new Map(data.nodes.map(n => [n.id, new Set()]));
+            data.relations.forEach(r => {{
+                neighbors.get(r.source_id).add(r.target_id);
+                neighbors.get(r.target_id).add(r.source_id);
+            }});
+
+            function kineticEnergy() {{
+                // 折りたたみで隠れたノードを除き、シミュレーション中のノードだけで平均する
+                const nodes = simulation.nodes();
+                let energy = 0;
+                nodes.forEach(n => {{
+                    energy += (n.vx || 0) * (n.vx || 0) + (n.vy || 0) * (n.vy || 0);
+                }});
+                return energy / Math.max(nodes.length, 1);
+            }}
+
+            let running = false;
+            function frame() {{
+                for (let i = 0; i < MAX_TICKS_PER_FRAME; i++) {{
+                    simulation.tick();
+                }}
+                ticked();
+                const converged = kineticEnergy() < ENERGY_THRESHOLD
+                    || simulation.alpha() < simulation.alphaMin();
+                if (converged) {{
+                    // 収束したので停止（次の操作まで再描画しない）
+                    running = false;
+                    return;
+                }}
+                requestAnimationFrame(frame);
+            }}
+
+            function wake() {{
+                if (!running) {{
+                    running = true;
+                    requestAnimationFrame(frame);
+                }}
+            }}
+
+            wake();
+
+            let pinned = [];
+            return {{
+                dragstarted(event, d) {{
+                    // 近傍以外のノードを固定して局所的に再開
+                    const local = neighbors.get(d.id);
+                    pinned = data.nodes.filter(n => n !== d && !local.has(n.id) && n.fx == null);
+                    pinned.forEach(n => {{
+                        n.fx = n.x;
+                        n.fy = n.y;
+                    }});
+                    d.fx = d.x;
+                    d.fy = d.y;
+                    simulation.alpha(Math.max(simulation.alpha(), 0.3)).alphaTarget(0.1);
+                    wake();
+                }},
+                dragged(event, d) {{
+                    d.fx = event.x;
+                    d.fy = event.y;
+                    wake();
+                }},
+                dragended(event, d) {{
+                    simulation.alphaTarget(0);
+                    d.fx = null;
+                    d.fy = null;
+                    pinned.forEach(n => {{
+                        n.fx = null;
+                        n.fy = null;
+                    }});
+                    pinned = [];
+                    wake();
+                }},
+                refresh() {{
+                    const graph = simulatedGraph();
+                    simulation.nodes(graph.nodes);
+                    simulation.force('link').links(graph.links);
+                    simulation.alpha(Math.max(simulation.alpha(), 0.3));
+                    wake();
+                }}
+            }};
+        }}"""
+
+    def _get_worker_simulation_js(self) -> str:
+        """
+        Web Workerで力学シミュレーションを実行するスクリプトを生成
+
+        Worker側でtickをまとめて進め、座標をFloat32Arrayで転送します。
+        メインスレッドは受信した最新の座標だけをrequestAnimationFrameで描画するため、
+        ツールチップやスクロール、チェックボックス操作が妨げられません。
+        Workerを起動できない環境ではメインスレッドの実行に切り替えます。
+        """
+        worker_source = """importScripts(%s);
+
+let simulation = null;
+let nodes = [];
+let running = false;
+
+// 1回の送信までに計算する時間（ミリ秒）
+const FRAME_BUDGET = 12;
+
+function postPositions() {
+    const buffer = new Float32Array(nodes.length * 2);
+    nodes.forEach((n, i) => {
+        buffer[i * 2] = n.x;
+        buffer[i * 2 + 1] = n.y;
+    });
+    self.postMessage({ type: 'positions', buffer: buffer.buffer }, [buffer.buffer]);
+}
+
+function run() {
+    if (running) return;
+    running = true;
+    (function step() {
+        const start = performance.now();
+        do {
+            simulation.tick();
+        } while (
+            simulation.alpha() >= simulation.alphaMin()
+            && performance.now() - start < FRAME_BUDGET
+        );
+        postPositions();
+        if (simulation.alpha() >= simulation.alphaMin()) {
+            setTimeout(step, 0);
+        } else {
+            running = false;
+        }
+    })();
+}
+
+self.onmessage = event => {
+    const message = event.data;
+    if (message.type === 'init') {
+        nodes = message.nodes;
+        simulation = d3.forceSimulation(message.active.map(i => nodes[i]))
+            .force('link', d3.forceLink(message.links).id(d => d.id).distance(150))
+            .force('charge', d3.forceManyBody().strength(-400))
+            .force('center', d3.forceCenter(message.width / 2, message.height / 2))
+            .force('collision', d3.forceCollide().radius(d => d.radius + 10))
+            .alpha(message.alpha)
+            .stop();
+        run();
+    } else if (message.type === 'graph') {
+        // 集約ノードの展開・折りたたみ
+        nodes.forEach((n, i) => {
+            n.x = message.positions[i * 2];
+            n.y = message.positions[i * 2 + 1];
+        });
+        simulation.nodes(message.active.map(i => nodes[i]));
+        simulation.force('link').links(message.links);
+        simulation.alpha(Math.max(simulation.alpha(), 0.3));
+        run();
+    } else if (message.type === 'dragstart') {
+        simulation.alphaTarget(0.3).alpha(Math.max(simulation.alpha(), 0.3));
+        run();
+    } else if (message.type === 'drag') {
+        nodes[message.index].fx = message.x;
+        nodes[message.index].fy = message.y;
+    } else if (message.type === 'dragend') {
+        nodes[message.index].fx = null;
+        nodes[message.index].fy = null;
+        simulation.alphaTarget(0);
+    }
+};
+""" % json.dumps(self.D3_SCRIPT_URL)
+
+        return f"""        // Web Workerで力学シミュレーションを実行
+        function startWorkerSimulation() {{
+            const workerSource = {json.dumps(worker_source, ensure_ascii=False)};
+            let worker;
+            try {{
+                const blob = new Blob([workerSource], {{ type: 'text/javascript' }});
+                worker = new Worker(URL.createObjectURL(blob));
+            }} catch (error) {{
+                return startMainThreadSimulation();
+            }}
+
+            const nodeIndex = new Map(data.nodes.map((n, i) => [n.id, i]));
+
+            // Workerに渡すシミュレーション対象（ノードはインデックス、リンクはID）
+            function workerGraph() {{
+                const graph = simulatedGraph();
+                return {{
+                    active: graph.nodes.map(n => nodeIndex.get(n.id)),
+                    links: graph.links.map(r => ({{ source: r.source_id, target: r.target_id }}))
+                }};
+            }}
+
+            // 受信した最新の座標だけを次のフレームで描画
+            let latest = null;
+            let frameRequested = false;
+            function drawFrame() {{
+                frameRequested = false;
+                if (latest) {{
+                    data.nodes.forEach((n, i) => {{
+                        if (n.fx == null) {{
+                            n.x = latest[i * 2];
+                            n.y = latest[i * 2 + 1];
+                        }}
+                    }});
+                    latest = null;
+                }}
+                ticked();
+            }}
+            function requestFrame() {{
+                if (!frameRequested) {{
+                    frameRequested = true;
+                    requestAnimationFrame(drawFrame);
+                }}
+            }}
+            worker.onmessage = event => {{
+                latest = new Float32Array(event.data.buffer);
+                requestFrame();
+            }};
+            worker.onerror = () => {{
+                worker.terminate();
+                Object.assign(driver, startMainThreadSimulation());
+            }};
+
+            worker.postMessage(Object.assign({{
+                type: 'init',
+                width: width,
+                height: height,
+                alpha: initialAlpha,
+                nodes: data.nodes.map(n => ({{
+                    id: n.id, x: n.x, y: n.y, radius: getSizeValue(n.display.size)
+                }}))
+            }}, workerGraph()));
+
+            const driver = {{
+                dragstarted(event, d) {{
+                    if (!event.active) worker.postMessage({{ type: 'dragstart' }});
+                    d.fx = d.x;
+                    d.fy = d.y;
+                }},
+                dragged(event, d) {{
+                    d.fx = d.x = event.x;
+                    d.fy = d.y = event.y;
+                    worker.postMessage({{
+                        type: 'drag', index: nodeIndex.get(d.id), x: event.x, y: event.y
+                    }});
+                    requestFrame();
+                }},
+                dragended(event, d) {{
+                    if (!event.active) {{
+                        worker.postMessage({{ type: 'dragend', index: nodeIndex.get(d.id) }});
+                    }}
+                    d.fx = null;
+                    d.fy = null;
+                }},
+                refresh() {{
+                    const positions = new Float32Array(data.nodes.length * 2);
+                    data.nodes.forEach((n, i) => {{
+                        positions[i * 2] = n.x;
+                        positions[i * 2 + 1] = n.y;
+                    }});
+                    worker.postMessage(
+                        Object.assign({{ type: 'graph', positions: positions }}, workerGraph())
+                    );
+                    requestFrame();
+                }}
+            }};
+            return driver;
+        }}"""
+
+    def _generate_cytoscape_script(self, layout: Optional[Dict[str, Any]]) -> str:
+        """
+        Cytoscape.jsを使用した描画スクリプトを生成
+
+        座標はPython側で事前計算し（presetレイアウト）、ブラウザでの
+        レイアウト計算を行いません。レイヤー切り替えはcy.batch()で
+        スタイル更新をまとめて反映します。
+
+        Args:
+            layout: 初期配置（_build_layoutの結果、Noneの場合はdata.layoutを使う）
+
+        Returns:
+            renderEcomap(data) の本体となるJavaScript
+        """
+        script = f"""
+{self._get_helper_functions_js()}
+
+{self._get_layout_js(layout)}
+
+{self._get_aggregates_js()}
+
+        // Cytoscape要素の作成
+        const elements = [];
+        data.nodes.forEach(n => {{
+            elements.push({{
+                group: 'nodes',
+                data: {{
+                    id: n.id,
+                    label: n.display.label,
+                    layer: n.layer,
+                    color: getColorValue(n.display.color),
+                    size: getSizeValue(n.display.size) * 2
+                }},
+                position: layout.positions[n.id]
+                    ? {{ x: layout.positions[n.id][0], y: layout.positions[n.id][1] }}
+                    : {{ x: 0, y: 0 }}
+            }});
+        }});
+        data.relations.forEach(r => {{
+            elements.push({{
+                group: 'edges',
+                data: {{
+                    id: r.id,
+                    source: r.source_id,
+                    target: r.target_id,
+                    layer: r.layer,
+                    color: r.display.color,
+                    width: r.display.line_width,
+                    lineStyle: r.display.line_style,
+                    arrow: r.display.arrow ? 'triangle' : 'none'
+                }}
+            }});
+        }});
+
+        const nodeMap = new Map(data.nodes.map(n => [n.id, n]));
+
+        const cy = cytoscape({{
+            container: document.getElementById('ecomap'),
+            elements: elements,
+            layout: {{ name: 'preset', fit: true, padding: 40 }},
+            style: [
+                {{
+                    selector: 'node',
+                    style: {{
+                        'background-color': 'data(color)',
+                        'width': 'data(size)',
+                        'height': 'data(size)',
+                        'label': 'data(label)',
+                        'font-size': 12,
+                        'text-valign': 'center',
+                        'text-halign': 'right',
+                        'text-margin-x': 6,
+                        'border-width': 2,
+                        'border-color': '#fff'
+                    }}
+                }},
+                {{
+                    selector: 'node:active',
+                    style: {{
+                        'border-color': '#333',
+                        'border-width': 3
+                    }}
+                }},
+                {{
+                    selector: 'edge',
+                    style: {{
+                        'line-color': 'data(color)',
+                        'width': 'data(width)',
+                        'line-style': 'data(lineStyle)',
+                        'target-arrow-shape': 'data(arrow)',
+                        'target-arrow-color': 'data(color)',
+                        'curve-style': 'bezier',
+                        'opacity': 0.6
+                    }}
+                }}
+            ],
+            textureOnViewport: true,
+            hideEdgesOnViewport: data.relations.length > 500
+        }});
+
+        // ツールチップ
+        const tooltip = document.createElement('div');
+        tooltip.className = 'tooltip';
+        tooltip.style.opacity = 0;
+        document.body.appendChild(tooltip);
+
+        cy.on('mouseover', 'node', event => {{
+            const d = nodeMap.get(event.target.id());
+            const pointer = event.originalEvent;
+            tooltip.innerHTML = getTooltipContent(d);
+            tooltip.style.left = (pointer.pageX + 10) + 'px';
+            tooltip.style.top = (pointer.pageY - 28) + 'px';
+            tooltip.style.opacity = .9;
+        }});
+
+        cy.on('mouseout', 'node', () => {{
+            tooltip.style.opacity = 0;
+        }});
+
+        cy.on('tap', 'node', event => {{
+            const d = nodeMap.get(event.target.id());
+            if (d.type === 'Aggregate') {{
+                expandGroup(d.id);
+            }} else {{
+                showDetails(d.id);
+            }}
+        }});
+
+        // 表示の更新（レイヤーと集約ノードの状態を反映し、スタイル更新を一括反映）
+        function applyVisibility() {{
+            cy.batch(() => {{
+                cy.nodes().forEach(n => {{
+                    n.style('display', isNodeVisible(nodeMap.get(n.id())) ? 'element' : 'none');
+                }});
+            }});
         }}
-        
+
         // レイヤー制御
         function toggleLayer(layer) {{
-            // ノードの表示/非表示
-            node.style('display', d => {{
-                if (d.layer === layer) {{
-                    return document.getElementById(`layer-${{layer}}`).checked ? 'block' : 'none';
+            applyVisibility();
+        }}
+
+        // 集約ノードの展開・折りたたみ
+        function refreshGroups(group) {{
+            cy.batch(() => {{
+                if (group) {{
+                    const origin = cy.getElementById(group.node.id).position();
+                    group.member_ids.forEach((id, i) => {{
+                        const angle = 2 * Math.PI * i / group.member_ids.length;
+                        cy.getElementById(id).position({{
+                            x: origin.x + 60 * Math.cos(angle),
+                            y: origin.y + 60 * Math.sin(angle)
+                        }});
+                    }});
+                }} else {{
+                    aggregates.forEach(g => {{
+                        const members = g.member_ids.map(id => cy.getElementById(id).position());
+                        cy.getElementById(g.node.id).position({{
+                            x: members.reduce((sum, p) => sum + p.x, 0) / members.length,
+                            y: members.reduce((sum, p) => sum + p.y, 0) / members.length
+                        }});
+                    }});
                 }}
-                return null;
             }});
-            
-            label.style('display', d => {{
-                if (d.layer === layer) {{
-                    return document.getElementById(`layer-${{layer}}`).checked ? 'block' : 'none';
-                }}
-                return null;
+            applyVisibility();
+        }}
+
+{self._get_layer_events_js()}
+
+        document.getElementById('save-layout')
+            .addEventListener('click', () => saveLayout(n => cy.getElementById(n.id).position()));
+"""
+
+        return script
+
+    def _render_page(
+        self,
+        person_name: str,
+        library_url: str,
+        graph_element: str,
+        script: str,
+        json_data: Optional[Dict[str, Any]],
+        details: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        共通のページ枠（ヘッダー・レイヤー操作部・詳細欄）にグラフ部分を埋め込む
+
+        Args:
+            person_name: 本人氏名
+            library_url: 可視化ライブラリのURL
+            graph_element: グラフ描画先の要素
+            script: 描画スクリプト（renderEcomap(data) の本体）
+            json_data: 埋め込むグラフデータ（Noneの場合は ?case=ID のデータファイルを読み込む）
+            details: 詳細情報（別ブロックとして埋め込み、クリック時に解析）
+
+        Returns:
+            HTML文字列
+        """
+        if json_data is None:
+            data_block = ""
+            loader_js = self._get_case_loader_js()
+            title = "エコマップ"
+        else:
+            data_block = self._render_data_block("ecomap-data", json_data)
+            loader_js = self._get_loader_js()
+            title = f"エコマップ - {person_name}"
+
+        details_block = ""
+        if details is not None:
+            # データブロックとしてのみ埋め込み、初回クリックまで解析しない
+            details_block = "\n    " + self._render_data_block("ecomap-details", details)
+
+        collapse_button = ""
+        if json_data is None or json_data.get("aggregates"):
+            collapse_button = (
+                '\n                <button type="button" id="collapse-groups">まとめて表示</button>'
+            )
+
+        render_function = "\n".join(
+            f"    {line}" if line else line for line in script.split("\n")
+        )
+
+        return f"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <script src="{library_url}"></script>
+    <style>{self.PAGE_STYLES}</style>
+</head>
+<body>
+    <div id="container">
+        <div id="header">
+            <h1>{title}</h1>
+            <p class="subtitle">支援関係図</p>
+        </div>
+
+        <div id="controls">
+            <div class="control-group">
+                <div class="control-label">表示レイヤー</div>
+                <div class="checkbox-group">
+{self._get_layer_checkboxes_html()}
+                </div>
+            </div>
+            <div class="control-group">
+                <button type="button" id="save-layout">配置を保存</button>{collapse_button}
+            </div>
+        </div>
+
+        {graph_element}
+
+        <div id="details">ノードをクリックすると詳細を表示します</div>
+    </div>
+
+    {data_block}{details_block}
+    <script>
+        function renderEcomap(data) {{{render_function}        }}
+{loader_js}
+    </script>
+</body>
+</html>"""
+
+    def _render_data_block(
+        self,
+        block_id: str,
+        payload: Dict[str, Any]
+    ) -> str:
+        """
+        データを<script>ブロックとして埋め込む
+
+        圧縮時はコンパクトなJSONをgzip圧縮してbase64で埋め込みます。
+        非圧縮時はJSONをそのまま埋め込みます（実行されず、JSON.parseで読み込み）。
+
+        Args:
+            block_id: ブロックのID
+            payload: 埋め込むデータ
+
+        Returns:
+            <script>要素の文字列
+        """
+        if self.compress_payload:
+            raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            encoded = base64.b64encode(gzip.compress(raw, mtime=0)).decode("ascii")
+            return (
+                f'<script type="application/octet-stream" id="{block_id}" '
+                f'data-encoding="gzip-base64">{encoded}</script>'
+            )
+
+        if block_id == "ecomap-data":
+            payload_json = json.dumps(payload, ensure_ascii=False, indent=2)
+        else:
+            payload_json = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        # </script> による途中終了を防ぐ
+        payload_json = payload_json.replace("</", "<\\/")
+        return f'<script type="application/json" id="{block_id}">{payload_json}</script>'
+
+    def _get_loader_js(self) -> str:
+        """
+        データブロックの読み込み（圧縮データの展開）
+
+        DecompressionStream非対応ブラウザでも file:// やHTMLだけを渡した場合に
+        表示できるよう、圧縮時は小さなgzip展開処理を同梱します（外部ファイルを読み込まない）。
+        """
+        inflate_js = self.INFLATE_JS if self.compress_payload else ""
+        return inflate_js + """        // データブロックを読み込む（gzip+base64はブラウザで展開）
+        async function decodeDataBlock(block) {
+            if (block.dataset.encoding !== 'gzip-base64') {
+                return JSON.parse(block.textContent);
+            }
+            const bytes = Uint8Array.from(atob(block.textContent.trim()), c => c.charCodeAt(0));
+            if (typeof DecompressionStream === 'undefined') {
+                return JSON.parse(new TextDecoder().decode(inflateGzip(bytes)));
+            }
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            return JSON.parse(await new Response(stream).text());
+        }
+
+        decodeDataBlock(document.getElementById('ecomap-data'))
+            .then(renderEcomap)
+            .catch(error => {
+                document.getElementById('details').textContent =
+                    `エコマップのデータを読み込めませんでした: ${error.message}`;
+            });"""
+
+    def _get_case_loader_js(self) -> str:
+        """共通ビューアー用: ?case=ID のデータファイルを<script>で読み込む（file:// でも動作）"""
+        return """        // データファイル（cases/ID.js）は loadEcomapCase(data) を呼び出す
+        function loadEcomapCase(data) {
+            document.title = `エコマップ - ${data.person.name}`;
+            document.querySelector('#header h1').textContent = document.title;
+            renderEcomap(data);
+        }
+
+        const caseId = new URLSearchParams(location.search).get('case');
+        if (caseId) {
+            const caseScript = document.createElement('script');
+            caseScript.src = `cases/${encodeURIComponent(caseId)}.js`;
+            caseScript.onerror = () => {
+                document.getElementById('details').textContent =
+                    `ケースのデータを読み込めませんでした: ${caseId}`;
+            };
+            document.head.appendChild(caseScript);
+        } else {
+            document.getElementById('details').textContent =
+                'ケース一覧（index.html）から開いてください';
+        }"""
+
+    def _get_layer_checkboxes_html(self) -> str:
+        """レイヤー切り替えのチェックボックスを生成"""
+        items = []
+        for layer, label, checked in self.LAYERS:
+            attributes = " checked" if checked else ""
+            if layer == "person":
+                attributes += " disabled"
+            items.append(
+                f"""                    <div class="checkbox-item">
+                        <input type="checkbox" id="layer-{layer}"{attributes}>
+                        <label for="layer-{layer}">{label}</label>
+                    </div>"""
+            )
+        items.append(
+            """                    <div class="checkbox-item">
+                        <input type="checkbox" id="show-history">
+                        <label for="show-history">履歴を表示</label>
+                    </div>"""
+        )
+        return "\n".join(items)
+
+    def _get_helper_functions_js(self) -> str:
+        """描画ライブラリに依存しない共通関数（サイズ・色・ツールチップ）"""
+        size_map = json.dumps(self.SIZE_MAP)
+        color_map = json.dumps(self.COLOR_MAP)
+        return f"""        // ノードサイズの変換
+        const sizeMap = {size_map};
+        function getSizeValue(size) {{
+            return sizeMap[size] || 25;
+        }}
+
+        // 色の変換
+        const colorMap = {color_map};
+        function getColorValue(color) {{
+            return colorMap[color] || color;
+        }}
+
+        // ツールチップの内容
+        function getTooltipContent(d) {{
+            // 氏名などの入力値はHTMLとして解釈させない
+            let content = `<div class="tooltip-title">${{escapeHtml(d.name)}}</div>`;
+            content += `<div class="tooltip-content">`;
+            content += `タイプ: ${{escapeHtml(d.type)}}<br>`;
+            content += `レイヤー: ${{escapeHtml(d.layer)}}<br>`;
+            if (d.properties.age) {{
+                content += `年齢: ${{escapeHtml(d.properties.age)}}歳<br>`;
+            }}
+            content += `</div>`;
+            return content;
+        }}
+
+        // 詳細情報（軽量ペイロード時は別ブロックを初回のみ解析）
+        let detailsPromise = null;
+        function loadDetails() {{
+            if (detailsPromise === null) {{
+                const fromNodes = () => Object.fromEntries(
+                    data.nodes.map(n => [n.id, n.properties || {{}}])
+                );
+                const block = document.getElementById('ecomap-details');
+                detailsPromise = block
+                    ? decodeDataBlock(block).catch(fromNodes)
+                    : Promise.resolve(fromNodes());
+            }}
+            return detailsPromise;
+        }}
+
+        function escapeHtml(value) {{
+            return String(value).replace(/[&<>"']/g, c => ({{
+                '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+            }})[c]);
+        }}
+
+        function showDetails(id) {{
+            const d = data.nodes.find(n => n.id === id);
+            loadDetails().then(details => {{
+                const rows = Object.entries(details[id] || {{}})
+                    .filter(([key, value]) =>
+                        value !== '' && value !== null && !key.endsWith('_id'))
+                    .map(([key, value]) =>
+                        `<tr><th>${{escapeHtml(key)}}</th><td>${{escapeHtml(value)}}</td></tr>`)
+                    .join('');
+                document.getElementById('details').innerHTML =
+                    `<strong>${{escapeHtml(d.name)}}</strong>（${{escapeHtml(d.type)}}）<table>${{rows}}</table>`;
             }});
-            
-            // リンクの表示/非表示
-            link.style('display', d => {{
-                const sourceVisible = node.filter(n => n.id === d.source.id).style('display') !== 'none';
-                const targetVisible = node.filter(n => n.id === d.target.id).style('display') !== 'none';
-                return (sourceVisible && targetVisible) ? 'block' : 'none';
+        }}"""
+
+    def _get_layout_js(self, layout: Optional[Dict[str, Any]]) -> str:
+        """
+        初期配置の埋め込みと、現在の配置のダウンロード
+
+        ダウンロードした配置は次回生成時に --import-layout で再利用できます。
+        """
+        if layout is None:
+            layout_js = "data.layout"
+        else:
+            layout_js = json.dumps(layout, ensure_ascii=False, separators=(",", ":"))
+            layout_js = layout_js.replace("</", "<\\/")
+        return f"""        // 初期配置（本人を原点とする座標）と識別キー
+        const layout = {layout_js};
+
+        // 現在の配置を本人を原点とする座標でダウンロード
+        function saveLayout(positionOf) {{
+            const person = data.nodes.find(n => n.type === 'Person') || data.nodes[0];
+            const origin = positionOf(person);
+            const positions = {{}};
+            data.nodes.forEach(n => {{
+                const key = layout.keys[n.id];
+                const p = positionOf(n);
+                if (key && p && p.x != null) {{
+                    positions[key] = [Math.round(p.x - origin.x), Math.round(p.y - origin.y)];
+                }}
             }});
-        }}
-        
-        // レイヤーチェックボックスのイベント
+            const content = JSON.stringify(
+                {{ person_key: layout.person_key, positions: positions }}, null, 2
+            );
+            const anchor = document.createElement('a');
+            anchor.href = URL.createObjectURL(new Blob([content], {{ type: 'application/json' }}));
+            anchor.download = `layout_${{layout.person_key}}.json`;
+            anchor.click();
+            URL.revokeObjectURL(anchor.href);
+        }}"""
+
+    def _get_aggregates_js(self) -> str:
+        """集約ノード（生成時に計算済み）の追加と、展開・折りたたみの状態管理"""
+        return """        // 集約ノード（初期状態は折りたたみ、クリックで展開）
+        const aggregates = data.aggregates || [];
+        const aggregateById = new Map(aggregates.map(g => [g.node.id, g]));
+        const groupOfMember = new Map();
+        const expandedGroups = new Set();
+        aggregates.forEach(group => {
+            data.nodes.push(group.node);
+            group.relations.forEach(r => data.relations.push(r));
+            group.member_ids.forEach(id => groupOfMember.set(id, group.node.id));
+
+            // 集約ノードはメンバーの重心から開始
+            const points = group.member_ids.map(id => layout.positions[id]).filter(p => p);
+            if (points.length) {
+                layout.positions[group.node.id] = [
+                    points.reduce((sum, p) => sum + p[0], 0) / points.length,
+                    points.reduce((sum, p) => sum + p[1], 0) / points.length
+                ];
+            }
+        });
+
+        function isHiddenByGroup(id) {
+            if (aggregateById.has(id)) {
+                return expandedGroups.has(id);
+            }
+            const groupId = groupOfMember.get(id);
+            return groupId !== undefined && !expandedGroups.has(groupId);
+        }
+
+        // 置き換えられた履歴（古い手帳・支援区分・計画）は「履歴を表示」のときだけ表示
+        const historyCheckbox = document.getElementById('show-history');
+
+        function isNodeVisible(n) {
+            const checkbox = document.getElementById(`layer-${n.layer}`);
+            const isHistory = n.history && !n.history.is_current;
+            return (!checkbox || checkbox.checked) && !isHiddenByGroup(n.id)
+                && (!isHistory || (historyCheckbox && historyCheckbox.checked));
+        }
+
+        function expandGroup(id) {
+            expandedGroups.add(id);
+            refreshGroups(aggregateById.get(id));
+        }
+
+        function collapseAllGroups() {
+            expandedGroups.clear();
+            refreshGroups(null);
+        }"""
+
+    def _get_layer_events_js(self) -> str:
+        """レイヤーチェックボックスのイベント登録と初期表示"""
+        hidden_layers = json.dumps([layer for layer, _, checked in self.LAYERS if not checked])
+        return f"""        // レイヤーチェックボックスのイベント
         document.querySelectorAll('input[type="checkbox"]').forEach(checkbox => {{
             if (checkbox.id !== 'layer-person') {{
                 checkbox.addEventListener('change', function() {{
@@ -441,36 +1639,23 @@ class HTMLGenerator:
                 }});
             }}
         }});
-        
-        // 初期表示
-        ['diagnoses', 'consultation_supports', 'medical'].forEach(layer => {{
-            toggleLayer(layer);
+
+        // 初期表示（初期非表示のレイヤーと折りたたんだ集約ノード）
+        {hidden_layers}.forEach(layer => {{
+            document.getElementById(`layer-${{layer}}`).checked = false;
         }});
-    </script>
-</body>
-</html>"""
-        
-        return html
-    
-    def _generate_cytoscape_html(self, json_data: Dict[str, Any], person_name: str) -> str:
-        """
-        Cytoscape.jsを使用したHTMLを生成
-        
-        Args:
-            json_data: JSONデータ
-            person_name: 本人氏名
-            
-        Returns:
-            HTML文字列
-        """
-        # TODO: Cytoscape.js版の実装
-        # 現時点ではD3.js版を返す
-        return self._generate_d3_html(json_data, person_name)
+        applyVisibility();
+
+        const collapseButton = document.getElementById('collapse-groups');
+        if (collapseButton) {{
+            collapseButton.style.display = aggregates.length ? '' : 'none';
+            collapseButton.addEventListener('click', collapseAllGroups);
+        }}"""
 
 
 if __name__ == "__main__":
     print("=== HTMLGenerator テスト ===")
-    
+
     # テスト用の簡単なデータ
     test_data = {
         "person": {
@@ -521,13 +1706,15 @@ if __name__ == "__main__":
             "relation_count": 1
         }
     }
-    
-    generator = HTMLGenerator("d3")
-    html = generator.generate(test_data, "山田太郎")
-    
-    # HTMLをファイルに保存
-    with open("/tmp/test_ecomap.html", "w", encoding="utf-8") as f:
-        f.write(html)
-    
-    print("テスト用HTMLを生成しました: /tmp/test_ecomap.html")
-    print(f"HTMLサイズ: {len(html)} 文字")
+
+    for visualization in ["d3", "cytoscape"]:
+        generator = HTMLGenerator(visualization)
+        html = generator.generate(test_data, "山田太郎")
+
+        # HTMLをファイルに保存
+        output_path = f"/tmp/test_ecomap_{visualization}.html"
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(html)
+
+        print(f"テスト用HTMLを生成しました: {output_path}")
+        print(f"HTMLサイズ: {len(html)} 文字")
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+有効期間索引モジュール
+
+手帳・支援区分・サービス等利用計画・契約・成年後見などの有効期間を区間木（interval tree）に
+登録し、「ある日付に有効だったもの」を区間の突き刺し（stabbing）検索で求めます。
+これを使って、指定した日付時点のエコマップ（スナップショット）を作成します。
+複数の本人のエコマップを1つの索引に登録できるため、同じ日付で多数のケースを確認するときも
+全件を走査せずに済みます。
+"""
+
+import copy
+from datetime import date, timedelta
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+from .history_builder import HistoryBuilder
+from .layout_cache import LayoutCache
+
+
+class IntervalIndex:
+    """
+    区間木（中心点で分割する interval tree）
+
+    区間は半開区間 [開始, 終了) で、開始・終了の None は無限（期間の制限なし）として扱います。
+    作成は O(n log n)、突き刺し検索は O(log n + 該当件数) です。
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[Optional[date], Optional[date], Any]]):
+        """
+        初期化（区間木を作成）
+
+        Args:
+            intervals: (開始日, 終了日の翌日, 値) の反復可能オブジェクト
+        """
+        items = [
+            (start or date.min, end or date.max, value)
+            for start, end, value in intervals
+            if (start or date.min) < (end or date.max)
+        ]
+        self.size = len(items)
+        self.root = self._build(items)
+
+    def stab(self, point: date) -> List[Any]:
+        """
+        指定した日付を含む区間の値を取得
+
+        Args:
+            point: 日付
+
+        Returns:
+            値のリスト
+        """
+        result = []
+        node = self.root
+        while node:
+            if point < node["center"]:
+                # この節点の区間はすべて中心より後に終わるため、開始日だけを調べる
+                for start, _, value in node["by_start"]:
+                    if start > point:
+                        break
+                    result.append(value)
+                node = node["left"]
+            else:
+                # この節点の区間はすべて中心以前に始まるため、終了日だけを調べる
+                for _, end, value in node["by_end"]:
+                    if end <= point:
+                        break
+                    result.append(value)
+                node = node["right"]
+        return result
+
+    def _build(self, items: List[Tuple[date, date, Any]]) -> Optional[Dict[str, Any]]:
+        """開始日の中央値を中心に、中心を含む区間・左側・右側に分けて再帰的に作成"""
+        if not items:
+            return None
+        starts = sorted(start for start, _, _ in items)
+        center = starts[len(starts) // 2]
+
+        overlapping = [item for item in items if item[0] <= center < item[1]]
+        return {
+            "center": center,
+            "by_start": sorted(overlapping, key=lambda item: item[0]),
+            "by_end": sorted(overlapping, key=lambda item: item[1], reverse=True),
+            "left": self._build([item for item in items if item[1] <= center]),
+            "right": self._build([item for item in items if item[0] > center]),
+        }
+
+
+class ValidityIndex:
+    """有効期間索引クラス（指定した日付時点のエコマップを作成）"""
+
+    # 有効期間を持つノードタイプ → (開始日のプロパティ, 終了日のプロパティ)
+    VALIDITY_FIELDS = {
+        "RyoikuNotebook": ("issue_date", "expiry_date"),
+        "MentalHealthNotebook": ("issue_date", "expiry_date"),
+        "PhysicalDisabilityNotebook": ("issue_date", "expiry_date"),
+        "SupportLevel": ("decision_date", "expiry_date"),
+        "ServicePlan": ("creation_date", None),
+        "ConsultationSupport": ("contract_date", None),
+        "ServiceContract": ("contract_date", None),
+        "LegalGuardian": ("start_date", None),
+        "MedicalInstitution": ("start_date", None),
+        "Diagnosis": ("diagnosis_date", None),
+    }
+
+    # 終了日がなければ、同じタイプの次のもの（更新・見直し・相談支援事業所の変更）の
+    # 開始日の前日まで有効なタイプ
+    SUCCESSIVE_TYPES = tuple(HistoryBuilder.HISTORY_RULES) + ("ConsultationSupport",)
+
+    def __init__(self, ecomaps: Iterable[Dict[str, Any]] = ()):
+        """
+        初期化
+
+        Args:
+            ecomaps: エコマップのJSONデータの反復可能オブジェクト
+        """
+        self.ecomaps: Dict[str, Dict[str, Any]] = {}
+        self.intervals: List[Tuple[Optional[date], Optional[date], Tuple[str, str]]] = []
+        self._index: Optional[IntervalIndex] = None
+        for json_data in ecomaps:
+            self.add_ecomap(json_data)
+
+    def add_ecomap(self, json_data: Dict[str, Any]) -> str:
+        """
+        エコマップのノードの有効期間を登録
+
+        Args:
+            json_data: エコマップのJSONデータ
+
+        Returns:
+            ケースID（本人キャッシュキー）
+        """
+        case_id = LayoutCache.person_key(json_data.get("person", {}))
+        self.ecomaps[case_id] = json_data
+        for start, end, node_id in self.periods(json_data.get("nodes", [])):
+            self.intervals.append((start, end, (case_id, node_id)))
+        self._index = None
+        return case_id
+
+    @classmethod
+    def periods(
+        cls,
+        nodes: List[Dict[str, Any]]
+    ) -> List[Tuple[Optional[date], Optional[date], str]]:
+        """
+        ノードの有効期間
+
+        Args:
+            nodes: ノードのリスト
+
+        Returns:
+            (開始日, 終了日の翌日, ノードID) のリスト（日付が分からない側は None）
+        """
+        periods = []
+        successive: Dict[str, List[Tuple[Optional[date], Dict[str, Any]]]] = {}
+        for node in nodes:
+            fields = cls.VALIDITY_FIELDS.get(node["type"])
+            if not fields:
+                continue
+            properties = node.get("properties", {})
+            start = cls._parse_date(properties.get(fields[0]))
+            end = cls._parse_date(properties.get(fields[1])) if fields[1] else None
+            if end is not None:
+                periods.append((start, end + timedelta(days=1), node["id"]))
+            elif node["type"] in cls.SUCCESSIVE_TYPES:
+                successive.setdefault(node["type"], []).append((start, node))
+            else:
+                periods.append((start, None, node["id"]))
+
+        for entries in successive.values():
+            entries.sort(key=lambda entry: entry[0] or date.min)
+            for i, (start, node) in enumerate(entries):
+                next_start = next(
+                    (s for s, _ in entries[i + 1:] if s and (not start or s > start)), None
+                )
+                periods.append((start, next_start, node["id"]))
+        return periods
+
+    def valid_node_ids(self, as_of: date) -> Set[Tuple[str, str]]:
+        """
+        指定した日付に有効なノード
+
+        Args:
+            as_of: 日付
+
+        Returns:
+            (ケースID, ノードID) の集合
+        """
+        if self._index is None:
+            self._index = IntervalIndex(self.intervals)
+        return set(self._index.stab(as_of))
+
+    def snapshots(self, as_of: date) -> Dict[str, Dict[str, Any]]:
+        """
+        登録した全ケースの、指定した日付時点のエコマップ
+
+        Args:
+            as_of: 日付
+
+        Returns:
+            ケースID → エコマップのJSONデータ
+        """
+        # 区間木の検索結果をケースごとにまとめる（ケースごとに全件を走査しない）
+        valid_by_case: Dict[str, Set[str]] = {case_id: set() for case_id in self.ecomaps}
+        for case_id, node_id in self.valid_node_ids(as_of):
+            valid_by_case[case_id].add(node_id)
+        return {
+            case_id: self._snapshot(json_data, valid_by_case[case_id], as_of)
+            for case_id, json_data in self.ecomaps.items()
+        }
+
+    @classmethod
+    def snapshot(cls, json_data: Dict[str, Any], as_of: date) -> Dict[str, Any]:
+        """
+        指定した日付時点のエコマップ
+
+        有効期間のあるノードはその日に有効なものだけを残し、その結果本人とつながらなくなった
+        ノード（契約のない事業所など）も除きます。
+
+        Args:
+            json_data: エコマップのJSONデータ
+            as_of: 日付
+
+        Returns:
+            エコマップのJSONデータ（コピー）
+        """
+        index = cls([json_data])
+        return next(iter(index.snapshots(as_of).values()))
+
+    @classmethod
+    def _snapshot(
+        cls,
+        json_data: Dict[str, Any],
+        valid_ids: Set[str],
+        as_of: date
+    ) -> Dict[str, Any]:
+        """
+        有効なノードと、本人からたどれるノード・リレーションに絞り込む
+
+        履歴（history）は全期間で作成したものなので、残ったノードだけで作り直し、
+        その日付に有効なものを最新（現在）とします。履歴のリレーションは含めません。
+        """
+        nodes = [
+            node for node in json_data.get("nodes", [])
+            if node["type"] not in cls.VALIDITY_FIELDS or node["id"] in valid_ids
+        ]
+        node_ids = {node["id"] for node in nodes}
+        relations = [
+            relation for relation in json_data.get("relations", [])
+            if relation["source_id"] in node_ids and relation["target_id"] in node_ids
+            and relation["type"] not in HistoryBuilder.RELATION_TYPES
+        ]
+
+        # 本人からたどれるノードだけを残す
+        neighbors: Dict[str, List[str]] = {}
+        for relation in relations:
+            neighbors.setdefault(relation["source_id"], []).append(relation["target_id"])
+            neighbors.setdefault(relation["target_id"], []).append(relation["source_id"])
+        reachable = {node["id"] for node in nodes if node["type"] == "Person"}
+        stack = list(reachable)
+        while stack:
+            for neighbor in neighbors.get(stack.pop(), []):
+                if neighbor not in reachable:
+                    reachable.add(neighbor)
+                    stack.append(neighbor)
+
+        result = copy.deepcopy({
+            key: value for key, value in json_data.items() if key not in ("nodes", "relations")
+        })
+        result["nodes"] = copy.deepcopy([node for node in nodes if node["id"] in reachable])
+        HistoryBuilder().build(result["nodes"])
+        result["relations"] = copy.deepcopy([
+            relation for relation in relations
+            if relation["source_id"] in reachable and relation["target_id"] in reachable
+        ])
+        metadata = result.setdefault("metadata", {})
+        metadata["as_of"] = as_of.isoformat()
+        metadata["node_count"] = len(result["nodes"])
+        metadata["relation_count"] = len(result["relations"])
+        return result
+
+    @staticmethod
+    def _parse_date(value: Any) -> Optional[date]:
+        """YYYY-MM-DD形式の日付（変換できない場合はNone）"""
+        try:
+            return date.fromisoformat(str(value)[:10]) if value else None
+        except ValueError:
+            return None
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    print("=== ValidityIndex テスト ===")
+
+    if len(sys.argv) < 3:
+        print("使い方: python interval_index.py エコマップ.json YYYY-MM-DD")
+        sys.exit(1)
+
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        ecomap = json.load(f)
+    result = ValidityIndex.snapshot(ecomap, date.fromisoformat(sys.argv[2]))
+    print(f"ノード: {len(ecomap['nodes'])} → {len(result['nodes'])}")
+    print(f"リレーション: {len(ecomap['relations'])} → {len(result['relations'])}")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+レイアウトキャッシュモジュール
+
+前回生成したエコマップのノード座標を保存し、再生成時に再利用します。
+既存のノードは同じ位置に、新しいノードだけが追加で配置されるため、
+支援者が見慣れた配置が保たれます。
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from .layout_engine import LayoutEngine
+from .node_identity import NodeIdentity
+
+
+class LayoutCache:
+    """レイアウトキャッシュクラス"""
+
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_dir: str):
+        """
+        初期化
+
+        Args:
+            cache_dir: キャッシュファイルを保存するディレクトリ
+        """
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def person_key(person: Dict[str, Any]) -> str:
+        """
+        本人ごとのキャッシュキー（氏名・生年月日のハッシュ）
+
+        Args:
+            person: 本人情報（nameとbirth_dateを含む辞書）
+
+        Returns:
+            16桁の16進数文字列
+        """
+        name, birth_date = NodeIdentity.person_identity(person)
+        digest = hashlib.sha1(f"{name}|{birth_date}".encode("utf-8")).hexdigest()
+        return digest[:16]
+
+    def cache_path(self, person: Dict[str, Any]) -> Path:
+        """本人のキャッシュファイルのパス"""
+        return self.cache_dir / f"{self.person_key(person)}.json"
+
+    def load(self, person: Dict[str, Any]) -> Dict[str, Tuple[float, float]]:
+        """
+        キャッシュから座標を読み込み
+
+        Args:
+            person: 本人情報
+
+        Returns:
+            識別キー→(x, y)（キャッシュがない・壊れている場合は空）
+        """
+        path = self.cache_path(person)
+        if not path.exists():
+            return {}
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+        if cached.get("version") != self.CACHE_VERSION:
+            return {}
+        return self._parse_positions(cached.get("positions", {}))
+
+    def save(
+        self,
+        person: Dict[str, Any],
+        nodes: List[Dict[str, Any]],
+        positions: Dict[str, Tuple[float, float]]
+    ) -> Path:
+        """
+        座標をキャッシュに保存
+
+        Args:
+            person: 本人情報
+            nodes: ノードのリスト
+            positions: ノードID→(x, y)
+
+        Returns:
+            保存したキャッシュファイルのパス
+        """
+        keys = NodeIdentity.node_keys(nodes)
+        cached = {
+            "version": self.CACHE_VERSION,
+            "person_key": self.person_key(person),
+            "positions": {
+                keys[node_id]: [x, y]
+                for node_id, (x, y) in positions.items()
+                if node_id in keys
+            },
+        }
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_path(person)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cached, f, ensure_ascii=False, indent=2)
+        return path
+
+    @staticmethod
+    def import_viewer_layout(layout_path: str) -> Tuple[str, Dict[str, Tuple[float, float]]]:
+        """
+        ビューアの「配置を保存」でダウンロードしたファイルを読み込み
+
+        Args:
+            layout_path: レイアウトファイルのパス
+
+        Returns:
+            (本人キャッシュキー, 識別キー→(x, y))
+
+        Raises:
+            ValueError: レイアウトファイルの形式が正しくない場合
+        """
+        with open(layout_path, "r", encoding="utf-8") as f:
+            layout = json.load(f)
+
+        if not isinstance(layout, dict) or "person_key" not in layout or "positions" not in layout:
+            raise ValueError(f"レイアウトファイルの形式が正しくありません: {layout_path}")
+
+        return layout["person_key"], LayoutCache._parse_positions(layout["positions"])
+
+    @staticmethod
+    def warm_start(
+        nodes: List[Dict[str, Any]],
+        relations: List[Dict[str, Any]],
+        cached_positions: Dict[str, Tuple[float, float]],
+        layout_engine: Optional[LayoutEngine] = None
+    ) -> Dict[str, Tuple[float, float]]:
+        """
+        キャッシュした座標を起点にレイアウトを計算
+
+        キャッシュにあるノードは前回の位置に固定し、新しいノードのみ配置します。
+
+        Args:
+            nodes: ノードのリスト
+            relations: リレーションのリスト
+            cached_positions: 識別キー→(x, y)
+            layout_engine: レイアウトエンジン
+
+        Returns:
+            ノードID→(x, y)
+        """
+        layout_engine = layout_engine or LayoutEngine()
+        keys = NodeIdentity.node_keys(nodes)
+        fixed_positions = {
+            node_id: cached_positions[key]
+            for node_id, key in keys.items()
+            if key in cached_positions
+        }
+        return layout_engine.compute(nodes, relations, fixed_positions)
+
+    @staticmethod
+    def _parse_positions(positions: Dict[str, Any]) -> Dict[str, Tuple[float, float]]:
+        """JSONの座標（[x, y]）をタプルに変換（不正な値は無視）"""
+        parsed = {}
+        for key, value in positions.items():
+            try:
+                parsed[key] = (float(value[0]), float(value[1]))
+            except (TypeError, ValueError, IndexError):
+                continue
+        return parsed
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("=== LayoutCache テスト ===")
+
+    test_person = {"name": "山田太郎", "birth_date": "1990-01-01"}
+    test_nodes = [
+        {"id": "p", "type": "Person", "name": "山田太郎", "layer": "person",
+         "properties": {"name": "山田太郎", "birth_date": "1990-01-01"}},
+        {"id": "f", "type": "Family", "name": "山田花子", "layer": "family",
+         "properties": {"relation": "母"}},
+    ]
+    test_relations = [{"source_id": "p", "target_id": "f"}]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = LayoutCache(temp_dir)
+        engine = LayoutEngine()
+        saved = cache.save(test_person, test_nodes, engine.compute(test_nodes, test_relations))
+        print(f"保存: {saved}")
+        print(f"読み込み: {cache.load(test_person)}")
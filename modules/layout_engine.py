@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+レイアウト計算モジュール
+
+ノードとリレーションから決定的な（毎回同じ）配置座標を計算します。
+本人を中心に、レイヤー順に放射状（ラジアルツリー）に配置します。
+"""
+
+import math
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+
+
+class LayoutEngine:
+    """レイアウト計算クラス"""
+
+    # 放射状配置でのレイヤーの並び順（時計回り）
+    LAYER_ORDER = [
+        "person",
+        "family",
+        "legal_guardians",
+        "notebooks",
+        "support_levels",
+        "diagnoses",
+        "consultation_supports",
+        "service_plans",
+        "service_contracts",
+        "medical",
+    ]
+
+    def __init__(self, ring_spacing: float = 170.0, start_angle: float = -math.pi / 2):
+        """
+        初期化
+
+        Args:
+            ring_spacing: 同心円（階層）ごとの半径の間隔
+            start_angle: 配置を開始する角度（ラジアン、デフォルトは真上）
+        """
+        self.ring_spacing = ring_spacing
+        self.start_angle = start_angle
+
+    def compute(
+        self,
+        nodes: List[Dict[str, Any]],
+        relations: List[Dict[str, Any]],
+        fixed_positions: Optional[Dict[str, Tuple[float, float]]] = None
+    ) -> Dict[str, Tuple[float, float]]:
+        """
+        ノード座標を計算
+
+        固定座標が指定された場合（前回の配置の再利用）、固定されていない
+        ノードは放射状配置での親ノードからの相対位置を保ったまま、
+        親ノードの実際の座標を基準に配置します。
+
+        Args:
+            nodes: ノードのリスト
+            relations: リレーションのリスト
+            fixed_positions: 座標を固定するノード（ノードID→(x, y)）
+
+        Returns:
+            ノードID→(x, y) の辞書（本人ノードが原点）
+        """
+        if not nodes:
+            return {}
+
+        fixed_positions = fixed_positions or {}
+        node_map = {n["id"]: n for n in nodes}
+
+        # 無向の隣接リストを作成
+        adjacency: Dict[str, List[str]] = {node_id: [] for node_id in node_map}
+        for relation in relations:
+            source_id = relation.get("source_id")
+            target_id = relation.get("target_id")
+            if source_id in adjacency and target_id in adjacency:
+                adjacency[source_id].append(target_id)
+                adjacency[target_id].append(source_id)
+
+        root_id = next((n["id"] for n in nodes if n["type"] == "Person"), nodes[0]["id"])
+        children = self._build_tree(root_id, node_map, adjacency)
+
+        # 部分木の葉の数を重みとして角度を配分
+        weights: Dict[str, int] = {}
+        self._compute_weights(root_id, children, weights)
+
+        positions: Dict[str, Tuple[float, float]] = {root_id: (0.0, 0.0)}
+        self._place_children(
+            root_id,
+            children,
+            weights,
+            positions,
+            depth=1,
+            start=self.start_angle,
+            span=2 * math.pi
+        )
+
+        if not fixed_positions:
+            return positions
+
+        # 固定座標を優先し、新しいノードは親ノードからの相対位置で配置
+        placed: Dict[str, Tuple[float, float]] = {}
+        queue = deque([(root_id, None)])
+        while queue:
+            node_id, parent_id = queue.popleft()
+            if node_id in fixed_positions:
+                x, y = fixed_positions[node_id]
+                placed[node_id] = (float(x), float(y))
+            elif parent_id is None:
+                placed[node_id] = positions[node_id]
+            else:
+                parent_x, parent_y = placed[parent_id]
+                x = parent_x + positions[node_id][0] - positions[parent_id][0]
+                y = parent_y + positions[node_id][1] - positions[parent_id][1]
+                placed[node_id] = (round(x, 1), round(y, 1))
+            queue.extend((child_id, node_id) for child_id in children[node_id])
+
+        return placed
+
+    def bounds(
+        self,
+        positions: Dict[str, Tuple[float, float]]
+    ) -> Tuple[float, float, float, float]:
+        """
+        座標の外接矩形を取得
+
+        Args:
+            positions: ノードID→(x, y) の辞書
+
+        Returns:
+            (最小x, 最小y, 最大x, 最大y)
+        """
+        if not positions:
+            return (0.0, 0.0, 0.0, 0.0)
+
+        xs = [p[0] for p in positions.values()]
+        ys = [p[1] for p in positions.values()]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    def _sort_key(self, node: Dict[str, Any]) -> Tuple[int, str, str]:
+        """子ノードの並び順キー（レイヤー順→タイプ→名前）"""
+        layer = node.get("layer", "")
+        if layer in self.LAYER_ORDER:
+            layer_index = self.LAYER_ORDER.index(layer)
+        else:
+            layer_index = len(self.LAYER_ORDER)
+        return (layer_index, node.get("type", ""), str(node.get("name", "")))
+
+    def _build_tree(
+        self,
+        root_id: str,
+        node_map: Dict[str, Dict[str, Any]],
+        adjacency: Dict[str, List[str]]
+    ) -> Dict[str, List[str]]:
+        """
+        本人ノードを根とする幅優先探索木を作成
+
+        本人から到達できないノード群（例: 計画のない相談支援事業所）は、
+        連結成分ごとに代表ノードを本人の子として接続します。
+        """
+        children: Dict[str, List[str]] = {node_id: [] for node_id in node_map}
+        visited = {root_id}
+
+        def traverse(start_id: str):
+            queue = deque([start_id])
+            while queue:
+                current = queue.popleft()
+                neighbors = sorted(
+                    (n for n in set(adjacency[current]) if n not in visited),
+                    key=lambda n: self._sort_key(node_map[n])
+                )
+                for neighbor in neighbors:
+                    visited.add(neighbor)
+                    children[current].append(neighbor)
+                    queue.append(neighbor)
+
+        traverse(root_id)
+
+        for node in sorted(node_map.values(), key=self._sort_key):
+            if node["id"] not in visited:
+                visited.add(node["id"])
+                children[root_id].append(node["id"])
+                traverse(node["id"])
+
+        children[root_id].sort(key=lambda n: self._sort_key(node_map[n]))
+        return children
+
+    def _compute_weights(
+        self,
+        node_id: str,
+        children: Dict[str, List[str]],
+        weights: Dict[str, int]
+    ) -> int:
+        """部分木の葉の数を計算"""
+        stack = [(node_id, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if expanded:
+                weights[current] = max(1, sum(weights[c] for c in children[current]))
+            else:
+                stack.append((current, True))
+                stack.extend((c, False) for c in children[current])
+        return weights[node_id]
+
+    def _place_children(
+        self,
+        parent_id: str,
+        children: Dict[str, List[str]],
+        weights: Dict[str, int],
+        positions: Dict[str, Tuple[float, float]],
+        depth: int,
+        start: float,
+        span: float
+    ):
+        """子ノードを親の角度範囲内に配置"""
+        stack = [(parent_id, depth, start, span)]
+        while stack:
+            current, current_depth, current_start, current_span = stack.pop()
+            child_ids = children[current]
+            if not child_ids:
+                continue
+
+            total = sum(weights[c] for c in child_ids)
+            radius = self.ring_spacing * current_depth
+            angle = current_start
+            for child_id in child_ids:
+                child_span = current_span * weights[child_id] / total
+                center = angle + child_span / 2
+                positions[child_id] = (
+                    round(radius * math.cos(center), 1),
+                    round(radius * math.sin(center), 1),
+                )
+                stack.append((child_id, current_depth + 1, angle, child_span))
+                angle += child_span
+
+
+if __name__ == "__main__":
+    print("=== LayoutEngine テスト ===")
+
+    test_nodes = [
+        {"id": "p", "type": "Person", "name": "山田太郎", "layer": "person"},
+        {"id": "f", "type": "Family", "name": "山田花子", "layer": "family"},
+        {"id": "d", "type": "Doctor", "name": "山田医師", "layer": "medical"},
+        {"id": "m", "type": "Medication", "name": "リスペリドン", "layer": "medical"},
+    ]
+    test_relations = [
+        {"source_id": "p", "target_id": "f"},
+        {"source_id": "p", "target_id": "d"},
+        {"source_id": "m", "target_id": "d"},
+    ]
+
+    engine = LayoutEngine()
+    for node_id, (x, y) in engine.compute(test_nodes, test_relations).items():
+        print(f"{node_id}: ({x}, {y})")
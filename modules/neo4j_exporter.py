@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Neo4j出力モジュール
+
+エコマップのノードとリレーションを、neo4j-admin import で一括登録できる
+CSVファイル（ラベルごとのノードファイル、タイプごとのリレーションファイル）に
+書き出します。ケースは1件ずつ追加でき、書き出し済みのデータはメモリに残さないため、
+大量のケースもまとめて出力できます。
+"""
+
+import csv
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional
+
+from .layout_cache import LayoutCache
+
+
+class Neo4jExporter:
+    """Neo4j出力クラス"""
+
+    # 全ノード・全リレーションに共通の列（neo4j-admin import のヘッダー）
+    NODE_COLUMNS = ["id:ID", ":LABEL", "name", "layer", "cases:string[]"]
+    RELATION_COLUMNS = [
+        ":START_ID", ":END_ID", ":TYPE", "id", "layer", "direction", "cases:string[]",
+    ]
+
+    # 共通の列と重なるため出力しないプロパティ（MedicalInstitution の name など）
+    RESERVED_PROPERTIES = ("id", "name", "layer", "direction", "cases")
+
+    # 配列プロパティの区切り文字（neo4j-admin import の --array-delimiter の既定値）
+    ARRAY_DELIMITER = ";"
+
+    def __init__(self, output_dir: str):
+        """
+        初期化
+
+        Args:
+            output_dir: CSVファイルの出力ディレクトリ
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        # ラベル・タイプごとの出力先
+        # （ファイル, csv.writer, プロパティ列, 出力行数, 列が増える前の行数）
+        self.node_files: Dict[str, Dict[str, Any]] = {}
+        self.relation_files: Dict[str, Dict[str, Any]] = {}
+
+        # 共有ノードを重複して出力しないためのID（IDのみ保持）
+        self.written_node_ids = set()
+        self.written_relation_ids = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_ecomap(self, json_data: Dict[str, Any]) -> str:
+        """
+        エコマップ1件分を出力
+
+        Args:
+            json_data: エコマップのJSONデータ（person, nodes, relations）
+
+        Returns:
+            ケースID（本人キャッシュキー）
+        """
+        case_id = LayoutCache.person_key(json_data.get("person", {}))
+        self.add_nodes(json_data.get("nodes", []), case_id)
+        self.add_relations(json_data.get("relations", []), case_id)
+        return case_id
+
+    def add_nodes(self, nodes: Iterable[Dict[str, Any]], case_id: Optional[str] = None):
+        """
+        ノードを出力（出力済みのIDは読み飛ばす）
+
+        Args:
+            nodes: ノードの反復可能オブジェクト
+            case_id: ケースID（ノードに cases がない場合に使用）
+        """
+        for node in nodes:
+            if node["id"] in self.written_node_ids:
+                continue
+            self.written_node_ids.add(node["id"])
+
+            output = self._output(self.node_files, "nodes", node["type"])
+            row = [
+                node["id"],
+                node["type"],
+                node.get("name", ""),
+                node.get("layer", ""),
+                self._cases(node, case_id),
+            ]
+            self._write_row(output, row, node.get("properties", {}))
+
+    def add_relations(self, relations: Iterable[Dict[str, Any]], case_id: Optional[str] = None):
+        """
+        リレーションを出力（出力済みのIDは読み飛ばす）
+
+        Args:
+            relations: リレーションの反復可能オブジェクト
+            case_id: ケースID（リレーションに cases がない場合に使用）
+        """
+        for relation in relations:
+            if relation["id"] in self.written_relation_ids:
+                continue
+            self.written_relation_ids.add(relation["id"])
+
+            output = self._output(self.relation_files, "relationships", relation["type"])
+            row = [
+                relation["source_id"],
+                relation["target_id"],
+                relation["type"],
+                relation["id"],
+                relation.get("layer", ""),
+                relation.get("direction", ""),
+                self._cases(relation, case_id),
+            ]
+            self._write_row(output, row, relation.get("properties", {}))
+
+    def close(self) -> Path:
+        """
+        出力を終了し、ヘッダーファイルとインポート用スクリプトを書き出す
+
+        Returns:
+            インポート用スクリプト（import.sh）のパス
+        """
+        for outputs, fixed_columns in (
+            (self.node_files, self.NODE_COLUMNS),
+            (self.relation_files, self.RELATION_COLUMNS),
+        ):
+            for output in outputs.values():
+                if output["file"].closed:
+                    continue
+                output["file"].close()
+                self._pad_rows(output, len(fixed_columns))
+                with open(output["header"], "w", encoding="utf-8", newline="") as f:
+                    csv.writer(f).writerow(fixed_columns + output["columns"])
+
+        script_path = self.output_dir / "import.sh"
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write("#!/bin/sh\n")
+            f.write("# neo4j-admin import による一括登録（データベースは停止した状態で実行）\n")
+            f.write(f'cd "$(dirname "$0")"\n{self.import_command()}\n')
+        return script_path
+
+    def import_command(self, database: str = "neo4j") -> str:
+        """
+        neo4j-admin import のコマンドライン（出力ディレクトリからの相対パス）
+
+        Args:
+            database: 登録先のデータベース名
+
+        Returns:
+            コマンドライン
+        """
+        # 備考などの改行を含む値があるため --multiline-fields を指定
+        arguments = ["neo4j-admin database import full", "--multiline-fields=true"]
+        for option, outputs in (
+            ("--nodes", self.node_files),
+            ("--relationships", self.relation_files),
+        ):
+            for name, output in sorted(outputs.items()):
+                arguments.append(f"{option}={name}={output['header'].name},{output['path'].name}")
+        arguments.append(database)
+        return " \\\n    ".join(arguments)
+
+    def _output(self, outputs: Dict[str, Dict[str, Any]], prefix: str, name: str) -> Dict[str, Any]:
+        """ラベル・タイプごとの出力先（初回に作成）"""
+        if name not in outputs:
+            safe_name = re.sub(r"[^A-Za-z0-9_]", "_", name)
+            path = self.output_dir / f"{prefix}_{safe_name}.csv"
+            file = open(path, "w", encoding="utf-8", newline="")
+            outputs[name] = {
+                "path": path,
+                "header": self.output_dir / f"{prefix}_{safe_name}_header.csv",
+                "file": file,
+                "writer": csv.writer(file),
+                "columns": [],
+                "rows": 0,
+                "short_rows": 0,
+            }
+        return outputs[name]
+
+    def _write_row(self, output: Dict[str, Any], row: List[str], properties: Dict[str, Any]):
+        """固定列とプロパティ列を1行出力（初めて出てきたプロパティは列を追加）"""
+        columns = output["columns"]
+        for key in properties:
+            if key not in columns and key not in self.RESERVED_PROPERTIES:
+                columns.append(key)
+                # 追加前に出力した行は終了時に空欄で埋める
+                output["short_rows"] = output["rows"]
+
+        output["writer"].writerow(
+            row + [self._format_value(properties.get(key)) for key in columns]
+        )
+        output["rows"] += 1
+
+    def _pad_rows(self, output: Dict[str, Any], fixed_count: int):
+        """列が増える前に出力した行を、最終的な列数まで空欄で埋める"""
+        if not output["short_rows"]:
+            return
+
+        width = fixed_count + len(output["columns"])
+        padded_path = output["path"].with_suffix(".tmp")
+        with open(output["path"], "r", encoding="utf-8", newline="") as source, \
+                open(padded_path, "w", encoding="utf-8", newline="") as target:
+            writer = csv.writer(target)
+            for row in csv.reader(source):
+                writer.writerow(row + [""] * (width - len(row)))
+        padded_path.replace(output["path"])
+
+    def _cases(self, item: Dict[str, Any], case_id: Optional[str]) -> str:
+        """ケースIDの配列（統合グラフは cases、1件分のエコマップは case_id）"""
+        cases = item.get("cases") or ([case_id] if case_id else [])
+        return self.ARRAY_DELIMITER.join(cases)
+
+    def _format_value(self, value: Any) -> str:
+        """プロパティ値をCSVの値に変換（リスト・辞書はJSON文字列）"""
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False)
+        return str(value)
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("=== Neo4jExporter テスト ===")
+
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else "outputs/neo4j"
+    with Neo4jExporter(output_dir) as exporter:
+        for path in sys.argv[2:]:
+            with open(path, "r", encoding="utf-8") as f:
+                exporter.add_ecomap(json.load(f))
+    print(exporter.import_command())
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ネットワーク指標モジュール
+
+統合グラフ（またはエコマップ）のノードとリレーションから疎な隣接行列（CSR形式）を作り、
+次数・媒介中心性（サンプリングによる近似）・連結成分を求めます。
+多くの利用者を受け持つ職員や、多くの利用者の支援がそこを経由している事業所
+（代わりのいない事業所）を見つけるのに使います。
+SciPy があれば scipy.sparse の行列と csgraph で計算し、なければ同じCSR配列を
+標準ライブラリだけで作って計算します（pip install "ecomap-creator[analytics]"）。
+"""
+
+import random
+from collections import deque
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+try:
+    from scipy import sparse
+    from scipy.sparse import csgraph
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+
+class SparseAdjacency:
+    """
+    無向グラフの疎な隣接行列（CSR形式）
+
+    indptr[i]:indptr[i + 1] の範囲の indices が、ノード i に隣接するノードの番号です。
+    重複するエッジと自己ループは除きます。
+    """
+
+    def __init__(
+        self,
+        size: int,
+        edges: Iterable[Tuple[int, int]],
+        use_scipy: Optional[bool] = None
+    ):
+        """
+        初期化（隣接行列を作成）
+
+        Args:
+            size: ノード数
+            edges: (ノード番号, ノード番号) の反復可能オブジェクト
+            use_scipy: SciPy を使うかどうか（省略時は SciPy があれば使う）
+        """
+        self.size = size
+        self.use_scipy = HAS_SCIPY if use_scipy is None else use_scipy and HAS_SCIPY
+        pairs = {(min(i, j), max(i, j)) for i, j in edges if i != j}
+
+        if self.use_scipy:
+            rows = [i for i, j in pairs] + [j for i, j in pairs]
+            cols = [j for i, j in pairs] + [i for i, j in pairs]
+            self.matrix = sparse.csr_matrix(([1] * len(rows), (rows, cols)), shape=(size, size))
+            self.indptr: List[int] = self.matrix.indptr.tolist()
+            self.indices: List[int] = self.matrix.indices.tolist()
+        else:
+            self.matrix = None
+            self.indptr, self.indices = self._build_csr(size, pairs)
+
+    @property
+    def backend(self) -> str:
+        """計算に使う実装（"scipy" または "python"）"""
+        return "scipy" if self.use_scipy else "python"
+
+    @property
+    def edge_count(self) -> int:
+        """エッジ数（無向）"""
+        return len(self.indices) // 2
+
+    def neighbors(self, i: int) -> List[int]:
+        """ノード i に隣接するノードの番号"""
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def degrees(self) -> List[int]:
+        """各ノードの次数（隣接するノードの数）"""
+        return [self.indptr[i + 1] - self.indptr[i] for i in range(self.size)]
+
+    def components(self) -> List[int]:
+        """
+        連結成分
+
+        Returns:
+            各ノードの連結成分の番号のリスト
+        """
+        if self.use_scipy:
+            _, labels = csgraph.connected_components(self.matrix, directed=False)
+            return labels.tolist()
+
+        labels = [-1] * self.size
+        label = 0
+        for start in range(self.size):
+            if labels[start] >= 0:
+                continue
+            labels[start] = label
+            queue = deque([start])
+            while queue:
+                for w in self.neighbors(queue.popleft()):
+                    if labels[w] < 0:
+                        labels[w] = label
+                        queue.append(w)
+            label += 1
+        return labels
+
+    @staticmethod
+    def _build_csr(size: int, pairs: Iterable[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+        """エッジの両方向を数えてから詰めるCSR配列の作成（計数ソート）"""
+        pairs = sorted(pairs)
+        counts = [0] * (size + 1)
+        for i, j in pairs:
+            counts[i + 1] += 1
+            counts[j + 1] += 1
+        for i in range(size):
+            counts[i + 1] += counts[i]
+
+        indptr = list(counts)
+        indices = [0] * counts[size]
+        for i, j in pairs:
+            indices[counts[i]] = j
+            counts[i] += 1
+            indices[counts[j]] = i
+            counts[j] += 1
+        return indptr, indices
+
+
+class NetworkMetrics:
+    """ネットワーク指標クラス"""
+
+    # 受け持ち件数を確認する職員のノードタイプ
+    STAFF_TYPES = ("ConsultationSupportSpecialist", "ServiceManager", "Doctor")
+
+    # 支援の経由点を確認する事業所・医療機関のノードタイプ
+    PROVIDER_TYPES = ("ConsultationSupport", "SupportService", "MedicalInstitution")
+
+    def __init__(self, graph: Dict[str, Any], use_scipy: Optional[bool] = None):
+        """
+        初期化（隣接行列を作成）
+
+        Args:
+            graph: 統合グラフまたはエコマップのJSONデータ（nodes, relations）
+            use_scipy: SciPy を使うかどうか（省略時は SciPy があれば使う）
+        """
+        self.nodes: List[Dict[str, Any]] = list(graph.get("nodes", []))
+        self.position = {node["id"]: i for i, node in enumerate(self.nodes)}
+        edges = (
+            (self.position[relation["source_id"]], self.position[relation["target_id"]])
+            for relation in graph.get("relations", [])
+            if relation["source_id"] in self.position and relation["target_id"] in self.position
+        )
+        self.adjacency = SparseAdjacency(len(self.nodes), edges, use_scipy)
+
+    def degree(self) -> Dict[str, int]:
+        """ノードID → 次数"""
+        return {node["id"]: d for node, d in zip(self.nodes, self.adjacency.degrees())}
+
+    def connected_components(self) -> List[List[str]]:
+        """連結成分（ノードIDのリスト。大きい順）"""
+        groups: Dict[int, List[str]] = {}
+        for node, label in zip(self.nodes, self.adjacency.components()):
+            groups.setdefault(label, []).append(node["id"])
+        return sorted(groups.values(), key=len, reverse=True)
+
+    def betweenness(self, samples: Optional[int] = None, seed: int = 0) -> Dict[str, float]:
+        """
+        媒介中心性（正規化済み）
+
+        Brandes のアルゴリズムで、起点を samples 個だけ無作為に選んで近似します
+        （省略時、またはノード数以上の場合はすべての起点で厳密に計算）。
+
+        Args:
+            samples: 起点とするノード数
+            seed: 起点を選ぶ乱数のシード
+
+        Returns:
+            ノードID → 媒介中心性
+        """
+        n = self.adjacency.size
+        if samples is None or samples >= n:
+            sources: Iterable[int] = range(n)
+            scale = 1.0
+        else:
+            sources = random.Random(seed).sample(range(n), samples)
+            scale = n / samples
+
+        indptr = self.adjacency.indptr
+        indices = self.adjacency.indices
+        centrality = [0.0] * n
+        # 探索ごとに作り直さず、訪れたノードの分だけ元に戻して使い回す
+        distance = [-1] * n
+        sigma = [0] * n
+        dependency = [0.0] * n
+        predecessors: List[List[int]] = [[] for _ in range(n)]
+        for s in sources:
+            # 幅優先探索で最短経路の数を数える
+            order = [s]
+            distance[s] = 0
+            sigma[s] = 1
+            for v in order:
+                next_distance = distance[v] + 1
+                for w in indices[indptr[v]:indptr[v + 1]]:
+                    if distance[w] < 0:
+                        distance[w] = next_distance
+                        order.append(w)
+                    if distance[w] == next_distance:
+                        sigma[w] += sigma[v]
+                        predecessors[w].append(v)
+
+            # 遠いノードから依存度を積み上げる
+            for w in reversed(order):
+                coefficient = (1 + dependency[w]) / sigma[w]
+                for v in predecessors[w]:
+                    dependency[v] += sigma[v] * coefficient
+                if w != s:
+                    centrality[w] += dependency[w]
+
+            for v in order:
+                distance[v] = -1
+                sigma[v] = 0
+                dependency[v] = 0.0
+                predecessors[v] = []
+
+        # 無向グラフでは各組を両方向から数えるため、(n-1)(n-2) で割ると正規化される
+        if n > 2:
+            scale /= (n - 1) * (n - 2)
+        return {node["id"]: value * scale for node, value in zip(self.nodes, centrality)}
+
+    def report(self, top: int = 10, samples: Optional[int] = None, seed: int = 0) -> Dict[str, Any]:
+        """
+        指標のまとめ
+
+        Args:
+            top: 一覧に載せる件数
+            samples: 媒介中心性の近似に使う起点の数（省略時は厳密に計算）
+            seed: 起点を選ぶ乱数のシード
+
+        Returns:
+            summary（ノード数・エッジ数・連結成分の数など）、staff_by_degree（次数の大きい職員）、
+            providers_by_betweenness（媒介中心性の大きい事業所・医療機関）を含む辞書
+        """
+        degree = self.degree()
+        betweenness = self.betweenness(samples, seed)
+        components = self.connected_components()
+
+        def ranking(types, scores):
+            ranked = [node for node in self.nodes if node["type"] in types]
+            ranked.sort(key=lambda node: (-scores[node["id"]], node["type"], node.get("name", "")))
+            return [
+                {
+                    "id": node["id"],
+                    "type": node["type"],
+                    "name": node.get("name", ""),
+                    "degree": degree[node["id"]],
+                    "betweenness": round(betweenness[node["id"]], 6),
+                    "clients": len(node.get("cases", [])),
+                }
+                for node in ranked[:top]
+            ]
+
+        return {
+            "summary": {
+                "backend": self.adjacency.backend,
+                "node_count": self.adjacency.size,
+                "edge_count": self.adjacency.edge_count,
+                "component_count": len(components),
+                "largest_component": len(components[0]) if components else 0,
+                "betweenness_samples": (
+                    samples if samples is not None and samples < self.adjacency.size else None
+                ),
+            },
+            "staff_by_degree": ranking(self.STAFF_TYPES, degree),
+            "providers_by_betweenness": ranking(self.PROVIDER_TYPES, betweenness),
+        }
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    print("=== NetworkMetrics テスト ===")
+
+    if len(sys.argv) < 2:
+        print("使い方: python network_metrics.py 統合グラフ.json")
+        sys.exit(1)
+
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        graph_data = json.load(f)
+    print(json.dumps(NetworkMetrics(graph_data).report(), ensure_ascii=False, indent=2))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ノード集約モジュール
+
+処方薬や契約など、同じノードにぶら下がる多数の衛星ノードを
+「処方薬 ×7」のような集約ノードにまとめます。集約はエコマップ生成時に
+計算し、ビューアーでは集約ノードをクリックしたときにだけ展開します。
+"""
+
+from typing import Dict, List, Any
+
+
+class NodeAggregator:
+    """ノード集約クラス"""
+
+    # 集約ルール
+    #   member_type: まとめるノードのタイプ
+    #   anchor_relation: メンバー→アンカー（まとめる単位）のリレーションタイプ
+    #   min_size: この件数以上のときに集約する
+    #   label: 集約ノードのラベル（{count}: 件数, {anchor}: アンカーの名前）
+    AGGREGATION_RULES = [
+        {
+            "member_type": "Medication",
+            "anchor_relation": "PRESCRIBED_BY",
+            "min_size": 3,
+            "label": "処方薬 ×{count}",
+        },
+        {
+            "member_type": "ServiceContract",
+            "anchor_relation": "CONTRACT_WITH",
+            "min_size": 2,
+            "label": "{anchor} 契約 ×{count}",
+        },
+    ]
+
+    def __init__(self, rules: List[Dict[str, Any]] = None):
+        """
+        初期化
+
+        Args:
+            rules: 集約ルール（省略時はAGGREGATION_RULES）
+        """
+        self.rules = rules if rules is not None else self.AGGREGATION_RULES
+
+    def aggregate(
+        self,
+        nodes: List[Dict[str, Any]],
+        relations: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        集約グループを計算
+
+        Args:
+            nodes: ノードのリスト
+            relations: リレーションのリスト
+
+        Returns:
+            集約グループのリスト。各グループは
+            node（集約ノード）, member_ids（まとめたノードID）,
+            relations（集約ノードと外部ノードを結ぶリレーション）を持つ
+        """
+        node_map = {n["id"]: n for n in nodes}
+        grouped = set()
+        groups = []
+
+        for rule in self.rules:
+            # アンカーごとにメンバーを集める（出現順を維持）
+            members_by_anchor: Dict[str, List[str]] = {}
+            for relation in relations:
+                if relation["type"] != rule["anchor_relation"]:
+                    continue
+                member = node_map.get(relation["source_id"])
+                if not member or member["type"] != rule["member_type"] or member["id"] in grouped:
+                    continue
+                if relation["target_id"] not in node_map:
+                    continue
+                members = members_by_anchor.setdefault(relation["target_id"], [])
+                if member["id"] not in members:
+                    members.append(member["id"])
+
+            for anchor_id, member_ids in members_by_anchor.items():
+                if len(member_ids) < rule["min_size"]:
+                    continue
+                grouped.update(member_ids)
+                groups.append(
+                    self._build_group(rule, node_map[anchor_id], member_ids, node_map, relations)
+                )
+
+        return groups
+
+    def _build_group(
+        self,
+        rule: Dict[str, Any],
+        anchor: Dict[str, Any],
+        member_ids: List[str],
+        node_map: Dict[str, Dict[str, Any]],
+        relations: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """集約ノードと、メンバーの外部リレーションを束ねたリレーションを作成"""
+        first_member = node_map[member_ids[0]]
+        aggregate_id = f"aggregate-{rule['member_type']}-{anchor['id']}"
+        label = rule["label"].format(count=len(member_ids), anchor=anchor.get("name", ""))
+
+        aggregate_node = {
+            "id": aggregate_id,
+            "type": "Aggregate",
+            "name": label,
+            "properties": {
+                "member_type": rule["member_type"],
+                "count": len(member_ids),
+                "members": [node_map[m].get("name", "") for m in member_ids],
+            },
+            "display": {
+                "color": first_member.get("display", {}).get("color", "gray"),
+                "size": "medium",
+                "label": label,
+            },
+            "layer": first_member.get("layer", ""),
+            "is_default_visible": first_member.get("is_default_visible", True),
+        }
+
+        # メンバーと外部ノードのリレーションを、外部ノード・タイプごとに1本にまとめる
+        members = set(member_ids)
+        aggregate_relations = {}
+        for relation in relations:
+            source_in = relation["source_id"] in members
+            target_in = relation["target_id"] in members
+            if source_in == target_in:
+                continue
+            other_id = relation["target_id"] if source_in else relation["source_id"]
+            key = (other_id, relation["type"])
+            if key in aggregate_relations:
+                continue
+            aggregate_relations[key] = {
+                "id": f"{aggregate_id}-{relation['type']}-{other_id}",
+                "type": relation["type"],
+                "source_id": aggregate_id if source_in else other_id,
+                "target_id": other_id if source_in else aggregate_id,
+                "direction": relation.get("direction", "undirected"),
+                "display": dict(relation.get("display", {})),
+                "layer": relation.get("layer", aggregate_node["layer"]),
+            }
+
+        return {
+            "node": aggregate_node,
+            "member_ids": member_ids,
+            "relations": list(aggregate_relations.values()),
+        }
+
+
+if __name__ == "__main__":
+    print("=== NodeAggregator テスト ===")
+
+    test_nodes = [
+        {"id": "p", "type": "Person", "name": "山田太郎", "layer": "person"},
+        {"id": "d", "type": "Doctor", "name": "鈴木医師", "layer": "medical"},
+    ]
+    test_relations = []
+    for i, medication in enumerate(["リスペリドン", "バルプロ酸", "ゾルピデム"]):
+        test_nodes.append(
+            {"id": f"m{i}", "type": "Medication", "name": medication, "layer": "medical"}
+        )
+        test_relations.append(
+            {"id": f"a{i}", "type": "PRESCRIBED_BY", "source_id": f"m{i}", "target_id": "d"}
+        )
+        test_relations.append(
+            {"id": f"b{i}", "type": "TAKES_MEDICATION", "source_id": "p", "target_id": f"m{i}"}
+        )
+
+    for group in NodeAggregator().aggregate(test_nodes, test_relations):
+        print(f"{group['node']['name']}: {group['member_ids']}")
+        for relation in group["relations"]:
+            print(f"  {relation['source_id']} -[{relation['type']}]-> {relation['target_id']}")
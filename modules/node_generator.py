@@ -9,7 +9,10 @@
 
 import uuid
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from .node_identity import NodeIdentity
+from .entity_resolver import EntityResolver
 
 
 class NodeGenerator:
@@ -37,9 +40,118 @@ class NodeGenerator:
         "Medication": {"color": "pink", "size": "small", "shape": "circle"},
     }
     
+    # データの種類と読み込み元のシート名
+    SOURCE_SHEETS = {
+        "person": "本人情報",
+        "family": "家族情報",
+        "notebooks": "手帳情報",
+        "support_levels": "支援区分情報",
+        "diagnoses": "診断情報",
+        "legal_guardians": "成年後見情報",
+        "consultation_supports": "相談支援情報",
+        "service_plans": "サービス等利用計画",
+        "service_contracts": "サービス利用情報",
+        "medical_institutions": "医療機関情報",
+    }
+    
     def __init__(self):
         """初期化"""
         self.generated_nodes = {}  # ノードIDのキャッシュ（重複チェック用）
+        # 識別キー → ノード（1件のエコマップ内で同じ事業所・職員を1つのノードにまとめる）
+        self.identity_map: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self.emitted_ids = set()  # generate_source_nodes で返したノードのID
+    
+    def set_provenance(
+        self,
+        node: Dict[str, Any],
+        source: str,
+        row: int,
+        **join_keys: Any
+    ) -> Dict[str, Any]:
+        """
+        ノードに出典（読み込み元のシート・行）と結合キーを記録
+        
+        リレーション生成では、出典の行と結合キーの索引でノード同士を結び付けます。
+        同じノードが複数の行から参照される場合は行を追加します。
+        
+        Args:
+            node: ノード辞書
+            source: データの種類（"service_contracts" など）
+            row: シート内のデータ行の番号（1始まり、空行は数えない）
+            **join_keys: 結合キー（正規化して記録し、空の値は除く）
+            
+        Returns:
+            ノード辞書
+        """
+        provenance = node.setdefault("provenance", {
+            "sheet": self.SOURCE_SHEETS.get(source, source),
+            "source": source,
+            "rows": [],
+            "join_keys": {},
+        })
+        if row not in provenance["rows"]:
+            provenance["rows"].append(row)
+        for key, value in join_keys.items():
+            if value not in (None, "") and key not in provenance["join_keys"]:
+                provenance["join_keys"][key] = NodeIdentity.normalize(value)
+        return node
+    
+    def find_identity(
+        self,
+        node_type: str,
+        name: Any,
+        office_number: Any = "",
+        scope: str = ""
+    ) -> Optional[Dict[str, Any]]:
+        """
+        生成済みの同じ実体のノードを探す
+        
+        事業所番号が分かる場合は番号で、分からない場合は正規化した名前で探します。
+        名前が一致しても事業所番号が異なるノードは別の実体とします。
+        
+        Args:
+            node_type: ノードタイプ
+            name: 名前（事業所名・氏名）
+            office_number: 事業所番号
+            scope: 識別する範囲（職員は所属先）
+            
+        Returns:
+            ノード辞書（なければNone）
+        """
+        number = NodeIdentity.normalize(office_number)
+        if number and (node_type, scope, "number", number) in self.identity_map:
+            return self.identity_map[(node_type, scope, "number", number)]
+        
+        normalized = EntityResolver.normalize_name(name, node_type)
+        node = self.identity_map.get((node_type, scope, "name", normalized)) if normalized else None
+        if node and number:
+            known_number = NodeIdentity.normalize(node["properties"].get("office_number"))
+            if known_number and known_number != number:
+                return None
+        return node
+    
+    def register_identity(
+        self,
+        node: Dict[str, Any],
+        name: Any,
+        office_number: Any = "",
+        scope: str = ""
+    ):
+        """
+        ノードを識別キー（事業所番号・正規化した名前）で登録
+        
+        Args:
+            node: ノード辞書
+            name: 名前（事業所名・氏名）
+            office_number: 事業所番号
+            scope: 識別する範囲（職員は所属先）
+        """
+        number = NodeIdentity.normalize(office_number)
+        if number:
+            self.identity_map.setdefault((node["type"], scope, "number", number), node)
+        normalized = EntityResolver.normalize_name(name, node["type"])
+        if normalized:
+            self.identity_map.setdefault((node["type"], scope, "name", normalized), node)
     
     def generate_person_node(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -378,7 +490,7 @@ class NodeGenerator:
     
     def generate_support_service_node(self, office_name: str, office_number: str = "") -> Dict[str, Any]:
         """
-        福祉サービス事業所ノードを生成
+        福祉サービス事業所ノードを生成（同じ事業所のノードが生成済みならそれを返す）
         
         Args:
             office_name: 事業所名
@@ -387,6 +499,13 @@ class NodeGenerator:
         Returns:
             ノード辞書
         """
+        existing = self.find_identity("SupportService", office_name, office_number)
+        if existing:
+            if office_number and not existing["properties"]["office_number"]:
+                existing["properties"]["office_number"] = office_number
+            self.register_identity(existing, office_name, office_number)
+            return existing
+        
         node_id = str(uuid.uuid4())
         
         node = {
@@ -404,11 +523,12 @@ class NodeGenerator:
         }
         
         self.generated_nodes[node_id] = node
+        self.register_identity(node, office_name, office_number)
         return node
     
     def generate_service_manager_node(self, name: str, office_id: str) -> Dict[str, Any]:
         """
-        サービス管理責任者ノードを生成
+        サービス管理責任者ノードを生成（同じ事業所の同じ管理責任者が生成済みならそれを返す）
         
         Args:
             name: 管理責任者氏名
@@ -417,6 +537,10 @@ class NodeGenerator:
         Returns:
             ノード辞書
         """
+        existing = self.find_identity("ServiceManager", name, scope=office_id)
+        if existing:
+            return existing
+        
         node_id = str(uuid.uuid4())
         
         node = {
@@ -434,6 +558,7 @@ class NodeGenerator:
         }
         
         self.generated_nodes[node_id] = node
+        self.register_identity(node, name, scope=office_id)
         return node
     
     def generate_service_contract_node(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -507,17 +632,29 @@ class NodeGenerator:
         self.generated_nodes[node_id] = node
         return node
     
-    def generate_doctor_node(self, name: str, institution_id: str) -> Dict[str, Any]:
+    def generate_doctor_node(
+        self,
+        name: str,
+        institution_id: str,
+        institution_name: str = ""
+    ) -> Dict[str, Any]:
         """
-        医師ノードを生成
+        医師ノードを生成（同じ医療機関の同じ医師が生成済みならそれを返す）
         
         Args:
             name: 医師氏名
             institution_id: 所属医療機関のノードID
+            institution_name: 所属医療機関名
+                （同じ医療機関が複数の行にある場合も医師を1つにまとめる）
             
         Returns:
             ノード辞書
         """
+        scope = EntityResolver.normalize_name(institution_name) or institution_id
+        existing = self.find_identity("Doctor", name, scope=scope)
+        if existing:
+            return existing
+        
         node_id = str(uuid.uuid4())
         
         node = {
@@ -535,6 +672,7 @@ class NodeGenerator:
         }
         
         self.generated_nodes[node_id] = node
+        self.register_identity(node, name, scope=scope)
         return node
     
     def generate_medication_node(self, medication_str: str, doctor_id: str) -> List[Dict[str, Any]]:
@@ -581,6 +719,141 @@ class NodeGenerator:
         
         return nodes
     
+    def generate_source_nodes(
+        self,
+        source: str,
+        records: Iterable[Tuple[int, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        データの種類ごとに、行のデータからノードを生成して出典を記録
+        
+        生成済みの事業所・職員ノードを再利用した場合は、出典の行だけ追加して戻り値には含めません。
+        
+        Args:
+            source: データの種類（"service_contracts" など。SOURCE_SHEETS のキー）
+            records: (行番号, 行のデータ) の反復可能オブジェクト
+            
+        Returns:
+            新しく生成したノードのリスト
+        """
+        nodes = []
+        
+        def add(node, row, **join_keys):
+            self.set_provenance(node, source, row, **join_keys)
+            if node["id"] not in self.emitted_ids:
+                self.emitted_ids.add(node["id"])
+                nodes.append(node)
+            return node
+        
+        for row, record in records:
+            if source == "person":
+                add(self.generate_person_node(record), row)
+            elif source == "family":
+                add(self.generate_family_node(record), row)
+            elif source == "notebooks":
+                add(self.generate_notebook_node(record), row)
+            elif source == "support_levels":
+                add(self.generate_support_level_node(record), row)
+            elif source == "diagnoses":
+                add(self.generate_diagnosis_node(record), row)
+            elif source == "legal_guardians":
+                add(self.generate_legal_guardian_node(record), row)
+            elif source == "consultation_supports":
+                # 相談支援事業所・相談支援専門員ノード
+                office_keys = {
+                    "office_number": record.get("office_number"),
+                    "office_name": record.get("office_name"),
+                    "contract_date": record.get("contract_date"),
+                }
+                office_node = add(
+                    self.generate_consultation_support_node(record), row, **office_keys
+                )
+                if record.get("specialist"):
+                    add(
+                        self.generate_consultation_support_specialist_node(
+                            record["specialist"], office_node["id"]
+                        ),
+                        row,
+                        **office_keys
+                    )
+            elif source == "service_plans":
+                add(
+                    self.generate_service_plan_node(record),
+                    row,
+                    creation_date=record.get("creation_date")
+                )
+            elif source == "service_contracts":
+                # サービス契約・福祉サービス事業所・サービス管理責任者ノード
+                office_keys = {
+                    "office_number": record.get("office_number"),
+                    "office_name": record.get("office_name"),
+                }
+                add(self.generate_service_contract_node(record), row, **office_keys)
+                if record.get("office_name"):
+                    service_node = add(
+                        self.generate_support_service_node(
+                            record["office_name"], record.get("office_number", "")
+                        ),
+                        row,
+                        **office_keys
+                    )
+                    if record.get("manager"):
+                        add(
+                            self.generate_service_manager_node(
+                                record["manager"], service_node["id"]
+                            ),
+                            row,
+                            **office_keys
+                        )
+            elif source == "medical_institutions":
+                # 医療機関・医師・処方薬ノード
+                institution_node = add(self.generate_medical_institution_node(record), row)
+                if record.get("doctor"):
+                    doctor_node = add(
+                        self.generate_doctor_node(
+                            record["doctor"], institution_node["id"], record.get("name", "")
+                        ),
+                        row
+                    )
+                    if record.get("medications"):
+                        medication_nodes = self.generate_medication_node(
+                            record["medications"], doctor_node["id"]
+                        )
+                        for medication_node in medication_nodes:
+                            add(medication_node, row)
+            else:
+                raise ValueError(f"不明なデータの種類です: {source}")
+        
+        return nodes
+    
+    def register_existing(self, nodes: List[Dict[str, Any]]):
+        """
+        生成済みのエコマップのノードを登録（差分更新で同じ事業所・職員のノードを再利用するため）
+        
+        Args:
+            nodes: エコマップのノードのリスト
+        """
+        node_map = {node["id"]: node for node in nodes}
+        for node in nodes:
+            self.generated_nodes[node["id"]] = node
+            self.emitted_ids.add(node["id"])
+            properties = node.get("properties", {})
+            if node["type"] == "SupportService":
+                self.register_identity(
+                    node, properties.get("office_name"), properties.get("office_number")
+                )
+            elif node["type"] == "ServiceManager":
+                self.register_identity(
+                    node, properties.get("name"), scope=properties.get("office_id", "")
+                )
+            elif node["type"] == "Doctor":
+                institution = node_map.get(properties.get("institution_id"), {})
+                scope = (
+                    EntityResolver.normalize_name(institution.get("properties", {}).get("name"))
+                    or properties.get("institution_id", "")
+                )
+                self.register_identity(node, properties.get("name"), scope=scope)
+    
     def _get_display_config(self, node_type: str, label: str) -> Dict[str, Any]:
         """
         表示設定を取得
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ノード識別モジュール
+
+ノードIDは生成のたびに変わる（UUID）ため、ノードの種類と内容から
+再生成しても変わらない識別キーを作成します。
+"""
+
+import unicodedata
+from typing import Dict, List, Any, Tuple
+
+
+class NodeIdentity:
+    """ノード識別クラス"""
+
+    # ノードタイプごとの識別に使うプロパティ
+    IDENTITY_FIELDS = {
+        "Person": ("name", "birth_date"),
+        "Family": ("name", "relation"),
+        "RyoikuNotebook": ("type", "number", "issue_date"),
+        "MentalHealthNotebook": ("type", "number", "issue_date"),
+        "PhysicalDisabilityNotebook": ("type", "number", "issue_date"),
+        "SupportLevel": ("level", "decision_date"),
+        "Diagnosis": ("name",),
+        "LegalGuardian": ("name",),
+        "ConsultationSupport": ("office_number", "office_name"),
+        "ConsultationSupportSpecialist": ("name",),
+        "ServicePlan": ("plan_number", "creation_date"),
+        "SupportService": ("office_number", "office_name"),
+        "ServiceManager": ("name",),
+        "ServiceContract": ("service_type", "contract_date"),
+        "MedicalInstitution": ("name", "department"),
+        "Doctor": ("name",),
+        "Medication": ("medication",),
+    }
+
+    # 事業所番号があれば名前より優先するノードタイプ
+    OFFICE_TYPES = ("ConsultationSupport", "SupportService")
+
+    @staticmethod
+    def normalize(value: Any) -> str:
+        """
+        識別用に文字列を正規化（NFKC・空白除去）
+
+        Args:
+            value: 値
+
+        Returns:
+            正規化された文字列
+
+        Examples:
+            >>> NodeIdentity.normalize("山田　太郎")
+            '山田太郎'
+            >>> NodeIdentity.normalize("４０３０１")
+            '40301'
+        """
+        if value is None:
+            return ""
+        text = unicodedata.normalize("NFKC", str(value))
+        return "".join(text.split())
+
+    @staticmethod
+    def node_key(node: Dict[str, Any]) -> str:
+        """
+        ノードの識別キーを作成
+
+        Args:
+            node: ノード辞書
+
+        Returns:
+            識別キー（例: "Family|山田花子|母"）
+        """
+        node_type = node.get("type", "")
+        properties = node.get("properties", {})
+        fields = NodeIdentity.IDENTITY_FIELDS.get(node_type)
+
+        if node_type in NodeIdentity.OFFICE_TYPES and properties.get("office_number"):
+            parts = [NodeIdentity.normalize(properties["office_number"])]
+        elif fields:
+            parts = [
+                NodeIdentity.normalize(
+                    properties.get(field) if properties.get(field) not in (None, "")
+                    else node.get(field, "")
+                )
+                for field in fields
+            ]
+        else:
+            parts = [NodeIdentity.normalize(node.get("name", ""))]
+
+        return "|".join([node_type] + parts)
+
+    @staticmethod
+    def node_keys(nodes: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        グラフ内の全ノードの識別キーを作成
+
+        同じキーのノードが複数ある場合は、出現順に "#2", "#3" を付けて区別します。
+
+        Args:
+            nodes: ノードのリスト
+
+        Returns:
+            ノードID→識別キー
+        """
+        keys = {}
+        counts: Dict[str, int] = {}
+        for node in nodes:
+            key = NodeIdentity.node_key(node)
+            counts[key] = counts.get(key, 0) + 1
+            if counts[key] > 1:
+                key = f"{key}#{counts[key]}"
+            keys[node["id"]] = key
+        return keys
+
+    @staticmethod
+    def person_identity(person: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        本人の識別情報（正規化した氏名, 生年月日）
+
+        Args:
+            person: 本人情報（nameとbirth_dateを含む辞書）
+
+        Returns:
+            (氏名, 生年月日)
+        """
+        return (
+            NodeIdentity.normalize(person.get("name", "")),
+            NodeIdentity.normalize(person.get("birth_date", "")),
+        )
+
+
+if __name__ == "__main__":
+    print("=== NodeIdentity テスト ===")
+
+    test_nodes = [
+        {"id": "1", "type": "Family", "name": "山田 花子",
+         "properties": {"name": "山田 花子", "relation": "母"}},
+        {"id": "2", "type": "SupportService", "name": "○○作業所",
+         "properties": {"office_number": "４０３０２"}},
+        {"id": "3", "type": "Medication", "name": "リスペリドン",
+         "properties": {"medication": "リスペリドン"}},
+        {"id": "4", "type": "Medication", "name": "リスペリドン",
+         "properties": {"medication": "リスペリドン"}},
+    ]
+    for node_id, key in NodeIdentity.node_keys(test_nodes).items():
+        print(f"{node_id}: {key}")
@@ -11,6 +11,8 @@ import uuid
 from datetime import datetime
 from typing import Dict, List, Any
 
+from .relation_rules import RelationRuleEngine
+
 
 class RelationGenerator:
     """リレーション生成クラス"""
@@ -423,6 +425,25 @@ class RelationGenerator:
         )
         return relation
     
+    def generate_from_rules(
+        self,
+        nodes: List[Dict[str, Any]],
+        engine: RelationRuleEngine = None
+    ) -> List[Dict[str, Any]]:
+        """
+        リレーションルール表に従ってノード間のリレーションをまとめて生成
+        
+        Args:
+            nodes: ノードのリスト（NodeGenerator の出力）
+            engine: リレーションルールエンジン（省略時は既定のルール表）
+            
+        Returns:
+            生成したリレーションのリスト
+        """
+        relations = (engine or RelationRuleEngine.default()).run(nodes)
+        self.generated_relations.extend(relations)
+        return relations
+    
     def _create_relation(
         self,
         relation_type: str,
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+リレーションルールモジュール
+
+どのノード同士をどのリレーションで結ぶかを宣言的なルール表で定義します。
+ルール表はプロセスごとに1回だけ実行計画（起点となるノードタイプごとの手順）に変換し、
+索引を作成したノードを1回走査するだけで全リレーションを生成します。
+新しい種類のリレーションはルールを追加するだけで生成できます。
+"""
+
+import uuid
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+
+class RelationRuleEngine:
+    """リレーションルールエンジン"""
+
+    # リレーションルール
+    #   relation_type: リレーションタイプ
+    #   source / target: 始点・終点のノードタイプ（複数の場合はタプル）
+    #   join: 結合方法
+    #     "person"        本人→終点タイプの全ノード
+    #     "property"      始点のプロパティ key に記録した終点のノードID
+    #     "row"           始点と同じ出典の行から生成された終点。なければ keys の結合キーで検索
+    #     "latest_before" 終点の結合キー target_key が始点の結合キー key 以前で最も新しいもの
+    #                     （該当なしの場合は最初の終点）
+    #   layer, direction, line_style: リレーションの表示（direction・line_style は省略可）
+    #   copy_properties: リレーションのプロパティ名 → "source.プロパティ名" / "target.プロパティ名"
+    RELATION_RULES = [
+        {"relation_type": "FAMILY_RELATION", "source": "Person", "target": "Family",
+         "join": "person", "layer": "family", "direction": "undirected",
+         "copy_properties": {"relation": "target.relation"}},
+        {"relation_type": "HAS_NOTEBOOK", "source": "Person",
+         "target": ("RyoikuNotebook", "MentalHealthNotebook", "PhysicalDisabilityNotebook"),
+         "join": "person", "layer": "notebooks"},
+        {"relation_type": "HAS_SUPPORT_LEVEL", "source": "Person", "target": "SupportLevel",
+         "join": "person", "layer": "support_levels"},
+        {"relation_type": "HAS_DIAGNOSIS", "source": "Person", "target": "Diagnosis",
+         "join": "person", "layer": "diagnoses"},
+        {"relation_type": "UNDER_GUARDIANSHIP", "source": "Person", "target": "LegalGuardian",
+         "join": "person", "layer": "legal_guardians"},
+        {"relation_type": "WORKS_FOR", "source": "ConsultationSupportSpecialist",
+         "target": "ConsultationSupport",
+         "join": "property", "key": "office_id", "layer": "consultation_supports"},
+        {"relation_type": "HAS_SERVICE_PLAN", "source": "Person", "target": "ServicePlan",
+         "join": "person", "layer": "service_plans"},
+        {"relation_type": "CREATED_BY", "source": "ServicePlan",
+         "target": "ConsultationSupportSpecialist",
+         "join": "latest_before", "key": "creation_date", "target_key": "contract_date",
+         "layer": "service_plans"},
+        {"relation_type": "HAS_CONTRACT", "source": "Person", "target": "ServiceContract",
+         "join": "person", "layer": "service_contracts"},
+        {"relation_type": "CONTRACT_WITH", "source": "ServiceContract", "target": "SupportService",
+         "join": "row", "keys": ("office_number", "office_name"), "layer": "service_contracts"},
+        {"relation_type": "MANAGED_BY", "source": "ServiceContract", "target": "ServiceManager",
+         "join": "row", "layer": "service_contracts"},
+        {"relation_type": "WORKS_FOR", "source": "ServiceManager", "target": "SupportService",
+         "join": "property", "key": "office_id", "layer": "service_contracts"},
+        {"relation_type": "RECEIVES_MEDICAL_CARE", "source": "Person",
+         "target": "MedicalInstitution", "join": "person", "layer": "medical"},
+        {"relation_type": "TREATED_BY", "source": "Person", "target": "Doctor",
+         "join": "person", "layer": "medical"},
+        {"relation_type": "WORKS_FOR", "source": "Doctor", "target": "MedicalInstitution",
+         "join": "property", "key": "institution_id", "layer": "medical"},
+        {"relation_type": "TAKES_MEDICATION", "source": "Person", "target": "Medication",
+         "join": "person", "layer": "medical"},
+        {"relation_type": "PRESCRIBED_BY", "source": "Medication", "target": "Doctor",
+         "join": "property", "key": "doctor_id", "layer": "medical"},
+    ]
+
+    JOIN_TYPES = ("person", "property", "row", "latest_before")
+
+    _default: Optional["RelationRuleEngine"] = None
+
+    def __init__(self, rules: List[Dict[str, Any]] = None):
+        """
+        初期化（ルール表を実行計画に変換）
+
+        Args:
+            rules: リレーションルール（省略時はRELATION_RULES）
+
+        Raises:
+            ValueError: ルールの結合方法や必須項目が正しくない場合
+        """
+        self.rules = rules if rules is not None else self.RELATION_RULES
+        self.plan = self._compile(self.rules)
+
+    @classmethod
+    def default(cls) -> "RelationRuleEngine":
+        """既定のルール表の実行計画（プロセスで1回だけ作成）"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def run(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        リレーションを生成
+
+        Args:
+            nodes: ノードのリスト（出典を記録したもの）
+
+        Returns:
+            リレーションのリスト
+        """
+        index = self._index(nodes)
+        created_at = datetime.now().isoformat()
+
+        relations = []
+        for node in nodes:
+            for step in self.plan.get(node["type"], []):
+                for source, target in self._join(step, node, index):
+                    relations.append(self._create_relation(step, source, target, created_at))
+        return relations
+
+    def _compile(self, rules: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """ルール表を、起点のノードタイプ → 手順のリストに変換"""
+        plan: Dict[str, List[Dict[str, Any]]] = {}
+        for rule in rules:
+            join = rule.get("join")
+            if join not in self.JOIN_TYPES:
+                raise ValueError(f"不明な結合方法です: {rule.get('relation_type')} ({join})")
+            for field in ("relation_type", "source", "target", "layer"):
+                if not rule.get(field):
+                    raise ValueError(f"ルールに {field} がありません: {rule}")
+            if join == "property" and not rule.get("key"):
+                raise ValueError(f"property 結合には key が必要です: {rule['relation_type']}")
+            if join == "latest_before" and not (rule.get("key") and rule.get("target_key")):
+                raise ValueError(
+                    f"latest_before 結合には key と target_key が必要です: {rule['relation_type']}"
+                )
+
+            targets = self._types(rule["target"])
+            direction = rule.get("direction", "directed")
+            step = {
+                "join": join,
+                "sources": self._types(rule["source"]),
+                "targets": targets,
+                "key": rule.get("key"),
+                "target_key": rule.get("target_key"),
+                "keys": tuple(rule.get("keys", ())),
+                "copy_properties": [
+                    (name, *path.split(".", 1))
+                    for name, path in rule.get("copy_properties", {}).items()
+                ],
+                "template": {
+                    "type": rule["relation_type"],
+                    "direction": direction,
+                    "display": {
+                        "line_style": rule.get("line_style", "solid"),
+                        "line_width": 2,
+                        "color": "#999",
+                        "arrow": direction == "directed",
+                    },
+                    "layer": rule["layer"],
+                },
+            }
+
+            # 本人との結合は終点のノードを起点に、それ以外は始点のノードを起点に実行
+            drivers = targets if join == "person" else step["sources"]
+            for node_type in drivers:
+                plan.setdefault(node_type, []).append(step)
+        return plan
+
+    def _index(self, nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """ID・タイプ・出典の行・結合キーの索引"""
+        index: Dict[str, Any] = {
+            "by_id": {}, "by_type": {}, "by_row": {}, "by_key": {}, "person": None,
+        }
+        for node in nodes:
+            index["by_id"][node["id"]] = node
+            index["by_type"].setdefault(node["type"], []).append(node)
+            if node["type"] == "Person" and index["person"] is None:
+                index["person"] = node
+
+            provenance = node.get("provenance")
+            if not provenance:
+                continue
+            for row in provenance["rows"]:
+                index["by_row"].setdefault((provenance["source"], row, node["type"]), node)
+            for key_name, value in provenance["join_keys"].items():
+                index["by_key"].setdefault((node["type"], key_name, value), node)
+        return index
+
+    def _join(
+        self,
+        step: Dict[str, Any],
+        node: Dict[str, Any],
+        index: Dict[str, Any]
+    ) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """起点のノードについて、結び付ける (始点, 終点) を求める"""
+        join = step["join"]
+
+        if join == "person":
+            person = index["person"]
+            return [(person, node)] if person and person["type"] in step["sources"] else []
+
+        if join == "property":
+            target = index["by_id"].get(node.get("properties", {}).get(step["key"]))
+            return [(node, target)] if target and target["type"] in step["targets"] else []
+
+        if join == "row":
+            target = self._find_by_row(index, node, step["targets"])
+            for key_name in step["keys"]:
+                value = self._join_key(node, key_name)
+                if target is None and value:
+                    target = next(
+                        (index["by_key"][(t, key_name, value)] for t in step["targets"]
+                         if (t, key_name, value) in index["by_key"]),
+                        None
+                    )
+            return [(node, target)] if target else []
+
+        # latest_before
+        candidates = [
+            t for node_type in step["targets"] for t in index["by_type"].get(node_type, [])
+        ]
+        source_value = self._join_key(node, step["key"])
+        target = None
+        for candidate in candidates:
+            value = self._join_key(candidate, step["target_key"])
+            if not (source_value and value and value <= source_value):
+                continue
+            if target is None or value > self._join_key(target, step["target_key"]):
+                target = candidate
+        if target is None and candidates:
+            target = candidates[0]
+        return [(node, target)] if target else []
+
+    def _create_relation(
+        self,
+        step: Dict[str, Any],
+        source: Dict[str, Any],
+        target: Dict[str, Any],
+        created_at: str
+    ) -> Dict[str, Any]:
+        """手順のひな形からリレーションを作成（RelationGeneratorと同じ形式）"""
+        ends = {"source": source, "target": target}
+        properties = {
+            name: ends[end].get("properties", {}).get(field, "")
+            for name, end, field in step["copy_properties"]
+        }
+        template = step["template"]
+        return {
+            "id": str(uuid.uuid4()),
+            "type": template["type"],
+            "source_id": source["id"],
+            "target_id": target["id"],
+            "properties": properties,
+            "direction": template["direction"],
+            "display": dict(template["display"]),
+            "layer": template["layer"],
+            "created_at": created_at,
+        }
+
+    def _find_by_row(
+        self,
+        index: Dict[str, Any],
+        node: Dict[str, Any],
+        node_types: Tuple[str, ...]
+    ) -> Optional[Dict[str, Any]]:
+        """同じ出典の行から生成された、指定タイプのノード"""
+        provenance = node.get("provenance", {})
+        for row in provenance.get("rows", []):
+            for node_type in node_types:
+                found = index["by_row"].get((provenance["source"], row, node_type))
+                if found:
+                    return found
+        return None
+
+    @staticmethod
+    def _join_key(node: Dict[str, Any], key_name: str) -> str:
+        """ノードの出典に記録した結合キーの値（ない場合は空文字）"""
+        return node.get("provenance", {}).get("join_keys", {}).get(key_name, "")
+
+    @staticmethod
+    def _types(value: Any) -> Tuple[str, ...]:
+        """ノードタイプの指定をタプルに変換"""
+        return (value,) if isinstance(value, str) else tuple(value)
+
+
+if __name__ == "__main__":
+    print("=== RelationRuleEngine テスト ===")
+
+    engine = RelationRuleEngine.default()
+    for node_type, steps in sorted(engine.plan.items()):
+        print(f"{node_type}: {', '.join(step['template']['type'] for step in steps)}")
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+職員別担当件数レポートモジュール
+
+多数のエコマップを1件ずつ読み込み、相談支援専門員・サービス管理責任者ごとに
+担当利用者の件数、期限の近い次回モニタリング、期限の近い契約を集計します。
+職員は (タイプ, 正規化した名前, 事業所番号または正規化した事業所名) をキーにした
+辞書で集計するため、表記ゆれのある同じ職員も1行にまとまり、ケース数に比例した時間で
+処理できます。ケースのデータは集計後に保持しません。
+"""
+
+import csv
+from datetime import date, datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from .caseload_index import CaseloadIndex
+from .entity_resolver import EntityResolver
+from .node_identity import NodeIdentity
+
+
+class StaffCaseloadReport:
+    """職員別担当件数レポートクラス"""
+
+    # 集計する職員のノードタイプと表示名
+    STAFF_LABELS = {
+        "ConsultationSupportSpecialist": "相談支援専門員",
+        "ServiceManager": "サービス管理責任者",
+    }
+
+    # 担当をたどるリレーション（職員のタイプ → (リレーションタイプ, 担当するノードのタイプ)）
+    ASSIGNMENTS = {
+        "ConsultationSupportSpecialist": ("CREATED_BY", "ServicePlan"),
+        "ServiceManager": ("MANAGED_BY", "ServiceContract"),
+    }
+
+    # 終了した契約の状態
+    CLOSED_STATUS = "契約終了"
+
+    # CSVの列（列名, 行の項目）
+    CSV_COLUMNS = [
+        ("職種", "role"),
+        ("職員", "name"),
+        ("事業所", "office"),
+        ("担当件数", "count"),
+        ("担当利用者", "clients"),
+        ("次回モニタリング", "monitoring"),
+        ("期限間近の契約", "expiring_contracts"),
+    ]
+
+    def __init__(
+        self,
+        today: Optional[date] = None,
+        warning_days: int = CaseloadIndex.EXPIRY_WARNING_DAYS
+    ):
+        """
+        初期化
+
+        Args:
+            today: 期限判定の基準日（省略時は今日）
+            warning_days: 期限間近とみなす日数
+        """
+        self.today = today or date.today()
+        self.warning_days = warning_days
+        self.staff: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.case_count = 0
+
+    def add_ecomap(self, json_data: Dict[str, Any]):
+        """
+        ケースを集計に加える
+
+        Args:
+            json_data: エコマップのJSONデータ
+        """
+        self.case_count += 1
+        client = json_data.get("person", {}).get("name", "")
+        nodes = {node["id"]: node for node in json_data.get("nodes", [])}
+
+        # 契約の期限は支給決定（障害支援区分）の有効期限とする
+        support_levels = [
+            node for node in nodes.values()
+            if node["type"] == "SupportLevel" and node.get("history", {}).get("is_current", True)
+        ]
+        level_expiry = max(
+            (n["properties"].get("expiry_date") or "" for n in support_levels), default=""
+        )
+
+        # 職員ID → 担当するノード（計画・契約）
+        assigned: Dict[str, List[Dict[str, Any]]] = {}
+        for relation in json_data.get("relations", []):
+            source = nodes.get(relation["source_id"])
+            staff = nodes.get(relation["target_id"])
+            if not source or not staff or staff["type"] not in self.ASSIGNMENTS:
+                continue
+            relation_type, assigned_type = self.ASSIGNMENTS[staff["type"]]
+            if relation["type"] == relation_type and source["type"] == assigned_type:
+                assigned.setdefault(staff["id"], []).append(source)
+
+        expiring = [
+            item for item in (
+                self._contract_item(client, node, level_expiry)
+                for node in nodes.values() if node["type"] == "ServiceContract"
+            )
+            if item
+        ]
+
+        for node in nodes.values():
+            if node["type"] not in self.STAFF_LABELS:
+                continue
+            if not self._is_active(assigned.get(node["id"], [])):
+                continue
+            office = nodes.get(node.get("properties", {}).get("office_id"), {})
+            entry = self._entry(node, office)
+            if client not in entry["clients"]:
+                entry["clients"].append(client)
+
+            # 見直し前の計画は除き、現在の計画の次回モニタリングを確認する
+            for plan in assigned.get(node["id"], []):
+                if plan["type"] != "ServicePlan":
+                    continue
+                if not plan.get("history", {}).get("is_current", True):
+                    continue
+                due = plan["properties"].get("next_monitoring_date")
+                status = self._due_status(due)
+                if status in CaseloadIndex.FLAG_LABELS:
+                    entry["monitoring"].append({"client": client, "date": due, "status": status})
+
+            # 相談支援専門員は担当利用者の契約、サービス管理責任者は自分が担当する契約を確認する
+            if node["type"] == "ConsultationSupportSpecialist":
+                entry["expiring_contracts"].extend(expiring)
+            else:
+                managed = {item["id"] for item in assigned.get(node["id"], [])}
+                entry["expiring_contracts"].extend(
+                    item for item in expiring if item["id"] in managed
+                )
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """
+        職員ごとの集計結果（職種ごとに担当件数の多い順）
+
+        Returns:
+            role, name, office, count, clients, monitoring, expiring_contracts を含む辞書のリスト
+        """
+        rows = []
+        for entry in self.staff.values():
+            row = dict(entry)
+            row["count"] = len(entry["clients"])
+            row["monitoring"] = sorted(entry["monitoring"], key=lambda item: item["date"])
+            row["expiring_contracts"] = sorted(
+                entry["expiring_contracts"], key=lambda item: item["date"]
+            )
+            rows.append(row)
+        return sorted(rows, key=lambda row: (row["role"], -row["count"], row["name"]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """集計結果を辞書に変換（JSON出力用）"""
+        return {
+            "today": self.today.isoformat(),
+            "warning_days": self.warning_days,
+            "case_count": self.case_count,
+            "staff": self.rows(),
+        }
+
+    def write_csv(self, path: str):
+        """
+        集計結果をCSVファイルに保存（Excelで開けるようBOM付きUTF-8）
+
+        Args:
+            path: 出力先
+        """
+        labels = CaseloadIndex.FLAG_LABELS
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([label for label, _ in self.CSV_COLUMNS])
+            for row in self.rows():
+                values = dict(row)
+                values["clients"] = "、".join(row["clients"])
+                values["monitoring"] = "、".join(
+                    f"{item['client']} {item['date']}（{labels[item['status']]}）"
+                    for item in row["monitoring"]
+                )
+                values["expiring_contracts"] = "、".join(
+                    f"{item['client']} {item['service_type']} {item['date']}"
+                    f"（{labels[item['status']]}）"
+                    for item in row["expiring_contracts"]
+                )
+                writer.writerow([values[field] for _, field in self.CSV_COLUMNS])
+
+    def _is_active(self, items: List[Dict[str, Any]]) -> bool:
+        """
+        担当が続いているかどうか
+
+        見直し前の計画だけを作成した相談支援専門員、終了した契約だけを担当する
+        サービス管理責任者は担当から外れたものとします（担当の記録がなければ担当中とみなす）。
+        """
+        if not items:
+            return True
+        return any(
+            item.get("history", {}).get("is_current", True)
+            and item.get("properties", {}).get("status") != self.CLOSED_STATUS
+            for item in items
+        )
+
+    def _entry(self, node: Dict[str, Any], office: Dict[str, Any]) -> Dict[str, Any]:
+        """職員の集計行（なければ作成）"""
+        office_number = office.get("properties", {}).get("office_number")
+        office_key = (
+            NodeIdentity.normalize(office_number)
+            or EntityResolver.normalize_name(office.get("name", ""))
+        )
+        name_key = EntityResolver.normalize_name(node.get("name", ""), node["type"])
+        key = (node["type"], name_key, office_key)
+        if key not in self.staff:
+            self.staff[key] = {
+                "role": self.STAFF_LABELS[node["type"]],
+                "name": node.get("name", ""),
+                "office": office.get("name", ""),
+                "clients": [],
+                "monitoring": [],
+                "expiring_contracts": [],
+            }
+        return self.staff[key]
+
+    def _contract_item(
+        self,
+        client: str,
+        contract: Dict[str, Any],
+        level_expiry: str
+    ) -> Optional[Dict[str, Any]]:
+        """期限切れ・期限間近の契約（終了した契約と期限が分からない契約はNone）"""
+        properties = contract.get("properties", {})
+        status = self._due_status(level_expiry)
+        if properties.get("status") == self.CLOSED_STATUS:
+            return None
+        if status not in CaseloadIndex.FLAG_LABELS:
+            return None
+        return {
+            "id": contract["id"],
+            "client": client,
+            "service_type": properties.get("service_type", ""),
+            "date": level_expiry,
+            "status": status,
+        }
+
+    def _due_status(self, value: Any) -> Optional[str]:
+        """期限の状態（"expired", "expiring", "ok"）。日付でなければNone"""
+        if not value:
+            return None
+        try:
+            due = datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+        except ValueError:
+            return None
+
+        days = (due - self.today).days
+        if days < 0:
+            return "expired"
+        if days <= self.warning_days:
+            return "expiring"
+        return "ok"
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    print("=== StaffCaseloadReport テスト ===")
+
+    if len(sys.argv) < 2:
+        print("使い方: python staff_caseload.py エコマップ.json ...")
+        sys.exit(1)
+
+    report = StaffCaseloadReport()
+    for json_path in sys.argv[1:]:
+        with open(json_path, "r", encoding="utf-8") as f:
+            report.add_ecomap(json.load(f))
+    for row in report.rows():
+        print(f"{row['role']} {row['name']}（{row['office']}）: {row['count']}件")
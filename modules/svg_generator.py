@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SVG生成モジュール
+
+ブラウザやJavaScriptを使わずに、エコマップを静的なSVGとして生成します。
+印刷用・一括出力用です。
+"""
+
+import math
+from typing import Dict, List, Any, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from .html_generator import HTMLGenerator
+from .layout_engine import LayoutEngine
+
+
+class SVGGenerator:
+    """SVG生成クラス"""
+
+    PADDING = 60
+    TITLE_HEIGHT = 50
+    LEGEND_ROW_HEIGHT = 22
+    FONT_FAMILY = "'Hiragino Sans', 'Yu Gothic', 'Noto Sans CJK JP', sans-serif"
+
+    def __init__(
+        self,
+        layers: Optional[List[str]] = None,
+        layout_engine: Optional[LayoutEngine] = None
+    ):
+        """
+        初期化
+
+        Args:
+            layers: 描画するレイヤー（省略時はHTMLの初期表示と同じ）
+            layout_engine: 座標計算に使うレイアウトエンジン
+        """
+        if layers is None:
+            layers = [layer for layer, _, checked in HTMLGenerator.LAYERS if checked]
+        self.layers = set(layers) | {"person"}
+        self.layout_engine = layout_engine or LayoutEngine()
+
+    def generate(
+        self,
+        json_data: Dict[str, Any],
+        person_name: str,
+        positions: Optional[Dict[str, Tuple[float, float]]] = None
+    ) -> str:
+        """
+        SVGを生成
+
+        Args:
+            json_data: JSONデータ（nodes, relationsを含む）
+            person_name: 本人氏名
+            positions: 座標（省略時はレイアウトエンジンで計算）
+
+        Returns:
+            SVG文字列
+        """
+        nodes = [n for n in json_data["nodes"] if n.get("layer") in self.layers]
+        node_ids = {n["id"] for n in nodes}
+        relations = [
+            r for r in json_data["relations"]
+            if r["source_id"] in node_ids and r["target_id"] in node_ids
+        ]
+
+        if positions is None:
+            positions = self.layout_engine.compute(nodes, relations)
+        else:
+            positions = {
+                node_id: positions[node_id] for node_id in node_ids if node_id in positions
+            }
+
+        legend = self._get_legend_entries(nodes)
+
+        min_x, min_y, max_x, max_y = self.layout_engine.bounds(positions)
+        # ラベルが右側にはみ出す分を確保
+        graph_width = (max_x - min_x) + self.PADDING * 2 + 120
+        graph_height = (max_y - min_y) + self.PADDING * 2
+        width = max(graph_width, 400)
+        height = self.TITLE_HEIGHT + graph_height + len(legend) * self.LEGEND_ROW_HEIGHT + 20
+        offset_x = self.PADDING - min_x + (width - graph_width) / 2
+        offset_y = self.TITLE_HEIGHT + self.PADDING - min_y
+
+        def point(node_id: str) -> Tuple[float, float]:
+            x, y = positions.get(node_id, (0.0, 0.0))
+            return (round(x + offset_x, 1), round(y + offset_y, 1))
+
+        node_map = {n["id"]: n for n in nodes}
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+            f'viewBox="0 0 {width:.0f} {height:.0f}" font-family="{self.FONT_FAMILY}">',
+            f'<title>エコマップ - {escape(person_name)}</title>',
+            '<defs><marker id="arrow" viewBox="0 -5 10 10" refX="10" refY="0" '
+            'markerWidth="6" markerHeight="6" orient="auto">'
+            '<path d="M0,-5L10,0L0,5" fill="#999"/></marker></defs>',
+            '<rect width="100%" height="100%" fill="white"/>',
+            '<text x="20" y="32" font-size="22" font-weight="bold">'
+            f'エコマップ - {escape(person_name)}</text>',
+        ]
+
+        # リレーション
+        parts.append('<g class="links" stroke-opacity="0.6">')
+        for relation in relations:
+            x1, y1 = point(relation["source_id"])
+            x2, y2 = point(relation["target_id"])
+            display = relation.get("display", {})
+            if display.get("arrow"):
+                # 矢印が終点ノードの円周に接するように短縮
+                target_radius = self._radius(node_map[relation["target_id"]])
+                x2, y2 = self._shorten(x1, y1, x2, y2, target_radius)
+            attributes = (
+                f'x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" '
+                f'stroke="{escape(display.get("color", "#999"))}" '
+                f'stroke-width="{display.get("line_width", 2)}"'
+            )
+            if display.get("line_style") == "dashed":
+                attributes += ' stroke-dasharray="5,5"'
+            if display.get("arrow"):
+                attributes += ' marker-end="url(#arrow)"'
+            parts.append(f'<line {attributes}/>')
+        parts.append('</g>')
+
+        # ノードとラベル
+        parts.append('<g class="nodes" stroke="#fff" stroke-width="2">')
+        for node in nodes:
+            x, y = point(node["id"])
+            parts.append(
+                f'<circle cx="{x}" cy="{y}" r="{self._radius(node)}" '
+                f'fill="{self._color(node)}"/>'
+            )
+        parts.append('</g>')
+
+        parts.append('<g class="labels" font-size="12">')
+        for node in nodes:
+            x, y = point(node["id"])
+            label = node.get("display", {}).get("label") or node.get("name", "")
+            parts.append(
+                f'<text x="{round(x + self._radius(node) + 4, 1)}" y="{round(y + 4, 1)}">'
+                f'{escape(str(label))}</text>'
+            )
+        parts.append('</g>')
+
+        # 凡例（レイヤーごとの色）
+        legend_y = self.TITLE_HEIGHT + graph_height
+        parts.append('<g class="legend" font-size="12">')
+        for i, (layer_label, colors) in enumerate(legend):
+            y = legend_y + i * self.LEGEND_ROW_HEIGHT
+            parts.append(f'<text x="20" y="{y + 4}">{escape(layer_label)}</text>')
+            for j, color in enumerate(colors):
+                parts.append(f'<circle cx="{110 + j * 18}" cy="{y}" r="6" fill="{color}"/>')
+        parts.append('</g>')
+
+        parts.append('</svg>')
+        return "\n".join(parts)
+
+    def _get_legend_entries(self, nodes: List[Dict[str, Any]]) -> List[Tuple[str, List[str]]]:
+        """描画対象のレイヤーごとに、使われている色の一覧を作成"""
+        colors_by_layer: Dict[str, List[str]] = {}
+        for node in nodes:
+            colors = colors_by_layer.setdefault(node.get("layer", ""), [])
+            color = self._color(node)
+            if color not in colors:
+                colors.append(color)
+
+        return [
+            (label, colors_by_layer[layer])
+            for layer, label, _ in HTMLGenerator.LAYERS
+            if layer in colors_by_layer
+        ]
+
+    def _radius(self, node: Dict[str, Any]) -> int:
+        """ノードの半径"""
+        return HTMLGenerator.SIZE_MAP.get(node.get("display", {}).get("size"), 25)
+
+    def _color(self, node: Dict[str, Any]) -> str:
+        """ノードの塗り色"""
+        color = node.get("display", {}).get("color", "gray")
+        return HTMLGenerator.COLOR_MAP.get(color, color)
+
+    def _shorten(
+        self,
+        x1: float,
+        y1: float,
+        x2: float,
+        y2: float,
+        distance: float
+    ) -> Tuple[float, float]:
+        """線分の終点を始点方向にdistanceだけ戻す"""
+        length = math.hypot(x2 - x1, y2 - y1)
+        if length <= distance:
+            return (x2, y2)
+        ratio = (length - distance) / length
+        return (round(x1 + (x2 - x1) * ratio, 1), round(y1 + (y2 - y1) * ratio, 1))
+
+
+if __name__ == "__main__":
+    print("=== SVGGenerator テスト ===")
+
+    test_data = {
+        "nodes": [
+            {
+                "id": "person-1",
+                "type": "Person",
+                "name": "山田太郎",
+                "display": {"color": "orange", "size": "large", "label": "山田太郎"},
+                "layer": "person",
+            },
+            {
+                "id": "family-1",
+                "type": "Family",
+                "name": "山田花子",
+                "display": {"color": "red", "size": "medium", "label": "山田花子"},
+                "layer": "family",
+            },
+        ],
+        "relations": [
+            {
+                "id": "rel-1",
+                "type": "FAMILY_RELATION",
+                "source_id": "person-1",
+                "target_id": "family-1",
+                "display": {
+                    "line_style": "solid", "line_width": 2, "color": "#999", "arrow": False,
+                },
+                "layer": "family",
+            }
+        ],
+    }
+
+    svg = SVGGenerator().generate(test_data, "山田太郎")
+    with open("/tmp/test_ecomap.svg", "w", encoding="utf-8") as f:
+        f.write(svg)
+
+    print("テスト用SVGを生成しました: /tmp/test_ecomap.svg")
+    print(f"SVGサイズ: {len(svg)} 文字")
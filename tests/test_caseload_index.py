@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ケース一覧モジュールのテスト
+"""
+
+import json
+import re
+import sys
+from datetime import date
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.caseload_index import CaseloadIndex
+
+
+def _make_case(name, expiry_date):
+    """テスト用のエコマップJSON"""
+    return {
+        "person": {"id": "p", "name": name, "age": 30, "birth_date": "1995-04-01"},
+        "nodes": [
+            {"id": "p", "type": "Person", "name": name, "layer": "person", "properties": {},
+             "display": {"color": "orange", "size": "large", "label": name}},
+            {"id": "s", "type": "SupportService", "name": "ひまわり作業所",
+             "layer": "service_contracts",
+             "properties": {"office_name": "ひまわり作業所"},
+             "display": {"color": "green", "size": "medium", "label": "ひまわり作業所"}},
+            {"id": "l", "type": "SupportLevel", "name": "区分3", "layer": "support_levels",
+             "properties": {"level": "区分3", "expiry_date": expiry_date},
+             "display": {"color": "purple", "size": "medium", "label": "区分3"}},
+        ],
+        "relations": [],
+    }
+
+
+def test_build_entry_flags():
+    """期限切れ・期限間近のフラグと検索用テキストが作られる"""
+    index = CaseloadIndex("unused", today=date(2025, 10, 1))
+
+    expired = index.build_entry(_make_case("山田 太郎", "2025-09-30"))
+    assert expired["flags"] == ["expired"]
+    assert expired["search"] == "山田太郎ひまわり作業所"
+    assert expired["offices"] == ["ひまわり作業所"]
+
+    expiring = index.build_entry(_make_case("佐藤花子", "2025-12-01"))
+    assert expiring["flags"] == ["expiring"]
+
+    valid = index.build_entry(_make_case("鈴木一郎", "2026-12-01"))
+    assert valid["flags"] == []
+    assert valid["expiries"][0]["status"] == "ok"
+
+
+def test_renewed_records_are_not_flagged():
+    """更新前の手帳・置き換えられた計画の期限ではフラグを立てない"""
+    index = CaseloadIndex("unused", today=date(2025, 10, 1))
+    case = _make_case("山田太郎", "2026-12-01")
+    case["nodes"].extend([
+        {"id": "n1", "type": "RyoikuNotebook", "name": "療育手帳 B1", "layer": "notebooks",
+         "properties": {"expiry_date": "2022-03-31", "status": "更新済み"},
+         "history": {"chain": "RyoikuNotebook", "version": 1, "is_current": False}},
+        {"id": "n2", "type": "RyoikuNotebook", "name": "療育手帳 A2", "layer": "notebooks",
+         "properties": {"expiry_date": "2027-03-31", "status": "有効"},
+         "history": {"chain": "RyoikuNotebook", "version": 2, "is_current": True}},
+        {"id": "s1", "type": "ServicePlan", "name": "計画1", "layer": "service_plans",
+         "properties": {"next_monitoring_date": "2023-10-01", "status": "過去"}},
+    ])
+
+    entry = index.build_entry(case)
+    assert entry["flags"] == []
+    assert [e["date"] for e in entry["expiries"]] == ["2026-12-01", "2027-03-31"]
+
+
+def test_write_index_and_case_files(tmp_path):
+    """索引を埋め込んだ一覧ページ・共通ビューアー・ケースごとのデータファイルが出力される"""
+    index = CaseloadIndex(str(tmp_path), today=date(2025, 10, 1))
+    entry = index.add_case(_make_case("山田太郎", "2025-09-30"))
+    index_path = index.write()
+
+    html = index_path.read_text(encoding="utf-8")
+    match = re.search(r'<script type="application/json" id="caseload-index">(.*?)</script>', html)
+    entries = json.loads(match.group(1))
+    assert entries[0]["id"] == entry["id"]
+    # 一覧ページにはケースのグラフデータを含めない
+    assert "nodes" not in entries[0]
+
+    case_js = (tmp_path / "cases" / f"{entry['id']}.js").read_text(encoding="utf-8")
+    assert case_js.startswith("loadEcomapCase(")
+    assert '"layout":' in case_js
+
+    viewer = (tmp_path / "viewer.html").read_text(encoding="utf-8")
+    assert "cases/${encodeURIComponent(caseId)}.js" in viewer
+    assert 'id="ecomap-data"' not in viewer
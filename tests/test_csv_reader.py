@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSV/TSV読み込みモジュールのテスト
+"""
+
+import csv
+import json
+import sys
+from pathlib import Path
+
+import openpyxl
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ecomap_creator import main
+from modules.csv_reader import CSVDirectoryReader
+from modules.excel_reader import ExcelReader
+
+
+# シート名 → 行（テンプレートと同じ並び。値はすべて文字列）
+SHEETS = {
+    "本人情報": [
+        ["本人情報", ""],
+        ["氏名", "山田太郎"],
+        ["生年月日", "1990-01-01"],
+        ["性別", "男"],
+    ],
+    "サービス利用情報": [
+        ["サービス利用情報"],
+        ["サービス種別", "事業所名", "事業所番号", "サービス管理責任者"],
+        ["生活介護", " ○○デイサービス ", "4030200456", "鈴木花子"],
+        ["", "空行"],
+        ["短期入所", "○○デイサービス", "4030200456", "鈴木花子", "", "", "2023-05-01"],
+    ],
+    "支援区分情報": [
+        ["支援区分情報"],
+        ["支援区分", "認定日", "有効期限", "認定機関", "認定調査員", "状態"],
+        ["4", "2023-04-01", "2026-03-31", "北九州市", "", "現在"],
+    ],
+}
+
+
+def _write_workbook(path):
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for sheet_name, rows in SHEETS.items():
+        sheet = workbook.create_sheet(sheet_name)
+        for row in rows:
+            sheet.append([value or None for value in row])
+    workbook.save(path)
+
+
+def _write_csv(directory, names=None, encoding="utf-8-sig"):
+    """シートごとのファイル（サービス利用情報はTSV）"""
+    directory.mkdir(exist_ok=True)
+    for sheet_name, rows in SHEETS.items():
+        name = (names or {}).get(sheet_name, sheet_name)
+        extension = ".tsv" if sheet_name == "サービス利用情報" else ".csv"
+        with open(directory / f"{name}{extension}", "w", encoding=encoding, newline="") as f:
+            csv.writer(f, delimiter="\t" if extension == ".tsv" else ",").writerows(rows)
+
+
+def test_same_data_as_excel(tmp_path):
+    """同じ並びのCSV/TSVファイルから、Excelファイルと同じデータを読み込む"""
+    _write_workbook(tmp_path / "case.xlsx")
+    _write_csv(tmp_path / "case")
+
+    expected = ExcelReader(str(tmp_path / "case.xlsx")).load()
+    data = CSVDirectoryReader(str(tmp_path / "case")).load()
+
+    assert data == expected
+    assert data["person"]["name"] == "山田太郎"
+    assert [row["service_type"] for row in data["service_contracts"]] == ["生活介護", "短期入所"]
+    assert data["service_contracts"][0]["office_name"] == "○○デイサービス"
+    assert data["medical_institutions"] == []
+
+
+def test_source_names_and_encoding(tmp_path):
+    """データの種類の名前のファイルとShift_JISのファイルも読み込める"""
+    _write_csv(tmp_path / "case", names={"サービス利用情報": "service_contracts"}, encoding="cp932")
+
+    data = CSVDirectoryReader(str(tmp_path / "case"), encoding="cp932").load()
+
+    assert data["person"]["gender"] == "男"
+    assert len(data["service_contracts"]) == 2
+    assert data["support_levels"][0]["level"] == "4"
+
+
+def test_directory_input(tmp_path):
+    """入力にディレクトリを指定するとCSV/TSVファイルからエコマップを作成する"""
+    _write_csv(tmp_path / "case")
+    output = tmp_path / "outputs"
+
+    assert main([str(tmp_path / "case"), "-o", str(output)]) == 0
+
+    ecomap = json.loads((output / "山田太郎_ecomap.json").read_text(encoding="utf-8"))
+    assert ecomap["metadata"]["source_file"] == "case"
+    assert sum(node["type"] == "ServiceContract" for node in ecomap["nodes"]) == 2
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+差分更新モジュールのテスト
+"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ecomap_creator import EcomapCreator, main
+from modules.delta_updater import DeltaUpdater
+
+
+def _make_data():
+    """契約2件・医療機関1件のデータ"""
+    return {
+        "person": {"name": "山田太郎", "birth_date": "1990-01-01", "gender": "男"},
+        "service_contracts": [
+            {"service_type": "生活介護", "office_name": "○○デイサービス",
+             "office_number": "4030200456", "manager": "鈴木花子"},
+            {"service_type": "就労継続支援B型", "office_name": "株式会社ワークス",
+             "office_number": "4030200777"},
+        ],
+        "medical_institutions": [
+            {"name": "○○病院", "doctor": "山本医師", "medications": "薬A、薬B"},
+        ],
+    }
+
+
+def _build(creator, data):
+    nodes = creator._generate_nodes(copy.deepcopy(data))
+    relations = creator._generate_relations(data, nodes)
+    return {
+        "person": {"id": nodes[0]["id"], **data["person"]},
+        "nodes": nodes,
+        "relations": relations,
+    }
+
+
+def _content(json_data):
+    """IDに依存しない内容（ノードの (タイプ, 名前)、リレーションの (タイプ, 始点名, 終点名)）"""
+    names = {n["id"]: n["name"] for n in json_data["nodes"]}
+    nodes = sorted((n["type"], n["name"]) for n in json_data["nodes"])
+    relations = sorted(
+        (r["type"], names[r["source_id"]], names[r["target_id"]]) for r in json_data["relations"]
+    )
+    return nodes, relations
+
+
+def test_delta_matches_full_regeneration(tmp_path):
+    """差分を反映した結果は、変更後のデータから作り直した結果と同じ内容になる"""
+    creator = EcomapCreator(output_dir=str(tmp_path))
+    data = _make_data()
+    ecomap = _build(creator, data)
+    unchanged = {n["name"]: n["id"] for n in ecomap["nodes"]}
+    relation_ids = {r["id"] for r in ecomap["relations"]}
+
+    new_contract = {"service_type": "短期入所", "office_name": "○○デイサービス",
+                    "office_number": "4030200456", "manager": "鈴木花子"}
+    changed_institution = {"name": "○○病院", "doctor": "山本医師", "medications": "薬A、薬C"}
+    delta = {
+        "service_contracts": {"added": [new_contract], "removed": [2]},
+        "medical_institutions": {"changed": [{"row": 1, **changed_institution}]},
+    }
+    summary = DeltaUpdater(ecomap).apply(delta)
+
+    expected = _make_data()
+    expected["service_contracts"] = [expected["service_contracts"][0], new_contract]
+    expected["medical_institutions"] = [changed_institution]
+    assert _content(ecomap) == _content(_build(creator, expected))
+
+    # 事業所・管理責任者は既存のノードを再利用し、変更した行のノードはIDを引き継ぐ
+    ids = {n["name"]: n["id"] for n in ecomap["nodes"]}
+    for name in ("○○デイサービス", "鈴木花子", "○○病院", "山本医師", "薬A"):
+        assert ids[name] == unchanged[name]
+    office = next(n for n in ecomap["nodes"] if n["name"] == "○○デイサービス")
+    assert office["provenance"]["rows"] == [1, 3]
+    # 変わらないリレーションは元のものが残る
+    assert len(relation_ids & {r["id"] for r in ecomap["relations"]}) > 0
+    assert summary["removed_nodes"] == 2  # 契約（就労継続支援B型）・事業所（ワークス）
+    assert summary["added_nodes"] == 1  # 契約（短期入所）
+    assert summary["changed_nodes"] == 4  # 変更した行の医療機関・医師・処方薬2件
+
+
+def test_invalid_delta_is_rejected(tmp_path):
+    """本人情報や存在しない行の差分は反映しない"""
+    creator = EcomapCreator(output_dir=str(tmp_path))
+    ecomap = _build(creator, _make_data())
+
+    with pytest.raises(ValueError):
+        DeltaUpdater(ecomap).apply({"person": {"changed": [{"row": 1, "name": "佐藤"}]}})
+    with pytest.raises(ValueError):
+        DeltaUpdater(ecomap).apply({"service_contracts": {"removed": [9]}})
+
+
+def test_update_subcommand_rewrites_json_and_html(tmp_path):
+    """update サブコマンドでJSONとHTMLが出力し直される"""
+    creator = EcomapCreator(output_dir=str(tmp_path))
+    ecomap = _build(creator, _make_data())
+    json_path = tmp_path / "山田太郎_ecomap.json"
+    json_path.write_text(json.dumps(ecomap, ensure_ascii=False), encoding="utf-8")
+    delta_path = tmp_path / "delta.json"
+    delta_path.write_text(json.dumps({
+        "diagnoses": {"added": [{"name": "てんかん", "diagnosis_date": "令和5年4月1日"}]},
+    }, ensure_ascii=False), encoding="utf-8")
+
+    assert main(["update", str(json_path), str(delta_path)]) == 0
+
+    updated = json.loads(json_path.read_text(encoding="utf-8"))
+    diagnosis = next(n for n in updated["nodes"] if n["type"] == "Diagnosis")
+    assert diagnosis["properties"]["diagnosis_date"] == "2023-04-01"
+    assert diagnosis["provenance"]["rows"] == [1]
+    assert (tmp_path / "山田太郎_ecomap.html").exists()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+エコマップ差分モジュールのテスト
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ecomap_creator import main
+from modules.ecomap_diff import EcomapDiff
+
+
+def _make_ecomap(suffix):
+    """テスト用のエコマップJSON（ノードIDは版ごとに異なる）"""
+    nodes = [
+        {"id": f"p{suffix}", "type": "Person", "name": "山田太郎", "layer": "person",
+         "properties": {"name": "山田太郎", "birth_date": "1990-01-01"}},
+        {"id": f"s{suffix}", "type": "SupportService", "name": "○○作業所",
+         "layer": "service_contracts",
+         "properties": {"office_name": "○○作業所", "office_number": "4010000001"}},
+        {"id": f"c{suffix}", "type": "ServiceContract", "name": "生活介護 契約",
+         "layer": "service_contracts",
+         "properties": {"service_type": "生活介護", "contract_date": "2023-04-01",
+                        "status": "契約中"}},
+        {"id": f"m{suffix}", "type": "ServiceManager", "name": "鈴木花子",
+         "layer": "service_contracts",
+         "properties": {"name": "鈴木花子", "office_id": f"s{suffix}"}},
+    ]
+    relations = [
+        {"id": f"r1{suffix}", "type": "HAS_CONTRACT",
+         "source_id": f"p{suffix}", "target_id": f"c{suffix}"},
+        {"id": f"r2{suffix}", "type": "CONTRACT_WITH",
+         "source_id": f"c{suffix}", "target_id": f"s{suffix}"},
+        {"id": f"r3{suffix}", "type": "WORKS_FOR",
+         "source_id": f"m{suffix}", "target_id": f"s{suffix}"},
+    ]
+    return {
+        "person": {"id": f"p{suffix}", "name": "山田太郎", "birth_date": "1990-01-01"},
+        "nodes": nodes,
+        "relations": relations,
+        "metadata": {"created_at": f"2025-0{suffix}-01T00:00:00"},
+    }
+
+
+def test_regenerated_ecomap_has_no_changes():
+    """IDが変わっただけの版同士には差分がない"""
+    diff = EcomapDiff(_make_ecomap(1), _make_ecomap(2))
+    assert not diff.has_changes
+    assert "差分はありません" in diff.render_html()
+
+
+def test_added_removed_and_changed_entities():
+    """追加・削除・変更されたノードとリレーションを内容の識別キーで対応付ける"""
+    old = _make_ecomap(1)
+    new = _make_ecomap(2)
+    new["nodes"][2]["properties"]["status"] = "終了"
+    new["nodes"] = [n for n in new["nodes"] if n["type"] != "ServiceManager"]
+    new["relations"] = [r for r in new["relations"] if r["type"] != "WORKS_FOR"]
+    new["nodes"].append({"id": "d2", "type": "Diagnosis", "name": "てんかん", "layer": "diagnoses",
+                         "properties": {"name": "てんかん"}})
+    new["relations"].append(
+        {"id": "r4", "type": "HAS_DIAGNOSIS", "source_id": "p2", "target_id": "d2"}
+    )
+
+    diff = EcomapDiff(old, new)
+
+    assert [n["name"] for n in diff.nodes["added"]] == ["てんかん"]
+    assert [n["name"] for n in diff.nodes["removed"]] == ["鈴木花子"]
+    assert diff.nodes["changed"] == [{
+        "key": "ServiceContract|生活介護|2023-04-01", "type": "ServiceContract",
+        "name": "生活介護 契約", "layer": "service_contracts",
+        "changes": {"status": ["契約中", "終了"]},
+    }]
+    assert [(r["type"], r["source"], r["target"]) for r in diff.relations["added"]] == [
+        ("HAS_DIAGNOSIS", "山田太郎", "てんかん")
+    ]
+    assert [r["type"] for r in diff.relations["removed"]] == ["WORKS_FOR"]
+
+    html = diff.render_html()
+    assert '<tr class="changed">' in html
+    assert "<del>契約中</del> → <ins>終了</ins>" in html
+
+
+def test_diff_subcommand_compares_directories(tmp_path):
+    """フォルダを指定すると本人ごとに対応付けて一括比較する"""
+    for folder, suffix in (("old", 1), ("new", 2)):
+        (tmp_path / folder).mkdir()
+        data = _make_ecomap(suffix)
+        if folder == "new":
+            data["nodes"][1]["name"] = "○○作業所（移転）"
+        path = tmp_path / folder / "山田太郎_ecomap.json"
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    output = tmp_path / "diff"
+    assert main(["diff", str(tmp_path / "old"), str(tmp_path / "new"), "-o", str(output)]) == 0
+
+    report = (output / "山田太郎_diff.html").read_text(encoding="utf-8")
+    assert "○○作業所（移転）" in report
+
+
+def test_diff_subcommand_json_lists_unpaired_cases(tmp_path, capsys):
+    """フォルダの比較をJSONで出力すると、片方にしかないケースもJSONに入る"""
+    for folder, names in (("old", ["山田太郎"]), ("new", ["山田太郎", "佐藤一郎"])):
+        (tmp_path / folder).mkdir()
+        for name in names:
+            path = tmp_path / folder / f"{name}_ecomap.json"
+            data = _make_ecomap(1)
+            data["person"]["name"] = name
+            path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    assert main(["diff", str(tmp_path / "old"), str(tmp_path / "new"), "--json"]) == 0
+
+    result = json.loads(capsys.readouterr().out)
+    assert len(result["cases"]) == 1
+    assert [Path(path).name for path in result["added_cases"]] == ["佐藤一郎_ecomap.json"]
+    assert result["removed_cases"] == []
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+エコマップ検索モジュールのテスト
+"""
+
+import sys
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.ecomap_store import EcomapStore
+from modules.ecomap_query import EcomapQuery
+
+
+def _make_case(name, suffix, specialist="佐藤太郎", medication="リスペリドン2mg 朝夕",
+               with_plan=True):
+    """テスト用のエコマップJSON"""
+    nodes = [
+        {"id": f"p{suffix}", "type": "Person", "name": name, "properties": {}},
+        {"id": f"c{suffix}", "type": "ConsultationSupport", "name": "○○相談支援事業所",
+         "properties": {"office_name": "○○相談支援事業所", "office_number": "4030100123"}},
+        {"id": f"cs{suffix}", "type": "ConsultationSupportSpecialist", "name": specialist,
+         "properties": {"name": specialist, "office_id": f"c{suffix}"}},
+        {"id": f"h{suffix}", "type": "MedicalInstitution", "name": "○○病院", "properties": {}},
+        {"id": f"d{suffix}", "type": "Doctor", "name": "山田医師",
+         "properties": {"institution_id": f"h{suffix}"}},
+        {"id": f"m{suffix}", "type": "Medication", "name": medication,
+         "properties": {"doctor_id": f"d{suffix}"}},
+    ]
+    relations = [
+        {"id": f"r1{suffix}", "type": "WORKS_FOR",
+         "source_id": f"cs{suffix}", "target_id": f"c{suffix}"},
+        {"id": f"r2{suffix}", "type": "WORKS_FOR",
+         "source_id": f"d{suffix}", "target_id": f"h{suffix}"},
+        {"id": f"r3{suffix}", "type": "PRESCRIBED_BY",
+         "source_id": f"m{suffix}", "target_id": f"d{suffix}"},
+    ]
+    if with_plan:
+        nodes.append({"id": f"sp{suffix}", "type": "ServicePlan", "name": "サービス等利用計画",
+                      "properties": {}})
+    return {"person": {"id": f"p{suffix}", "name": name, "birth_date": f"1990-01-0{suffix}"},
+            "nodes": nodes, "relations": relations}
+
+
+def _make_query():
+    store = EcomapStore()
+    store.save_ecomaps([
+        _make_case("山田太郎", 1),
+        _make_case("佐藤花子", 2, medication="バルプロ酸200mg", with_plan=False),
+        _make_case("鈴木一郎", 3, specialist="高橋次郎", medication="リスペリドン1mg"),
+    ])
+    return EcomapQuery(store)
+
+
+def test_relation_pattern_questions():
+    """処方薬→医師、計画のない利用者、事業所の利用者を検索できる"""
+    query = _make_query()
+
+    doctors = query.doctors_by_medication("リスペリドン")
+    assert len(doctors) == 1
+    assert doctors[0]["doctor"] == "山田医師"
+    assert doctors[0]["institution"] == "○○病院"
+    assert sorted(doctors[0]["clients"]) == ["山田太郎", "鈴木一郎"]
+
+    assert [p["person_name"] for p in query.people_without("ServicePlan")] == ["佐藤花子"]
+    assert len(query.clients_by_office("４０３０１００１２３")) == 3
+
+
+def test_specialist_caseloads():
+    """相談支援専門員ごとの担当件数が多い順に並ぶ"""
+    caseloads = _make_query().specialist_caseloads()
+    assert [(c["specialist"], c["count"]) for c in caseloads] == [("佐藤太郎", 2), ("高橋次郎", 1)]
+    assert caseloads[0]["office"] == "○○相談支援事業所"
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+エコマップ保存モジュールのテスト
+"""
+
+import sys
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.ecomap_store import EcomapStore
+
+
+def _make_case(name, suffix, office_number="4010000001", expiry_date="2026-11-30"):
+    """テスト用のエコマップJSON"""
+    return {
+        "person": {"id": f"p{suffix}", "name": name, "birth_date": f"1990-01-0{suffix}"},
+        "nodes": [
+            {"id": f"p{suffix}", "type": "Person", "name": name, "layer": "person",
+             "properties": {}},
+            {"id": f"s{suffix}", "type": "SupportService", "name": "ひまわり作業所",
+             "layer": "service_contracts",
+             "properties": {"office_name": "ひまわり作業所", "office_number": office_number}},
+            {"id": f"n{suffix}", "type": "RyoikuNotebook", "name": "療育手帳 B1",
+             "layer": "notebooks",
+             "properties": {"grade": "B1", "issue_date": "2020-04-01", "expiry_date": expiry_date}},
+        ],
+        "relations": [
+            {"id": f"r1{suffix}", "type": "HAS_CONTRACT",
+             "source_id": f"p{suffix}", "target_id": f"s{suffix}",
+             "properties": {}, "direction": "forward", "display": {}, "layer": "service_contracts"},
+        ],
+    }
+
+
+def test_bulk_insert_and_indexed_queries(tmp_path):
+    """一括登録した複数ケースを、事業所番号・期限で横断検索できる"""
+    with EcomapStore(str(tmp_path / "ecomaps.sqlite")) as store:
+        store.save_ecomaps([
+            _make_case("山田太郎", 1),
+            _make_case("佐藤花子", 2, office_number="４０１００００００１",
+                       expiry_date="2027-06-30"),
+            _make_case("鈴木一郎", 3, office_number="4010000002"),
+        ])
+
+        clients = store.clients_of_office(office_number="4010000001")
+        assert sorted(c["person_name"] for c in clients) == ["佐藤花子", "山田太郎"]
+        assert len(store.clients_of_office(office_name="ひまわり 作業所")) == 3
+
+        expiring = store.nodes_with_date(
+            "expiry_date", "2026-10-01", "2026-12-31", types=["RyoikuNotebook"]
+        )
+        assert [n["person_name"] for n in expiring] == ["山田太郎", "鈴木一郎"]
+        assert expiring[0]["properties"]["grade"] == "B1"
+
+
+def test_replace_case_and_round_trip():
+    """同じ本人を登録し直すと置き換わり、読み込み結果は元のデータと同じ形になる"""
+    store = EcomapStore()
+    case_id = store.save_ecomap(_make_case("山田太郎", 1))
+    store.save_ecomap(_make_case("山田太郎", 1, expiry_date="2028-03-31"))
+
+    assert len(store.cases()) == 1
+    loaded = store.load_ecomap(case_id)
+    assert loaded["person"]["name"] == "山田太郎"
+    assert [n["id"] for n in loaded["nodes"]] == ["p1", "s1", "n1"]
+    assert loaded["relations"][0]["target_id"] == "s1"
+    assert store.nodes_with_date("expiry_date", "2026-01-01", "2026-12-31") == []
+
+    store.delete_case(case_id)
+    assert store.load_ecomap(case_id) is None
+    store.close()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+名寄せモジュールのテスト
+"""
+
+import sys
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.entity_resolver import EntityResolver
+
+
+def test_normalize_name():
+    """全角・半角、空白、法人格、ひらがな・カタカナ、敬称を吸収する"""
+    normalize = EntityResolver.normalize_name
+    assert normalize("株式会社 ひまわり") == normalize("ﾋﾏﾜﾘ㈱")
+    assert normalize("社会福祉法人　第２つばさ園") == "第2ツバサ園"
+    assert normalize("鈴木 先生", "Doctor") == normalize("鈴木医師", "Doctor")
+    # 人名以外は敬称を取り除かない
+    assert normalize("ABCクリニック医師") == "abcクリニック医師"
+
+
+def test_resolve_with_threshold_and_office_numbers():
+    """類似度がしきい値以上なら同じ実体、事業所番号が異なれば別の実体"""
+    resolver = EntityResolver()
+    result = resolver.resolve([
+        {"id": "1", "type": "SupportService", "name": "ひまわり作業所",
+         "office_number": "4010000001"},
+        {"id": "2", "type": "SupportService", "name": "ひまわり作業所",
+         "office_number": "４０１００００００１"},
+        {"id": "3", "type": "SupportService", "name": "ひまわり作業所",
+         "office_number": "4010000002"},
+        {"id": "4", "type": "SupportService", "name": "ヒマワリ作業所第二"},
+        {"id": "5", "type": "MedicalInstitution", "name": "ひまわり作業所"},
+        {"id": "8", "type": "SupportService", "name": "第2つばさ園"},
+        {"id": "9", "type": "SupportService", "name": "第3つばさ園"},
+        {"id": "6", "type": "Doctor", "name": "鈴木医師", "scope": "h1"},
+        {"id": "7", "type": "Doctor", "name": "鈴木医師", "scope": "h2"},
+    ])
+
+    assert result["1"] == result["2"]
+    assert result["3"] != result["1"]
+    # 「第二」が付いた名前は類似度がしきい値未満
+    assert result["4"] not in (result["1"], result["3"])
+    # 数字だけ異なる名前は別の実体
+    assert result["8"] != result["9"]
+    # ノードタイプ・所属先が異なれば比較しない
+    assert result["5"] != result["1"]
+    assert result["6"] != result["7"]
+    # 同じ内容なら実行のたびに同じID
+    assert result["6"] == EntityResolver.canonical_id("Doctor", "鈴木", scope="h1")
+
+
+def test_blocking_limits_comparisons():
+    """先頭・末尾が共通しない名前どうしは比較しない"""
+    resolver = EntityResolver()
+    names = [
+        f"{chr(0x4E00 + i)}{chr(0x4F00 + i)}病院{chr(0x5000 + i)}{chr(0x5100 + i)}"
+        for i in range(300)
+    ]
+    resolver.resolve(
+        {"id": str(i), "type": "MedicalInstitution", "name": name}
+        for i, name in enumerate(names)
+    )
+    assert len(resolver.entities) == 300
+    assert resolver.comparisons == 0
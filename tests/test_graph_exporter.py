@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+グラフ形式出力モジュールのテスト
+"""
+
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.graph_exporter import GraphMLExporter, GEXFExporter
+
+GRAPHML = "{http://graphml.graphdrawing.org/xmlns}"
+GEXF = "{http://gexf.net/1.3}"
+
+
+def _make_case():
+    """テスト用のエコマップJSON（家族関係は向きのないリレーション）"""
+    return {
+        "person": {"name": "山田太郎", "birth_date": "1990-01-01"},
+        "nodes": [
+            {"id": "p1", "type": "Person", "name": "山田太郎", "layer": "person",
+             "display": {"color": "orange", "size": "large"}, "properties": {"notes": "<要確認>"}},
+            {"id": "f1", "type": "Family", "name": "山田花子", "layer": "family",
+             "display": {"color": "red", "size": "medium"}, "properties": {}},
+        ],
+        "relations": [
+            {"id": "r1", "type": "FAMILY_RELATION", "source_id": "p1", "target_id": "f1",
+             "direction": "undirected", "layer": "family", "properties": {"relation": "母"}},
+        ],
+    }
+
+
+def test_graphml_export(tmp_path):
+    """GraphMLにノード・エッジと種類・レイヤーの属性を出力する"""
+    path = tmp_path / "ecomap.graphml"
+    with GraphMLExporter(str(path)) as exporter:
+        exporter.add_ecomap(_make_case())
+        exporter.add_ecomap(_make_case())  # 出力済みのIDは重複しない
+
+    graph = ET.parse(path).getroot().find(f"{GRAPHML}graph")
+    nodes = graph.findall(f"{GRAPHML}node")
+    assert [n.get("id") for n in nodes] == ["p1", "f1"]
+    data = {d.get("key"): d.text for d in nodes[0]}
+    assert data["label"] == "山田太郎"
+    assert data["node_layer_label"] == "本人"
+    assert data["node_color"] == "#FF6B35"
+    assert "<要確認>" in data["node_properties"]
+
+    edges = graph.findall(f"{GRAPHML}edge")
+    assert len(edges) == 1
+    assert {d.get("key"): d.text for d in edges[0]}["edge_direction"] == "undirected"
+
+
+def test_gexf_writes_edges_after_nodes(tmp_path):
+    """GEXFではノードの後にエッジをまとめて出力する"""
+    path = tmp_path / "ecomap.gexf"
+    with GEXFExporter(str(path)) as exporter:
+        case = _make_case()
+        # エッジを先に追加してもファイル上はノードの後になる
+        exporter.add_relations(case["relations"], "case1")
+        exporter.add_nodes(case["nodes"], "case1")
+
+    graph = ET.parse(path).getroot().find(f"{GEXF}graph")
+    assert [child.tag for child in graph][-2:] == [f"{GEXF}nodes", f"{GEXF}edges"]
+    assert len(graph.find(f"{GEXF}nodes")) == 2
+    edge = graph.find(f"{GEXF}edges")[0]
+    assert edge.get("label") == "FAMILY_RELATION"
+    assert edge.get("source") == "p1"
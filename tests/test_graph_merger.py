@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+グラフ統合モジュールのテスト
+"""
+
+import sys
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.graph_merger import GraphMerger
+
+
+def _make_case(name, suffix, office_number="4010000001", office_name="ひまわり作業所",
+               doctor="鈴木医師"):
+    """テスト用のエコマップJSON（ノードIDはケースごとに異なる）"""
+    nodes = [
+        {"id": f"p{suffix}", "type": "Person", "name": name, "layer": "person", "properties": {}},
+        {"id": f"s{suffix}", "type": "SupportService", "name": office_name,
+         "layer": "service_contracts",
+         "properties": {"office_name": office_name, "office_number": office_number}},
+        {"id": f"h{suffix}", "type": "MedicalInstitution", "name": "○○病院", "layer": "medical",
+         "properties": {"name": "○○病院", "notes": f"{name}の備考"}},
+        {"id": f"d{suffix}", "type": "Doctor", "name": doctor, "layer": "medical",
+         "properties": {"name": doctor, "institution_id": f"h{suffix}"}},
+    ]
+    relations = [
+        {"id": f"r1{suffix}", "type": "HAS_CONTRACT",
+         "source_id": f"p{suffix}", "target_id": f"s{suffix}"},
+        {"id": f"r2{suffix}", "type": "TREATED_BY",
+         "source_id": f"p{suffix}", "target_id": f"d{suffix}"},
+        {"id": f"r3{suffix}", "type": "WORKS_FOR",
+         "source_id": f"d{suffix}", "target_id": f"h{suffix}"},
+    ]
+    return {
+        "person": {"id": f"p{suffix}", "name": name, "birth_date": f"1990-01-0{suffix}"},
+        "nodes": nodes,
+        "relations": relations,
+    }
+
+
+def test_shared_entities_are_consolidated():
+    """事業所番号・正規化した名前で共有エンティティが1つにまとまる"""
+    merger = GraphMerger()
+    merger.add_ecomap(_make_case("山田太郎", 1))
+    merger.add_ecomap(_make_case(
+        "佐藤花子", 2, office_number="４０１００００００１", office_name="ひまわり 作業所"
+    ))
+
+    types = [n["type"] for n in merger.nodes.values()]
+    assert types.count("SupportService") == 1
+    assert types.count("MedicalInstitution") == 1
+    assert types.count("Doctor") == 1
+    assert types.count("Person") == 2
+
+    office = next(n for n in merger.nodes.values() if n["type"] == "SupportService")
+    assert sorted(merger.clients_of(office["id"])) == ["佐藤花子", "山田太郎"]
+
+    # 共有ノード間のリレーションは重複しない
+    works_for = [r for r in merger.relations.values() if r["type"] == "WORKS_FOR"]
+    assert len(works_for) == 1
+    # 本人ごとの情報は共有ノードに残さない
+    hospital = next(n for n in merger.nodes.values() if n["type"] == "MedicalInstitution")
+    assert "notes" not in hospital["properties"]
+
+
+def test_different_office_numbers_are_kept_apart():
+    """同名でも事業所番号が異なれば別の事業所"""
+    merger = GraphMerger()
+    merger.add_ecomap(_make_case("山田太郎", 1, office_number="4010000001"))
+    merger.add_ecomap(_make_case("佐藤花子", 2, office_number="4010000002"))
+    assert [n["type"] for n in merger.nodes.values()].count("SupportService") == 2
+
+
+def test_incremental_replace_and_reload(tmp_path):
+    """同じ本人を追加し直すと置き換わり、保存・読み込み後も追加を続けられる"""
+    merger = GraphMerger()
+    merger.add_ecomap(_make_case("山田太郎", 1))
+    merger.add_ecomap(_make_case("山田太郎", 1, doctor="田中医師"))
+
+    doctors = [n["name"] for n in merger.nodes.values() if n["type"] == "Doctor"]
+    assert doctors == ["田中医師"]
+    assert len(merger.cases) == 1
+
+    path = tmp_path / "org.json"
+    merger.save(str(path))
+    reloaded = GraphMerger.load(str(path))
+    reloaded.add_ecomap(_make_case("佐藤花子", 2, doctor="田中医師"))
+
+    assert [n["type"] for n in reloaded.nodes.values()].count("Doctor") == 1
+    assert len(reloaded.cases) == 2
+
+
+def test_name_variants_are_resolved():
+    """法人格・ひらがなとカタカナ・敬称の表記ゆれも同じ事業所・医師にまとまる"""
+    merger = GraphMerger()
+    merger.add_ecomap(_make_case("山田太郎", 1, office_number="", office_name="株式会社ひまわり"))
+    merger.add_ecomap(_make_case(
+        "佐藤花子", 2, office_number="", office_name="ヒマワリ㈱", doctor="鈴木 先生"
+    ))
+
+    offices = [n for n in merger.nodes.values() if n["type"] == "SupportService"]
+    assert len(offices) == 1
+    assert len(offices[0]["cases"]) == 2
+    # 同じ医療機関の「鈴木医師」と「鈴木 先生」は敬称を除くと一致する
+    assert [n["type"] for n in merger.nodes.values()].count("Doctor") == 1
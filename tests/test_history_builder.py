@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+履歴モジュールのテスト
+"""
+
+import sys
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ecomap_creator import EcomapCreator
+from modules.history_builder import HistoryBuilder
+from modules.html_generator import HTMLGenerator
+
+
+def _make_data():
+    """療育手帳の更新・支援区分の変更・計画の見直しがあるデータ（行は日付順ではない）"""
+    return {
+        "person": {"name": "山田太郎", "birth_date": "1990-01-01"},
+        "notebooks": [
+            {"type": "療育手帳", "grade": "A2", "issue_date": "2020-04-01", "status": "有効"},
+            {"type": "療育手帳", "grade": "B1", "issue_date": "2015-04-01", "status": "期限切れ"},
+            {"type": "精神障害者保健福祉手帳", "grade": "2級", "issue_date": "2018-04-01",
+             "status": "有効"},
+        ],
+        "support_levels": [
+            {"level": 3, "decision_date": "2018-04-01", "status": "過去"},
+            {"level": 4, "decision_date": "2021-04-01", "status": "過去"},
+            {"level": 5, "decision_date": "2024-04-01", "status": "現在"},
+        ],
+        "service_plans": [
+            {"plan_number": "P1", "creation_date": "2022-05-01"},
+        ],
+    }
+
+
+def _chains(nodes, relations):
+    names = {n["id"]: n["name"] for n in nodes}
+    return sorted(
+        (r["type"], names[r["source_id"]], names[r["target_id"]])
+        for r in relations if r["type"] in HistoryBuilder.RELATION_TYPES
+    )
+
+
+def test_history_chains_are_built_by_date(tmp_path):
+    """種類ごとに日付順に並べ、新しいもの→1つ前のものをつなぐ"""
+    creator = EcomapCreator(output_dir=str(tmp_path))
+    data = _make_data()
+    nodes = creator._generate_nodes(data)
+    relations = creator._generate_relations(data, nodes)
+
+    assert _chains(nodes, relations) == [
+        ("CHANGED_FROM", "支援区分4", "支援区分3"),
+        ("CHANGED_FROM", "支援区分5", "支援区分4"),
+        ("RENEWED_FROM", "療育手帳 A2", "療育手帳 B1"),
+    ]
+    renewed = next(r for r in relations if r["type"] == "RENEWED_FROM")
+    assert renewed["display"]["line_style"] == "dashed"
+
+    history = {n["name"]: n["history"] for n in nodes if "history" in n}
+    assert history["療育手帳 B1"] == {"chain": "RyoikuNotebook", "version": 1, "is_current": False}
+    assert history["療育手帳 A2"]["is_current"]
+    assert history["精神障害者保健福祉手帳 2級"]["is_current"]
+    assert history["支援区分5"] == {"chain": "SupportLevel", "version": 3, "is_current": True}
+
+
+def test_current_and_history_views(tmp_path):
+    """現在のビューは置き換えられたノードとそのリレーションを除き、履歴のビューはチェーンだけを残す"""
+    creator = EcomapCreator(output_dir=str(tmp_path))
+    data = _make_data()
+    nodes = creator._generate_nodes(data)
+    ecomap = {"nodes": nodes, "relations": creator._generate_relations(data, nodes)}
+
+    current = HistoryBuilder.current_view(ecomap)
+    levels = [n["name"] for n in current["nodes"] if n["type"] == "SupportLevel"]
+    assert levels == ["支援区分5"]
+    assert not [r for r in current["relations"] if r["type"] in HistoryBuilder.RELATION_TYPES]
+    assert len(ecomap["nodes"]) == len(nodes)  # 元のデータは変更しない
+
+    history = HistoryBuilder.history_view(ecomap)
+    assert {n["type"] for n in history["nodes"]} == {
+        "Person", "RyoikuNotebook", "MentalHealthNotebook", "SupportLevel", "ServicePlan"
+    }
+    assert len(_chains(history["nodes"], history["relations"])) == 3
+
+
+def test_viewer_hides_history_by_default(tmp_path):
+    """ビューアーには「履歴を表示」（初期状態はオフ）があり、軽量ペイロードにも履歴の情報が残る"""
+    creator = EcomapCreator(output_dir=str(tmp_path))
+    data = _make_data()
+    nodes = creator._generate_nodes(data)
+    ecomap = {"person": {"id": nodes[0]["id"], "name": "山田太郎"}, "nodes": nodes,
+              "relations": creator._generate_relations(data, nodes)}
+
+    html = HTMLGenerator().generate(ecomap, "山田太郎")
+    assert '<input type="checkbox" id="show-history">' in html
+
+    payload, _ = HTMLGenerator(slim_payload=True).project_payload(ecomap)
+    assert any(n.get("history") == {"chain": "SupportLevel", "version": 1, "is_current": False}
+               for n in payload["nodes"])
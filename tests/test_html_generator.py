@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML生成モジュールのテスト
+"""
+
+import base64
+import gzip
+import json
+import re
+import pytest
+import sys
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.html_generator import HTMLGenerator
+from modules.layout_engine import LayoutEngine
+
+
+def _make_data():
+    """テスト用データ"""
+    return {
+        "person": {"id": "p", "name": "山田太郎", "age": 25},
+        "nodes": [
+            {"id": "p", "type": "Person", "name": "山田太郎", "layer": "person",
+             "properties": {"age": 25, "address": "北九州市", "phone": "093-000-0000", "notes": ""},
+             "display": {"color": "orange", "size": "large", "label": "山田太郎"},
+             "is_default_visible": True, "created_at": "2025-10-21T12:00:00"},
+            {"id": "f", "type": "Family", "name": "山田花子", "layer": "family",
+             "properties": {"relation": "母", "phone": "090-0000-0000"},
+             "display": {"color": "red", "size": "medium", "label": "山田花子"},
+             "is_default_visible": True, "created_at": "2025-10-21T12:00:00"},
+        ],
+        "relations": [
+            {"id": "r1", "type": "FAMILY_RELATION", "source_id": "p", "target_id": "f",
+             "properties": {"relation": "母"}, "direction": "undirected", "layer": "family",
+             "display": {"line_style": "solid", "line_width": 2, "color": "#999", "arrow": False},
+             "created_at": "2025-10-21T12:00:00"},
+        ],
+        "metadata": {"node_count": 2, "relation_count": 1},
+    }
+
+
+def _embedded_data(html, block_id="ecomap-data"):
+    """埋め込まれた（非圧縮の）データブロック"""
+    pattern = rf'<script type="application/json" id="{block_id}">(.*?)</script>'
+    match = re.search(pattern, html, re.S)
+    assert match
+    return json.loads(match.group(1))
+
+
+def _embedded_layout(html):
+    """埋め込まれた初期配置"""
+    match = re.search(r"const layout = (\{.*\});\n", html)
+    assert match
+    return json.loads(match.group(1))
+
+
+def _assert_radial_layout(html, data):
+    """すべてのノードに放射状配置の座標が埋め込まれている"""
+    expected = LayoutEngine().compute(data["nodes"], data["relations"])
+    layout = _embedded_layout(html)
+    assert layout["positions"] == {node_id: list(xy) for node_id, xy in expected.items()}
+    assert set(layout["keys"]) == {node["id"] for node in data["nodes"]}
+    assert layout["warm_start"] is False
+
+
+def test_cytoscape_renderer():
+    """Cytoscape.js版はpresetレイアウトで描画する"""
+    html = HTMLGenerator("cytoscape").generate(_make_data(), "山田太郎")
+    assert "cytoscape" in html
+    assert "name: 'preset'" in html
+    assert "cy.batch" in html
+    assert "d3.forceSimulation" not in html
+    # すべてのノードの座標がPython側で計算されて埋め込まれる
+    _assert_radial_layout(html, _make_data())
+    assert "position: layout.positions[n.id]" in html
+    assert _embedded_data(html) == _make_data()
+
+
+def test_tooltip_escapes_node_fields():
+    """ツールチップ（D3.js版・Cytoscape.js版共通）ではノードの入力値をエスケープする"""
+    for visualization in ("d3", "cytoscape"):
+        html = HTMLGenerator(visualization).generate(_make_data(), "山田太郎")
+        tooltip = html[html.index("function getTooltipContent(d)"):html.index("let detailsPromise")]
+        for field in ("d.name", "d.type", "d.layer", "d.properties.age"):
+            assert f"${{escapeHtml({field})}}" in tooltip
+            assert f"${{{field}}}" not in tooltip
+
+
+def test_project_payload():
+    """軽量ペイロードには描画用のフィールドのみ残る"""
+    payload, details = HTMLGenerator().project_payload(_make_data())
+    person = payload["nodes"][0]
+    assert person["properties"] == {"age": 25}
+    assert "created_at" not in person
+    assert "properties" not in payload["relations"][0]
+    assert details["p"]["address"] == "北九州市"
+    assert "notes" not in details["p"]
+
+
+def test_slim_payload_html():
+    """軽量ペイロード時は詳細情報が別ブロックに埋め込まれる"""
+    html = HTMLGenerator(slim_payload=True).generate(_make_data(), "山田太郎")
+    assert 'id="ecomap-details"' in html
+    assert "created_at" not in html.split('id="ecomap-details"')[0]
+
+    payload = _embedded_data(html)
+    assert [node["properties"] for node in payload["nodes"]] == [{"age": 25}, {}]
+    assert all(set(node) <= set(HTMLGenerator.VIEWER_NODE_FIELDS) | {"properties"}
+               for node in payload["nodes"])
+    details = _embedded_data(html, "ecomap-details")
+    assert details["f"] == {"relation": "母", "phone": "090-0000-0000"}
+    # 配置は軽量化する前のデータから計算される
+    _assert_radial_layout(html, _make_data())
+
+
+def test_compressed_payload():
+    """圧縮時はgzip+base64で埋め込まれ、元のデータに復元できる"""
+    html = HTMLGenerator(compress_payload=True).generate(_make_data(), "山田太郎")
+    match = re.search(r'id="ecomap-data" data-encoding="gzip-base64">(.*?)</script>', html)
+    assert match
+    restored = json.loads(gzip.decompress(base64.b64decode(match.group(1))))
+    assert restored == _make_data()
+    assert "DecompressionStream" in html
+    # 非対応ブラウザでも外部ファイルを読み込まず、同梱の展開処理で表示する
+    assert "function inflateGzip(bytes)" in html
+    assert "fetch(" not in html
+    assert "function inflateGzip" not in HTMLGenerator().generate(_make_data(), "山田太郎")
+
+
+def test_worker_simulation():
+    """Web Worker方式ではWorker内でシミュレーションを実行する"""
+    html = HTMLGenerator(simulation="worker").generate(_make_data(), "山田太郎")
+    assert "startWorkerSimulation()" in html
+    assert "requestAnimationFrame" in html
+    assert _embedded_data(html) == _make_data()
+    _assert_radial_layout(html, _make_data())
+    with pytest.raises(ValueError):
+        HTMLGenerator(simulation="unknown")
+
+
+def test_throttled_simulation():
+    """省電力方式では手動でtickを進め、収束時に停止する"""
+    html = HTMLGenerator(simulation="throttled").generate(_make_data(), "山田太郎")
+    assert "startThrottledSimulation()" in html
+    assert f"const MAX_TICKS_PER_FRAME = {HTMLGenerator.THROTTLE_MAX_TICKS_PER_FRAME};" in html
+    assert f"const ENERGY_THRESHOLD = {HTMLGenerator.THROTTLE_ENERGY_THRESHOLD};" in html
+    assert "kineticEnergy()" in html
+    assert _embedded_data(html) == _make_data()
+    _assert_radial_layout(html, _make_data())
+    # 運動エネルギーはシミュレーション中のノードだけで平均する
+    energy = html[html.index("function kineticEnergy()"):html.index("let running")]
+    assert "simulation.nodes()" in energy
+    assert "data.nodes" not in energy
+
+
+def test_unknown_visualization():
+    """不明な可視化ライブラリはエラー"""
+    with pytest.raises(ValueError):
+        HTMLGenerator("unknown").generate(_make_data(), "山田太郎")
+
+
+def test_initial_layout_and_save_button():
+    """指定した初期配置と識別キーが埋め込まれ、配置を保存できる"""
+    layout = {
+        "person_key": "abc123",
+        "positions": {"p": (0.0, 0.0), "f": (40.0, -80.0)},
+        "warm_start": True,
+    }
+    html = HTMLGenerator(slim_payload=True).generate(_make_data(), "山田太郎", layout=layout)
+    assert 'id="save-layout"' in html
+    assert '"f":[40.0,-80.0]' in html
+    assert '"warm_start":true' in html
+    # 識別キーは軽量化する前の詳細情報から作られる
+    assert '"f":"Family|山田花子|母"' in html
+
+
+def test_collapsed_groups():
+    """集約ノードがあれば埋め込まれ、展開・折りたたみの操作が追加される"""
+    data = _make_data()
+    for i in range(3):
+        data["nodes"].append({
+            "id": f"m{i}", "type": "Medication", "name": f"薬{i}", "layer": "medical",
+            "properties": {}, "display": {"color": "pink", "size": "small", "label": f"薬{i}"},
+        })
+        data["relations"].append({
+            "id": f"rm{i}", "type": "PRESCRIBED_BY", "source_id": f"m{i}", "target_id": "f",
+            "layer": "medical",
+            "display": {"line_style": "solid", "line_width": 1, "color": "#999", "arrow": True},
+        })
+
+    html = HTMLGenerator().generate(data, "山田太郎")
+    assert "処方薬 ×3" in html
+    assert 'id="collapse-groups"' in html
+
+    html = HTMLGenerator(collapse_groups=False).generate(data, "山田太郎")
+    assert "処方薬 ×3" not in html
+    assert 'id="collapse-groups"' not in html
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+有効期間索引モジュールのテスト
+"""
+
+import json
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ecomap_creator import main
+from modules.history_builder import HistoryBuilder
+from modules.interval_index import IntervalIndex, ValidityIndex
+
+
+def _node(node_id, node_type, name, **properties):
+    return {"id": node_id, "type": node_type, "name": name, "layer": "", "properties": properties}
+
+
+def _relation(source_id, target_id, relation_type="HAS"):
+    return {
+        "id": f"{source_id}-{target_id}",
+        "type": relation_type,
+        "source_id": source_id,
+        "target_id": target_id,
+    }
+
+
+def _make_ecomap(name="山田太郎"):
+    """更新された手帳・見直された計画・契約と事業所を持つエコマップ"""
+    return {
+        "person": {"id": "p", "name": name, "birth_date": "1990-01-01"},
+        "nodes": [
+            _node("p", "Person", name),
+            _node("n1", "RyoikuNotebook", "療育手帳 B1",
+                  issue_date="2015-04-01", expiry_date="2020-03-31"),
+            _node("n2", "RyoikuNotebook", "療育手帳 A2",
+                  issue_date="2020-04-01", expiry_date="2025-03-31"),
+            _node("s1", "ServicePlan", "計画1", creation_date="2021-04-01"),
+            _node("s2", "ServicePlan", "計画2", creation_date="2023-04-01"),
+            _node("c1", "ServiceContract", "生活介護 契約", contract_date="2022-04-01"),
+            _node("o1", "SupportService", "○○デイサービス"),
+            _node("f1", "Family", "山田花子"),
+        ],
+        "relations": [
+            _relation("p", "n1"),
+            _relation("p", "n2"),
+            _relation("n2", "n1", "RENEWED_FROM"),
+            _relation("p", "s1"),
+            _relation("p", "s2"),
+            _relation("p", "c1", "USES_SERVICE"),
+            _relation("c1", "o1", "PROVIDED_BY"),
+            _relation("f1", "p", "FAMILY_OF"),
+        ],
+        "metadata": {},
+    }
+
+
+def _names(json_data):
+    return sorted(node["name"] for node in json_data["nodes"])
+
+
+def test_stab_matches_linear_scan():
+    """突き刺し検索の結果は全区間を調べた結果と同じ"""
+    rng = random.Random(0)
+    base = date(2000, 1, 1)
+    intervals = []
+    for i in range(300):
+        start = base + timedelta(days=rng.randrange(0, 5000)) if rng.random() > 0.1 else None
+        end = None
+        if rng.random() > 0.2:
+            end = (start or base) + timedelta(days=rng.randrange(1, 2000))
+        intervals.append((start, end, i))
+    index = IntervalIndex(intervals)
+
+    for _ in range(100):
+        point = base + timedelta(days=rng.randrange(-100, 7500))
+        expected = {
+            value for start, end, value in intervals
+            if (start is None or start <= point) and (end is None or point < end)
+        }
+        assert sorted(index.stab(point)) == sorted(expected)
+
+
+def test_snapshot_keeps_entities_valid_on_date():
+    """指定した日付に有効な手帳・計画だけが残り、契約前は契約と事業所が含まれない"""
+    ecomap = _make_ecomap()
+
+    snapshot = ValidityIndex.snapshot(ecomap, date(2021, 6, 1))
+    assert _names(snapshot) == ["山田太郎", "山田花子", "療育手帳 A2", "計画1"]
+    assert all(r["type"] != "RENEWED_FROM" for r in snapshot["relations"])
+    assert snapshot["metadata"]["as_of"] == "2021-06-01"
+
+    # 手帳の有効期限日までは有効、計画は次の計画の作成日で置き換わる
+    assert "療育手帳 B1" in _names(ValidityIndex.snapshot(ecomap, date(2020, 3, 31)))
+    assert "療育手帳 B1" not in _names(ValidityIndex.snapshot(ecomap, date(2020, 4, 1)))
+    later = ValidityIndex.snapshot(ecomap, date(2023, 4, 1))
+    assert "計画2" in _names(later) and "計画1" not in _names(later)
+    assert "○○デイサービス" in _names(later)
+
+    # 元のエコマップは変更しない
+    assert len(ecomap["nodes"]) == 8
+
+
+def test_snapshot_history_is_current():
+    """全期間では置き換えられた手帳・計画も、その日付に有効なら最新（現在）になる"""
+    ecomap = _make_ecomap()
+    HistoryBuilder().build(ecomap["nodes"])
+
+    for as_of in (date(2016, 1, 1), date(2021, 6, 1), date(2024, 1, 1)):
+        snapshot = ValidityIndex.snapshot(ecomap, as_of)
+        history = [node["history"] for node in snapshot["nodes"] if "history" in node]
+        assert history
+        assert all(entry["is_current"] and entry["version"] == 1 for entry in history)
+
+    # 元のエコマップの履歴は変更しない
+    assert not next(n for n in ecomap["nodes"] if n["id"] == "s1")["history"]["is_current"]
+
+
+def test_snapshots_across_cases():
+    """複数のケースを1つの索引に登録して同じ日付で一括作成できる"""
+    index = ValidityIndex([_make_ecomap("山田太郎"), _make_ecomap("佐藤一郎")])
+
+    snapshots = index.snapshots(date(2024, 1, 1))
+    assert len(snapshots) == 2
+    for json_data in snapshots.values():
+        assert "生活介護 契約" in _names(json_data)
+        assert "療育手帳 B1" not in _names(json_data)
+
+
+def test_snapshot_subcommand(tmp_path):
+    """snapshot サブコマンドで日付付きのJSONとHTMLが出力される"""
+    (tmp_path / "山田太郎_ecomap.json").write_text(
+        json.dumps(_make_ecomap(), ensure_ascii=False), encoding="utf-8"
+    )
+    output = tmp_path / "snapshots"
+
+    assert main(["snapshot", str(tmp_path), "--as-of", "2016-01-01", "-o", str(output)]) == 0
+
+    snapshot = json.loads((output / "山田太郎_ecomap_2016-01-01.json").read_text(encoding="utf-8"))
+    assert _names(snapshot) == ["山田太郎", "山田花子", "療育手帳 B1"]
+    assert (output / "山田太郎_ecomap_2016-01-01.html").exists()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+レイアウトキャッシュモジュールのテスト
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.layout_cache import LayoutCache
+from modules.layout_engine import LayoutEngine
+from modules.node_identity import NodeIdentity
+
+
+PERSON = {"name": "山田太郎", "birth_date": "1990-01-01"}
+
+
+def _make_graph(with_doctor=False, suffix=""):
+    """テスト用グラフ（IDは生成のたびに変わる）"""
+    nodes = [
+        {"id": f"p{suffix}", "type": "Person", "name": "山田太郎", "layer": "person",
+         "properties": {"name": "山田太郎", "birth_date": "1990-01-01"}},
+        {"id": f"f{suffix}", "type": "Family", "name": "山田花子", "layer": "family",
+         "properties": {"relation": "母"}},
+    ]
+    relations = [{"source_id": f"p{suffix}", "target_id": f"f{suffix}"}]
+    if with_doctor:
+        nodes.append({"id": f"d{suffix}", "type": "Doctor", "name": "鈴木医師", "layer": "medical",
+                      "properties": {"name": "鈴木医師"}})
+        relations.append({"source_id": f"p{suffix}", "target_id": f"d{suffix}"})
+    return nodes, relations
+
+
+def test_node_key_is_stable_across_ids():
+    """IDが変わっても識別キーは同じ"""
+    first, _ = _make_graph(suffix="-1")
+    second, _ = _make_graph(suffix="-2")
+    first_keys = list(NodeIdentity.node_keys(first).values())
+    assert first_keys == list(NodeIdentity.node_keys(second).values())
+
+
+def test_node_keys_disambiguate_duplicates():
+    """同じ内容のノードには連番が付く"""
+    nodes = [
+        {"id": "a", "type": "Medication", "name": "薬A", "properties": {"medication": "薬A"}},
+        {"id": "b", "type": "Medication", "name": "薬A", "properties": {"medication": "薬Ａ"}},
+    ]
+    keys = NodeIdentity.node_keys(nodes)
+    assert keys["a"] == "Medication|薬A"
+    assert keys["b"] == "Medication|薬A#2"
+
+
+def test_save_and_warm_start(tmp_path):
+    """既存ノードは前回の位置のまま、新しいノードだけ追加で配置される"""
+    cache = LayoutCache(str(tmp_path))
+    nodes, relations = _make_graph(suffix="-1")
+    positions = {"p-1": (0.0, 0.0), "f-1": (123.0, -45.0)}
+    cache.save(PERSON, nodes, positions)
+
+    new_nodes, new_relations = _make_graph(with_doctor=True, suffix="-2")
+    cached = cache.load(PERSON)
+    warm = LayoutCache.warm_start(new_nodes, new_relations, cached)
+
+    assert warm["p-2"] == (0.0, 0.0)
+    assert warm["f-2"] == (123.0, -45.0)
+    assert "d-2" in warm
+    assert warm["d-2"] != warm["f-2"]
+
+
+def test_warm_start_places_new_child_relative_to_moved_parent():
+    """新しいノードは移動済みの親ノードを基準に配置される"""
+    nodes, relations = _make_graph(with_doctor=True)
+    nodes.append({"id": "m", "type": "Medication", "name": "薬A", "layer": "medical",
+                  "properties": {"medication": "薬A"}})
+    relations.append({"source_id": "m", "target_id": "d"})
+
+    engine = LayoutEngine()
+    radial = engine.compute(nodes, relations)
+    warm = engine.compute(nodes, relations, {"d": (500.0, 500.0)})
+
+    assert warm["d"] == (500.0, 500.0)
+    assert warm["m"][0] == pytest.approx(500.0 + radial["m"][0] - radial["d"][0], abs=0.1)
+    assert warm["m"][1] == pytest.approx(500.0 + radial["m"][1] - radial["d"][1], abs=0.1)
+
+
+def test_load_missing_or_broken_cache(tmp_path):
+    """キャッシュがない・壊れている場合は空"""
+    cache = LayoutCache(str(tmp_path))
+    assert cache.load(PERSON) == {}
+
+    cache.cache_path(PERSON).write_text("{broken", encoding="utf-8")
+    assert cache.load(PERSON) == {}
+
+
+def test_import_viewer_layout(tmp_path):
+    """ビューアーで保存したレイアウトを読み込める"""
+    layout_path = tmp_path / "layout.json"
+    layout_path.write_text(json.dumps({
+        "person_key": LayoutCache.person_key(PERSON),
+        "positions": {"Person|山田太郎|1990-01-01": [0, 0], "Family|山田花子|母": [10, 20]},
+    }), encoding="utf-8")
+
+    person_key, positions = LayoutCache.import_viewer_layout(str(layout_path))
+    assert person_key == LayoutCache.person_key(PERSON)
+    assert positions["Family|山田花子|母"] == (10.0, 20.0)
+
+    layout_path.write_text("[]", encoding="utf-8")
+    with pytest.raises(ValueError):
+        LayoutCache.import_viewer_layout(str(layout_path))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+レイアウト計算モジュールのテスト
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.layout_engine import LayoutEngine
+
+
+def _make_graph():
+    """本人・家族・医療機関と処方薬・事業所と契約、本人から到達できない相談支援事業所"""
+    nodes = [
+        {"id": "p", "type": "Person", "name": "山田太郎", "layer": "person"},
+        {"id": "f1", "type": "Family", "name": "山田花子", "layer": "family"},
+        {"id": "f2", "type": "Family", "name": "山田一郎", "layer": "family"},
+        {"id": "h", "type": "MedicalInstitution", "name": "○○病院", "layer": "medical"},
+        {"id": "d", "type": "Doctor", "name": "鈴木医師", "layer": "medical"},
+        {"id": "m1", "type": "Medication", "name": "薬A", "layer": "medical"},
+        {"id": "m2", "type": "Medication", "name": "薬B", "layer": "medical"},
+        {"id": "m3", "type": "Medication", "name": "薬C", "layer": "medical"},
+        {"id": "c", "type": "ServiceContract", "name": "生活介護 契約",
+         "layer": "service_contracts"},
+        {"id": "s", "type": "SupportService", "name": "○○作業所", "layer": "service_contracts"},
+        {"id": "cs", "type": "ConsultationSupport", "name": "○○相談支援",
+         "layer": "consultation_supports"},
+    ]
+    relations = [
+        {"source_id": "p", "target_id": "f1"},
+        {"source_id": "p", "target_id": "f2"},
+        {"source_id": "p", "target_id": "h"},
+        {"source_id": "d", "target_id": "h"},
+        {"source_id": "m1", "target_id": "d"},
+        {"source_id": "m2", "target_id": "d"},
+        {"source_id": "m3", "target_id": "d"},
+        {"source_id": "p", "target_id": "c"},
+        {"source_id": "c", "target_id": "s"},
+    ]
+    return nodes, relations
+
+
+# 本人からの階層（到達できないノードは本人の子として接続される）
+DEPTHS = {
+    "p": 0, "f1": 1, "f2": 1, "h": 1, "c": 1, "cs": 1, "s": 2, "d": 2, "m1": 3, "m2": 3, "m3": 3,
+}
+
+
+def test_positions_are_deterministic():
+    """入力の並び順や実行回数に関係なく、同じグラフは同じ座標になる"""
+    nodes, relations = _make_graph()
+    expected = LayoutEngine().compute(nodes, relations)
+
+    rng = random.Random(0)
+    for _ in range(5):
+        shuffled_nodes = [node for node in nodes if node["type"] == "Person"]
+        shuffled_nodes += rng.sample([n for n in nodes if n["type"] != "Person"], len(nodes) - 1)
+        shuffled_relations = rng.sample(relations, len(relations))
+        assert LayoutEngine().compute(shuffled_nodes, shuffled_relations) == expected
+
+    assert set(expected) == set(DEPTHS)
+    assert expected["p"] == (0.0, 0.0)
+    # 先頭のレイヤー（家族）から真上を起点に時計回りに並ぶ
+    assert expected["f1"][1] < 0
+
+
+def test_rings_do_not_overlap():
+    """各ノードは階層ごとの同心円上にあり、同じ円の上で重ならない"""
+    nodes, relations = _make_graph()
+    engine = LayoutEngine(ring_spacing=100.0)
+    positions = engine.compute(nodes, relations)
+
+    for node_id, (x, y) in positions.items():
+        assert math.hypot(x, y) == pytest.approx(100.0 * DEPTHS[node_id], abs=0.2)
+
+    # 同じ円の上のノードは角度が異なり、隣り合うノードも十分に離れている
+    for depth in range(1, max(DEPTHS.values()) + 1):
+        ring = [positions[node_id] for node_id, d in DEPTHS.items() if d == depth]
+        angles = sorted(math.atan2(y, x) for x, y in ring)
+        gaps = [b - a for a, b in zip(angles, angles[1:])]
+        assert all(gap > 0.05 for gap in gaps)
+
+    # 子ノードは親ノードの角度の範囲内に配置される（処方薬は他の部分木より医師の近くにまとまる）
+    def angle_between(a, b):
+        difference = math.atan2(*reversed(positions[a])) - math.atan2(*reversed(positions[b]))
+        return abs((difference + math.pi) % (2 * math.pi) - math.pi)
+
+    for medication in ("m1", "m2", "m3"):
+        others = [angle_between(medication, node_id) for node_id in ("f1", "f2", "c", "s", "cs")]
+        assert angle_between(medication, "d") < min(others)
+
+
+def test_fixed_positions_keep_relative_offsets():
+    """固定したノードはその座標のまま、子ノードは親からの相対位置を保つ"""
+    nodes, relations = _make_graph()
+    engine = LayoutEngine()
+    positions = engine.compute(nodes, relations)
+
+    placed = engine.compute(nodes, relations, fixed_positions={"d": (500.0, 500.0)})
+
+    assert placed["d"] == (500.0, 500.0)
+    assert placed["f1"] == positions["f1"]
+    for medication in ("m1", "m2", "m3"):
+        for axis in (0, 1):
+            offset = positions[medication][axis] - positions["d"][axis]
+            assert placed[medication][axis] == pytest.approx(500.0 + offset)
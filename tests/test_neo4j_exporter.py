@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Neo4j出力モジュールのテスト
+"""
+
+import csv
+import sys
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.neo4j_exporter import Neo4jExporter
+
+
+def _read_csv(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_streaming_export_per_label_files(tmp_path):
+    """ラベル・タイプごとのファイルに出力し、後から増えたプロパティ列は空欄で埋める"""
+    shared = {"id": "h1", "type": "MedicalInstitution", "name": "○○病院", "layer": "medical",
+              "properties": {"name": "○○病院"}}
+    case1 = {
+        "person": {"name": "山田太郎", "birth_date": "1990-01-01"},
+        "nodes": [
+            {"id": "p1", "type": "Person", "name": "山田太郎", "layer": "person",
+             "properties": {"age": 35}},
+            shared,
+        ],
+        "relations": [
+            {"id": "r1", "type": "RECEIVES_MEDICAL_CARE", "source_id": "p1", "target_id": "h1",
+             "layer": "medical", "direction": "forward", "properties": {}},
+        ],
+    }
+    case2 = {
+        "person": {"name": "佐藤花子", "birth_date": "1991-02-02"},
+        "nodes": [
+            {"id": "p2", "type": "Person", "name": "佐藤花子", "layer": "person",
+             "properties": {"age": 34, "notes": "備考\n2行目", "is_primary": True}},
+            shared,
+        ],
+        "relations": [],
+    }
+
+    with Neo4jExporter(str(tmp_path)) as exporter:
+        exporter.add_ecomap(case1)
+        exporter.add_ecomap(case2)
+
+    header = _read_csv(tmp_path / "nodes_Person_header.csv")[0]
+    assert header == [
+        "id:ID", ":LABEL", "name", "layer", "cases:string[]", "age", "notes", "is_primary",
+    ]
+    rows = _read_csv(tmp_path / "nodes_Person.csv")
+    assert [len(row) for row in rows] == [8, 8]
+    assert rows[1][5:] == ["34", "備考\n2行目", "true"]
+
+    # 共有ノードは1回だけ出力し、共通の列と重なるプロパティは出力しない
+    institution_rows = _read_csv(tmp_path / "nodes_MedicalInstitution.csv")
+    assert len(institution_rows) == 1
+    assert _read_csv(tmp_path / "nodes_MedicalInstitution_header.csv")[0][-1] == "cases:string[]"
+
+    relation_rows = _read_csv(tmp_path / "relationships_RECEIVES_MEDICAL_CARE.csv")
+    assert relation_rows[0][:3] == ["p1", "h1", "RECEIVES_MEDICAL_CARE"]
+
+    script = (tmp_path / "import.sh").read_text(encoding="utf-8")
+    assert "--nodes=Person=nodes_Person_header.csv,nodes_Person.csv" in script
+    assert "--relationships=RECEIVES_MEDICAL_CARE=" in script
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ネットワーク指標モジュールのテスト
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ecomap_creator import main
+from modules.network_metrics import HAS_SCIPY, NetworkMetrics, SparseAdjacency
+
+
+def _graph():
+    """2人の利用者が同じ事業所を使い、事業所の職員が2人を受け持つ統合グラフ＋孤立したケース"""
+    nodes = [
+        {"id": "p1", "type": "Person", "name": "山田太郎", "cases": ["a"]},
+        {"id": "p2", "type": "Person", "name": "佐藤一郎", "cases": ["b"]},
+        {"id": "o1", "type": "SupportService", "name": "○○デイサービス", "cases": ["a", "b"]},
+        {"id": "m1", "type": "ServiceManager", "name": "鈴木花子", "cases": ["a", "b"]},
+        {"id": "p3", "type": "Person", "name": "田中次郎", "cases": ["c"]},
+        {"id": "f3", "type": "Family", "name": "田中花子", "cases": ["c"]},
+    ]
+    relations = [
+        {"source_id": "p1", "target_id": "o1"},
+        {"source_id": "p2", "target_id": "o1"},
+        {"source_id": "m1", "target_id": "o1"},
+        {"source_id": "m1", "target_id": "p1"},
+        {"source_id": "m1", "target_id": "p2"},
+        {"source_id": "p1", "target_id": "o1"},  # 重複
+        {"source_id": "p3", "target_id": "f3"},
+        {"source_id": "p3", "target_id": "missing"},  # 存在しないノード
+    ]
+    return {"nodes": nodes, "relations": relations}
+
+
+def _path_betweenness(node_count):
+    """一直線のグラフの媒介中心性（i番目のノードを通る組は i * (n - 1 - i) 組）"""
+    pairs = (node_count - 1) * (node_count - 2) / 2
+    return [i * (node_count - 1 - i) / pairs for i in range(node_count)]
+
+
+def test_csr_structure():
+    """重複エッジと自己ループを除いたCSR配列を作る"""
+    adjacency = SparseAdjacency(4, [(0, 1), (1, 0), (1, 2), (2, 2)], use_scipy=False)
+
+    assert adjacency.backend == "python"
+    assert adjacency.edge_count == 2
+    assert sorted(adjacency.neighbors(1)) == [0, 2]
+    assert adjacency.degrees() == [1, 2, 1, 0]
+    labels = adjacency.components()
+    assert labels[0] == labels[1] == labels[2] != labels[3]
+
+
+def test_degree_and_components():
+    """次数と連結成分（大きい順）"""
+    metrics = NetworkMetrics(_graph(), use_scipy=False)
+
+    degree = metrics.degree()
+    assert degree["o1"] == 3
+    assert degree["m1"] == 3
+    assert degree["p3"] == 1
+    assert [sorted(c) for c in metrics.connected_components()] == [
+        ["m1", "o1", "p1", "p2"],
+        ["f3", "p3"],
+    ]
+
+
+def test_betweenness_exact_and_sampled():
+    """厳密な媒介中心性は一直線のグラフで理論値と一致し、すべての起点を選んだ近似は厳密な値と同じ"""
+    node_count = 7
+    graph = {
+        "nodes": [{"id": str(i), "type": "SupportService"} for i in range(node_count)],
+        "relations": [
+            {"source_id": str(i), "target_id": str(i + 1)} for i in range(node_count - 1)
+        ],
+    }
+    metrics = NetworkMetrics(graph, use_scipy=False)
+
+    exact = metrics.betweenness()
+    for i, expected in enumerate(_path_betweenness(node_count)):
+        assert exact[str(i)] == pytest.approx(expected)
+    assert metrics.betweenness(samples=node_count) == exact
+
+    # 近似でも中央のノードが最大になる
+    sampled = metrics.betweenness(samples=4, seed=1)
+    assert max(sampled, key=sampled.get) in {"2", "3", "4"}
+
+
+@pytest.mark.skipif(not HAS_SCIPY, reason="SciPy がインストールされていません")
+def test_scipy_backend_matches_python():
+    """SciPy の実装と標準ライブラリの実装は同じ結果になる"""
+    with_scipy = NetworkMetrics(_graph(), use_scipy=True)
+    without_scipy = NetworkMetrics(_graph(), use_scipy=False)
+
+    assert with_scipy.adjacency.backend == "scipy"
+    assert with_scipy.degree() == without_scipy.degree()
+    assert with_scipy.connected_components() == without_scipy.connected_components()
+    assert with_scipy.betweenness() == pytest.approx(without_scipy.betweenness())
+
+
+def test_metrics_subcommand(tmp_path, capsys):
+    """metrics サブコマンドで統合グラフの指標をJSONで出力する"""
+    graph_path = tmp_path / "organization_graph.json"
+    graph = dict(_graph(), cases={"a": {}, "b": {}, "c": {}})
+    graph_path.write_text(json.dumps(graph, ensure_ascii=False), encoding="utf-8")
+
+    assert main(["metrics", str(graph_path), "--json"]) == 0
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["summary"]["component_count"] == 2
+    assert report["staff_by_degree"][0]["name"] == "鈴木花子"
+    assert report["providers_by_betweenness"][0]["clients"] == 2
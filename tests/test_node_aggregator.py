@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ノード集約モジュールのテスト
+"""
+
+import sys
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.node_aggregator import NodeAggregator
+
+
+def _make_graph(medication_count):
+    """医師1人と処方薬medication_count件のグラフ"""
+    nodes = [
+        {"id": "p", "type": "Person", "name": "山田太郎", "layer": "person"},
+        {"id": "d", "type": "Doctor", "name": "鈴木医師", "layer": "medical"},
+    ]
+    relations = [{"id": "t", "type": "TREATED_BY", "source_id": "p", "target_id": "d"}]
+    for i in range(medication_count):
+        nodes.append({"id": f"m{i}", "type": "Medication", "name": f"薬{i}", "layer": "medical",
+                      "display": {"color": "pink", "size": "small", "label": f"薬{i}"}})
+        relations.append({"id": f"a{i}", "type": "PRESCRIBED_BY",
+                          "source_id": f"m{i}", "target_id": "d",
+                          "direction": "directed", "display": {"arrow": True}})
+        relations.append({"id": f"b{i}", "type": "TAKES_MEDICATION",
+                          "source_id": "p", "target_id": f"m{i}",
+                          "direction": "directed", "display": {"arrow": True}})
+    return nodes, relations
+
+
+def test_medications_grouped_by_doctor():
+    """処方薬は医師ごとにまとめられる"""
+    nodes, relations = _make_graph(4)
+    groups = NodeAggregator().aggregate(nodes, relations)
+
+    assert len(groups) == 1
+    group = groups[0]
+    assert group["node"]["name"] == "処方薬 ×4"
+    assert group["node"]["layer"] == "medical"
+    assert group["member_ids"] == ["m0", "m1", "m2", "m3"]
+
+
+def test_external_relations_are_bundled():
+    """メンバーの外部リレーションは外部ノード・タイプごとに1本になる"""
+    nodes, relations = _make_graph(3)
+    group = NodeAggregator().aggregate(nodes, relations)[0]
+    bundled = {(r["source_id"], r["type"], r["target_id"]) for r in group["relations"]}
+    aggregate_id = group["node"]["id"]
+
+    assert bundled == {
+        (aggregate_id, "PRESCRIBED_BY", "d"),
+        ("p", "TAKES_MEDICATION", aggregate_id),
+    }
+
+
+def test_small_groups_are_not_aggregated():
+    """件数が少ない場合は集約しない"""
+    nodes, relations = _make_graph(2)
+    assert NodeAggregator().aggregate(nodes, relations) == []
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+リレーション生成（出典の行・結合キーによる結合）のテスト
+"""
+
+import sys
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ecomap_creator import EcomapCreator
+
+
+def _make_data():
+    """事業所・管理責任者の異なる契約と、相談支援事業所が2つあるデータ"""
+    return {
+        "person": {"name": "山田太郎", "birth_date": "1990-01-01"},
+        "consultation_supports": [
+            {"office_name": "○○相談支援事業所", "office_number": "4030100123",
+             "specialist": "佐藤太郎", "contract_date": "2020-04-01"},
+            {"office_name": "△△相談支援センター", "office_number": "4030100999",
+             "specialist": "高橋次郎", "contract_date": "2023-04-01"},
+        ],
+        "service_plans": [
+            {"plan_number": "P1", "creation_date": "2021-05-01"},
+            {"plan_number": "P2", "creation_date": "2024-05-01"},
+        ],
+        "service_contracts": [
+            {"service_type": "生活介護", "office_name": "○○デイサービス",
+             "office_number": "4030200456", "manager": "鈴木花子"},
+            {"service_type": "就労継続支援B型", "office_name": "株式会社ワークス",
+             "office_number": "4030200777", "manager": "田中三郎"},
+            {"service_type": "短期入所", "office_name": "ショートステイ△△",
+             "office_number": "4030200888"},
+        ],
+    }
+
+
+def _names(nodes, relations, relation_type):
+    node_map = {n["id"]: n for n in nodes}
+    return sorted(
+        (node_map[r["source_id"]]["name"], node_map[r["target_id"]]["name"])
+        for r in relations if r["type"] == relation_type
+    )
+
+
+def test_contracts_join_offices_and_managers_by_row(tmp_path):
+    """契約は同じ行の事業所・管理責任者と結び付く（先頭の事業所に集まらない）"""
+    creator = EcomapCreator(output_dir=str(tmp_path))
+    data = _make_data()
+    nodes = creator._generate_nodes(data)
+    relations = creator._generate_relations(data, nodes)
+
+    assert _names(nodes, relations, "CONTRACT_WITH") == [
+        ("就労継続支援B型 契約", "株式会社ワークス"),
+        ("生活介護 契約", "○○デイサービス"),
+        ("短期入所 契約", "ショートステイ△△"),
+    ]
+    assert _names(nodes, relations, "MANAGED_BY") == [
+        ("就労継続支援B型 契約", "田中三郎"),
+        ("生活介護 契約", "鈴木花子"),
+    ]
+
+    contract = next(n for n in nodes if n["type"] == "ServiceContract")
+    assert contract["provenance"]["sheet"] == "サービス利用情報"
+    assert contract["provenance"]["rows"] == [1]
+
+
+def test_plan_creator_is_specialist_under_contract(tmp_path):
+    """計画の作成者は、作成日に契約中の相談支援事業所の専門員"""
+    creator = EcomapCreator(output_dir=str(tmp_path))
+    data = _make_data()
+    nodes = creator._generate_nodes(data)
+    relations = creator._generate_relations(data, nodes)
+
+    node_map = {n["id"]: n for n in nodes}
+    created_by = {
+        node_map[r["source_id"]]["properties"]["plan_number"]: node_map[r["target_id"]]["name"]
+        for r in relations if r["type"] == "CREATED_BY"
+    }
+    assert created_by == {"P1": "佐藤太郎", "P2": "高橋次郎"}
+
+
+def test_repeated_offices_and_staff_reuse_one_node(tmp_path):
+    """同じ事業所・管理責任者・医師が複数の行にあっても1つのノードにまとまる"""
+    creator = EcomapCreator(output_dir=str(tmp_path))
+    data = _make_data()
+    data["service_contracts"].append(
+        {"service_type": "短期入所", "office_name": "○○デイサービス",
+         "office_number": "４０３０２００４５６", "manager": "鈴木 花子"}
+    )
+    data["medical_institutions"] = [
+        {"name": "○○病院", "department": "精神科", "doctor": "山本医師", "medications": "薬A"},
+        {"name": "○○病院", "department": "内科", "doctor": "山本 先生", "medications": "薬B"},
+    ]
+    nodes = creator._generate_nodes(data)
+    relations = creator._generate_relations(data, nodes)
+
+    types = [n["type"] for n in nodes]
+    assert types.count("SupportService") == 3
+    assert types.count("ServiceManager") == 2
+    assert types.count("Doctor") == 1
+    assert len({n["id"] for n in nodes}) == len(nodes)
+
+    office = next(n for n in nodes if n["name"] == "○○デイサービス")
+    assert office["provenance"]["rows"] == [1, 4]
+    assert _names(nodes, relations, "CONTRACT_WITH").count(("短期入所 契約", "○○デイサービス")) == 1
+    assert ("短期入所 契約", "鈴木花子") in _names(nodes, relations, "MANAGED_BY")
+    assert _names(nodes, relations, "PRESCRIBED_BY") == [("薬A", "山本医師"), ("薬B", "山本医師")]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+リレーションルールモジュールのテスト
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.relation_rules import RelationRuleEngine
+from modules.relation_generator import RelationGenerator
+
+
+def _node(node_id, node_type, name="", properties=None, provenance=None):
+    node = {"id": node_id, "type": node_type, "name": name, "properties": properties or {}}
+    if provenance:
+        node["provenance"] = provenance
+    return node
+
+
+def _nodes():
+    """本人・家族・医療機関・医師・処方薬"""
+    return [
+        _node("p", "Person", "山田太郎"),
+        _node("f", "Family", "山田花子", {"relation": "母"}),
+        _node("h", "MedicalInstitution", "○○病院"),
+        _node("d", "Doctor", "鈴木医師", {"institution_id": "h"}),
+        _node("m", "Medication", "薬A", {"doctor_id": "d"}),
+    ]
+
+
+def _edges(relations):
+    return sorted((r["type"], r["source_id"], r["target_id"], r["layer"]) for r in relations)
+
+
+def test_default_rules_generate_relations():
+    """既定のルール表で、本人・プロパティのIDによるリレーションが生成される"""
+    relations = RelationRuleEngine.default().run(_nodes())
+
+    assert _edges(relations) == [
+        ("FAMILY_RELATION", "p", "f", "family"),
+        ("PRESCRIBED_BY", "m", "d", "medical"),
+        ("RECEIVES_MEDICAL_CARE", "p", "h", "medical"),
+        ("TAKES_MEDICATION", "p", "m", "medical"),
+        ("TREATED_BY", "p", "d", "medical"),
+        ("WORKS_FOR", "d", "h", "medical"),
+    ]
+    family = next(r for r in relations if r["type"] == "FAMILY_RELATION")
+    assert family["properties"] == {"relation": "母"}
+    assert family["direction"] == "undirected"
+    assert family["display"]["arrow"] is False
+
+
+def test_default_plan_is_compiled_once():
+    """既定の実行計画はプロセスで1回だけ作成される"""
+    assert RelationRuleEngine.default() is RelationRuleEngine.default()
+
+
+def test_added_rule_needs_no_code():
+    """ルールを追加するだけで新しいリレーションが生成される"""
+    rules = [
+        {"relation_type": "DIAGNOSED_BY", "source": "Diagnosis", "target": "Doctor",
+         "join": "property", "key": "doctor_id", "layer": "medical", "line_style": "dashed"},
+    ]
+    nodes = [
+        _node("d", "Doctor", "鈴木医師"),
+        _node("x", "Diagnosis", "自閉症", {"doctor_id": "d"}),
+        _node("y", "Diagnosis", "てんかん", {"doctor_id": "unknown"}),
+    ]
+    generator = RelationGenerator()
+    relations = generator.generate_from_rules(nodes, RelationRuleEngine(rules))
+
+    assert _edges(relations) == [("DIAGNOSED_BY", "x", "d", "medical")]
+    assert relations[0]["display"]["line_style"] == "dashed"
+    assert generator.generated_relations == relations
+
+
+def test_row_join_falls_back_to_join_keys():
+    """同じ行のノードがなければ結合キーで終点を探す"""
+    rules = [
+        {"relation_type": "CONTRACT_WITH", "source": "ServiceContract", "target": "SupportService",
+         "join": "row", "keys": ("office_number",), "layer": "service_contracts"},
+    ]
+    office = {"sheet": "サービス", "source": "service_contracts", "rows": [2],
+              "join_keys": {"office_number": "4030200456"}}
+    contract = {"sheet": "サービス", "source": "service_contracts", "rows": [5],
+                "join_keys": {"office_number": "4030200456"}}
+    nodes = [
+        _node("s", "SupportService", "○○デイサービス", provenance=office),
+        _node("c", "ServiceContract", "生活介護", provenance=contract),
+    ]
+
+    relations = RelationRuleEngine(rules).run(nodes)
+
+    assert _edges(relations) == [("CONTRACT_WITH", "c", "s", "service_contracts")]
+
+
+def test_invalid_rule_is_rejected():
+    """結合方法や必須項目が正しくないルールは実行計画に変換しない"""
+    rule = {"relation_type": "X", "source": "A", "target": "B", "layer": "l"}
+    with pytest.raises(ValueError):
+        RelationRuleEngine([dict(rule, join="fuzzy")])
+    with pytest.raises(ValueError):
+        RelationRuleEngine([dict(rule, join="property")])
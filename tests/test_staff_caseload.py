@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+職員別担当件数レポートモジュールのテスト
+"""
+
+import csv
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ecomap_creator import main
+from modules.staff_caseload import StaffCaseloadReport
+
+
+def _node(node_id, node_type, name, **properties):
+    return {"id": node_id, "type": node_type, "name": name, "properties": properties}
+
+
+def _relation(relation_type, source_id, target_id):
+    return {
+        "id": f"{source_id}-{target_id}",
+        "type": relation_type,
+        "source_id": source_id,
+        "target_id": target_id,
+    }
+
+
+def _make_ecomap(client, specialist="佐藤 太郎", manager="鈴木花子", next_monitoring="2025-02-01",
+                 level_expiry="2025-03-31", contract_status="契約中"):
+    """相談支援専門員が計画を作成し、サービス管理責任者が契約を担当するエコマップ"""
+    return {
+        "person": {"id": "p", "name": client},
+        "nodes": [
+            _node("p", "Person", client),
+            _node("cs", "ConsultationSupport", "○○相談支援事業所", office_number="4030100123"),
+            _node("sp", "ConsultationSupportSpecialist", specialist, office_id="cs"),
+            _node("plan", "ServicePlan", "計画", next_monitoring_date=next_monitoring),
+            _node("ss", "SupportService", "○○デイサービス", office_number="4030200456"),
+            _node("sm", "ServiceManager", manager, office_id="ss"),
+            _node("c", "ServiceContract", "生活介護 契約",
+                  service_type="生活介護", status=contract_status),
+            _node("lv", "SupportLevel", "支援区分4", expiry_date=level_expiry),
+        ],
+        "relations": [
+            _relation("CREATED_BY", "plan", "sp"),
+            _relation("WORKS_FOR", "sp", "cs"),
+            _relation("MANAGED_BY", "c", "sm"),
+            _relation("WORKS_FOR", "sm", "ss"),
+        ],
+    }
+
+
+def _row(report, role):
+    return next(row for row in report.rows() if row["role"] == role)
+
+
+def test_staff_are_grouped_across_cases():
+    """表記ゆれのある同じ職員は1行にまとまり、担当件数を数える"""
+    report = StaffCaseloadReport(today=date(2025, 1, 15))
+    report.add_ecomap(_make_ecomap("山田太郎"))
+    report.add_ecomap(_make_ecomap("田中花子", specialist="佐藤　太郎", manager="鈴木　花子"))
+    report.add_ecomap(
+        _make_ecomap("高橋一郎", next_monitoring="2025-12-01", level_expiry="2027-03-31")
+    )
+
+    specialist = _row(report, "相談支援専門員")
+    assert specialist["count"] == 3
+    assert specialist["clients"] == ["山田太郎", "田中花子", "高橋一郎"]
+    assert len(report.rows()) == 2
+
+    # 期限の近いモニタリングと契約だけを日付順に載せる
+    assert [item["client"] for item in specialist["monitoring"]] == ["山田太郎", "田中花子"]
+    manager = _row(report, "サービス管理責任者")
+    assert [item["date"] for item in manager["expiring_contracts"]] == ["2025-03-31", "2025-03-31"]
+    assert manager["expiring_contracts"][0]["status"] == "expiring"
+
+
+def test_closed_contracts_and_overdue_monitoring():
+    """終了した契約だけの担当者は数えず、過ぎたモニタリングは期限切れになる"""
+    report = StaffCaseloadReport(today=date(2025, 3, 1))
+    report.add_ecomap(_make_ecomap("山田太郎", contract_status="契約終了"))
+
+    assert [row["role"] for row in report.rows()] == ["相談支援専門員"]
+    assert _row(report, "相談支援専門員")["monitoring"][0]["status"] == "expired"
+    assert _row(report, "相談支援専門員")["expiring_contracts"] == []
+
+
+def test_caseload_subcommand_writes_csv(tmp_path):
+    """caseload サブコマンドでExcelで開けるCSVが出力される"""
+    for client in ("山田太郎", "田中花子"):
+        path = tmp_path / f"{client}_ecomap.json"
+        path.write_text(json.dumps(_make_ecomap(client), ensure_ascii=False), encoding="utf-8")
+    output = tmp_path / "report.csv"
+
+    assert main(["caseload", str(tmp_path), "-o", str(output), "--today", "2025-01-15"]) == 0
+
+    with open(output, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert {row["職員"]: row["担当件数"] for row in rows} == {"佐藤 太郎": "2", "鈴木花子": "2"}
+    assert "山田太郎 2025-02-01（期限間近）" in rows[1]["次回モニタリング"]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SVG生成モジュールのテスト
+"""
+
+import pytest
+import sys
+import xml.dom.minidom
+from pathlib import Path
+
+# パスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.svg_generator import SVGGenerator
+
+
+def _make_data():
+    """テスト用データ（本人・家族・医療）"""
+    return {
+        "nodes": [
+            {"id": "p", "type": "Person", "name": "山田太郎", "layer": "person",
+             "display": {"color": "orange", "size": "large", "label": "山田太郎"}},
+            {"id": "f", "type": "Family", "name": "山田花子", "layer": "family",
+             "display": {"color": "red", "size": "medium", "label": "山田花子"}},
+            {"id": "d", "type": "Doctor", "name": "鈴木医師", "layer": "medical",
+             "display": {"color": "lightblue", "size": "small", "label": "鈴木医師"}},
+        ],
+        "relations": [
+            {"id": "r1", "type": "FAMILY_RELATION", "source_id": "p", "target_id": "f",
+             "layer": "family",
+             "display": {"line_style": "solid", "line_width": 2, "color": "#999", "arrow": False}},
+            {"id": "r2", "type": "TREATED_BY", "source_id": "p", "target_id": "d",
+             "layer": "medical",
+             "display": {"line_style": "solid", "line_width": 2, "color": "#999", "arrow": True}},
+        ],
+    }
+
+
+def test_generate_valid_svg():
+    """整形式のSVGが生成される"""
+    svg = SVGGenerator().generate(_make_data(), "山田太郎")
+    document = xml.dom.minidom.parseString(svg.encode("utf-8"))
+    assert document.documentElement.tagName == "svg"
+    assert "山田花子" in svg
+
+
+def test_default_layers_match_html():
+    """デフォルトではHTMLの初期表示と同じく医療レイヤーを描画しない"""
+    svg = SVGGenerator().generate(_make_data(), "山田太郎")
+    assert "鈴木医師" not in svg
+    assert svg.count("<line ") == 1
+
+
+def test_explicit_layers():
+    """レイヤー指定で医療レイヤーを描画できる"""
+    svg = SVGGenerator(layers=["medical"]).generate(_make_data(), "山田太郎")
+    assert "鈴木医師" in svg
+    assert "山田花子" not in svg
+    assert 'marker-end="url(#arrow)"' in svg
+
+
+def test_deterministic_output():
+    """同じ入力からは同じSVGが生成される"""
+    generator = SVGGenerator()
+    first = generator.generate(_make_data(), "山田太郎")
+    assert first == generator.generate(_make_data(), "山田太郎")
+
+
+def test_escape_label():
+    """ラベル中の特殊文字はエスケープされる"""
+    data = _make_data()
+    data["nodes"][1]["display"]["label"] = "A&B <母>"
+    svg = SVGGenerator().generate(data, "山田太郎")
+    assert "A&amp;B &lt;母&gt;" in svg
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])